@@ -11,15 +11,15 @@ A professional Flask application with clean architecture:
 from flask import Flask
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
-from pymongo import MongoClient
-import cloudinary
-import os
 from dotenv import load_dotenv
+from .utils.mongo import LazyDatabase
 
 load_dotenv()
 
 # Global variables for database and JWT
-mongo = None
+# `mongo` is a proxy: the MongoClient is created on first use in each process
+# (i.e. after gunicorn forks its workers), never at import time.
+mongo = LazyDatabase()
 jwt = None
 
 
@@ -44,6 +44,13 @@ def create_app(config_name='development'):
     # Register blueprints
     register_blueprints(app)
     
+    # Create the indexes declared by the blueprints (idempotent) + data backfills
+    if app.config.get('AUTO_CREATE_INDEXES'):
+        ensure_indexes()
+    
+    # Register CLI commands
+    register_commands(app)
+    
     # Register error handlers
     register_error_handlers(app)
     
@@ -52,17 +59,14 @@ def create_app(config_name='development'):
 
 def init_extensions(app):
     """Initialize Flask extensions"""
-    global mongo, jwt
+    global jwt
     
     # CORS
     CORS(
         app,
         resources={
             r"/api/*": {
-                "origins": [
-                    "http://localhost:5173",
-                    "https://marina-ibarra.netlify.app",
-                ]
+                "origins": app.config['CORS_ORIGINS']
             }
         },
         supports_credentials=True,
@@ -79,16 +83,32 @@ def init_extensions(app):
     app.config['JWT_ACCESS_COOKIE_PATH'] = '/'
     app.config['JWT_COOKIE_CSRF_PROTECT'] = False  # Disable for simplicity
     
-    # MongoDB
-    cluster = MongoClient(app.config['MONGO_CLUSTER'])
-    mongo = cluster["marina_db"]
+    # Per-request timing breakdown (Server-Timing header + route metrics)
+    from .utils.request_timing import init_request_timing, mongo_command_timer
+    init_request_timing(app)
     
-    # Cloudinary
-    cloudinary.config(
-        cloud_name=os.getenv('CLOUDINARY_CLOUD_NAME'),
-        api_key=os.getenv('CLOUDINARY_API_KEY'),
-        api_secret=os.getenv('CLOUDINARY_API_SECRET')
+    # MongoDB (lazy, per process; pool tuned from config; commands timed per request)
+    config = app.config
+    mongo.configure(
+        config['MONGO_CLUSTER'],
+        config['MONGO_DB_NAME'],
+        maxPoolSize=config['MONGO_MAX_POOL_SIZE'],
+        minPoolSize=config['MONGO_MIN_POOL_SIZE'],
+        maxIdleTimeMS=config['MONGO_MAX_IDLE_TIME_MS'],
+        waitQueueTimeoutMS=config['MONGO_WAIT_QUEUE_TIMEOUT_MS'],
+        serverSelectionTimeoutMS=config['MONGO_SERVER_SELECTION_TIMEOUT_MS'],
+        connectTimeoutMS=config['MONGO_CONNECT_TIMEOUT_MS'],
+        socketTimeoutMS=config['MONGO_SOCKET_TIMEOUT_MS'],
+        event_listeners=[mongo_command_timer],
     )
+    
+    # Cloudinary: credentials + HTTP pool shared by the worker's threads
+    from .services.cloudinary_service import configure_cloudinary
+    configure_cloudinary(app)
+
+    # Stripe: pooled HTTP client with timeouts + circuit breaker
+    from .services.stripe_client import configure_stripe
+    configure_stripe(app)
 
 
 def register_blueprints(app):
@@ -98,16 +118,54 @@ def register_blueprints(app):
     from .api.auth import auth_bp
     from .api.portfolio import portfolio_bp
     from .api.store import store_bp
+    from .api.uploads import uploads_bp
+    from .api.system import system_bp
+    from .api.analytics import analytics_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api')
     app.register_blueprint(portfolio_bp, url_prefix='/api')
     app.register_blueprint(store_bp, url_prefix='/api')
+    app.register_blueprint(uploads_bp, url_prefix='/api')
+    app.register_blueprint(system_bp, url_prefix='/api')
+    app.register_blueprint(analytics_bp, url_prefix='/api')
+    
+    # Prometheus scrape endpoint (/metrics, outside /api)
+    from .api.metrics import metrics_bp
+    app.register_blueprint(metrics_bp)
     
     # Admin blueprints (for Flask templates)
     from .admin.routes import admin_bp
     app.register_blueprint(admin_bp)
 
 
+def ensure_indexes():
+    """Apply the index registry and the gallery_count backfill, logging (not raising) failures"""
+    from .services.index_registry import IndexRegistry
+    try:
+        for entry in IndexRegistry.apply(mongo):
+            if not entry["ok"]:
+                print(f"[indexes][warn] {entry['collection']}.{entry['name']}: {entry['error']}")
+    except Exception as e:
+        print(f"[indexes][warn] index creation skipped: {e}")
+    # The summary index covers gallery_count: fill it in on legacy albums
+    from .api.portfolio import backfill_gallery_count
+    try:
+        backfill_gallery_count()
+    except Exception as e:
+        print(f"[indexes][warn] gallery_count backfill skipped: {e}")
+
+
+def register_commands(app):
+    """Register Flask CLI commands"""
+    from .commands import indexes_cli, jobs_cli, stripe_cli, analytics_cli, subscribers_cli, portfolio_cli
+    app.cli.add_command(indexes_cli)
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(stripe_cli)
+    app.cli.add_command(analytics_cli)
+    app.cli.add_command(subscribers_cli)
+    app.cli.add_command(portfolio_cli)
+
+
 def register_error_handlers(app):
     """Register error handlers"""
     
@@ -61,8 +61,8 @@ def login():
             session['username'] = user.get('username')
 
             # Create JWT token and store in secure cookie
-            from flask_jwt_extended import create_access_token
-            access_token = create_access_token(identity=email)
+            from app.services.auth_service import AuthService
+            access_token = AuthService.issue_access_token(user)
 
             # Create response and set JWT in httponly cookie
             response = redirect(url_for('admin.portfolio_manager'))
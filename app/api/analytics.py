@@ -0,0 +1,42 @@
+"""
+Analytics API endpoints
+"""
+
+from datetime import datetime
+from flask import Blueprint, request, jsonify
+from app.utils.decorators import admin_required
+from app.services.analytics_service import SalesRollupService, ROLLUP_DIMENSIONS
+
+analytics_bp = Blueprint('analytics', __name__)
+
+
+@analytics_bp.route('/analytics/sales', methods=['GET'])
+@admin_required
+def get_sales():
+    """Sales from the pre-aggregated rollups (admin only)
+    Query params:
+      - dim: total (default) | product | country
+      - from / to: inclusive days (YYYY-MM-DD)
+      - currency: e.g. eur
+      - group: day (default, one row per day and key) | range (totals per key)
+    Amounts are in minor units (cents).
+    """
+    dim = request.args.get("dim", "total")
+    if dim not in ROLLUP_DIMENSIONS:
+        return jsonify({"error": f"dim must be one of: {', '.join(ROLLUP_DIMENSIONS)}"}), 400
+    group = request.args.get("group", "day")
+    if group not in ("day", "range"):
+        return jsonify({"error": "group must be 'day' or 'range'"}), 400
+
+    date_from = request.args.get("from")
+    date_to = request.args.get("to")
+    for value in (date_from, date_to):
+        if value:
+            try:
+                datetime.strptime(value, "%Y-%m-%d")
+            except ValueError:
+                return jsonify({"error": "from/to must be YYYY-MM-DD"}), 400
+
+    currency = (request.args.get("currency") or "").lower() or None
+    rows = SalesRollupService.query(dim, date_from, date_to, currency, group_by_day=(group == "day"))
+    return jsonify({"dim": dim, "group": group, "from": date_from, "to": date_to, "rows": rows}), 200
@@ -4,13 +4,22 @@ Authentication API endpoints
 
 from flask import Blueprint, request, jsonify
 from app.services.auth_service import AuthService
-from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token
+from app.models.user import UserModel
+from app.services.index_registry import IndexRegistry
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.utils.validators import validate_password, validate_email
+from app.utils.decorators import rate_limit
 
 auth_bp = Blueprint('auth', __name__)
 
+IndexRegistry.declare_index('auth', "users", [("email", 1)], name="users_email", unique=True)
+IndexRegistry.declare_index('auth', "users", [("role", 1)], name="users_role")
+IndexRegistry.declare_query('users.by_email', "users", {"email": "user@example.com"})
+IndexRegistry.declare_query('users.by_role', "users", {"role": "super_admin"})
+
 
 @auth_bp.route('/token', methods=['POST'])
+@rate_limit("token", by=("ip", "email"))
 def create_token():
     """Create JWT token for user authentication"""
     data = request.get_json()
@@ -70,5 +79,13 @@ def create_admin():
 def refresh_access_token():
     """Refresh access token using refresh token"""
     identity = get_jwt_identity()
-    access_token = create_access_token(identity=identity)
+    # Same revocation checks as access tokens (deleted / re-created user, sv bump)
+    is_allowed, error_msg, _ = AuthService.authorize_claims(identity, get_jwt())
+    if not is_allowed:
+        return jsonify({"error": error_msg}), 401
+    user = UserModel.get_user_by_email(identity)
+    if not user:
+        return jsonify({"error": "Valid user account required"}), 401
+    # Re-read role/security version so refreshed tokens carry current claims
+    access_token = AuthService.issue_access_token(user)
     return jsonify({"access_token": access_token}), 200
@@ -0,0 +1,44 @@
+"""
+Prometheus scrape endpoint
+"""
+
+import hmac
+import os
+from flask import Blueprint, jsonify, current_app, request, Response
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest, multiprocess
+except ImportError:  # optional dependency
+    generate_latest = None
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+def _registry():
+    """Registry to expose: aggregated over all gunicorn workers when
+    PROMETHEUS_MULTIPROC_DIR is set, otherwise this process only."""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Request, dependency, Mongo and Stripe metrics in the Prometheus text format
+
+    Requires `Authorization: Bearer <METRICS_TOKEN>`. Without a configured
+    token the endpoint only exists in development.
+    """
+    config = current_app.config
+    token = config['METRICS_TOKEN']
+    if not config['METRICS_ENABLED'] or (not token and not config['DEBUG']):
+        return jsonify({"error": "Metrics are disabled"}), 404
+    if token:
+        supplied = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode()):
+            return jsonify({"error": "Unauthorized"}), 401
+    if generate_latest is None:
+        return jsonify({"error": "prometheus_client is not installed"}), 503
+    return Response(generate_latest(_registry()), content_type=CONTENT_TYPE_LATEST)
@@ -2,35 +2,110 @@
 Portfolio API endpoints
 """
 
-from flask import Blueprint, request, jsonify, Response
-from bson import json_util
+from flask import Blueprint, request, jsonify, current_app
 from bson.objectid import ObjectId
 from app import mongo
 from app.utils.decorators import admin_required
 from app.services.cloudinary_service import CloudinaryService
+from app.services.catalog_cache import CatalogCache
+from app.services.ordering_service import OrderingService
+from app.services.index_registry import IndexRegistry
+from app.utils.http_cache import cached_response
+from app.api.serializers import (
+    PORTFOLIO_SORT, PORTFOLIO_SUMMARY_PROJECTION, PORTFOLIO_PAGE_PARAMS, parse_portfolio_page,
+    portfolio_list_body, portfolio_page_body, portfolio_item_body,
+)
 
 portfolio_bp = Blueprint('portfolio', __name__)
+PORTFOLIO_COLLECTION = "portfolio_items"
+
+PORTFOLIO_SUMMARY_INDEX = [("display_order", 1), ("_id", 1), ("name", 1), ("thumb_img_url", 1), ("gallery_count", 1)]
+
+# The summary index also serves the (display_order, _id) sort of every listing
+IndexRegistry.declare_index('portfolio', PORTFOLIO_COLLECTION, PORTFOLIO_SUMMARY_INDEX, name="portfolio_summary")
+IndexRegistry.declare_query('portfolio.list', PORTFOLIO_COLLECTION, sort=PORTFOLIO_SORT)
+IndexRegistry.declare_query('portfolio.summary_page', PORTFOLIO_COLLECTION,
+                            sort=PORTFOLIO_SORT, projection=PORTFOLIO_SUMMARY_PROJECTION)
+
+
+def backfill_gallery_count():
+    """Set gallery_count on albums stored before it existed (summary view)
+
+    Maintenance task: run by `flask portfolio backfill-gallery-count` and at
+    startup with AUTO_CREATE_INDEXES, never from a request.
+
+    Returns:
+        int: Number of albums updated
+    """
+    result = mongo.portfolio_items.update_many(
+        {"gallery_count": {"$exists": False}},
+        [{"$set": {"gallery_count": {"$size": {"$ifNull": ["$gallery", []]}}}}],
+    )
+    return result.modified_count
+
+
+def upload_album_images(thumb_img_data, gallery_data):
+    """Upload the new (base64) thumbnail/gallery images of an album in parallel
+
+    Returns:
+        tuple: (thumb_url, gallery_urls, error_message)
+    """
+    images = [(thumb_img_data, "portfolio/thumbnails")]
+    images += [(img_data, "portfolio/gallery") for img_data in gallery_data]
+    values, error_index = CloudinaryService.resolve_images(images)
+    if error_index == 0:
+        return None, None, "Failed to upload thumbnail"
+    if error_index is not None:
+        return None, None, "Failed to upload gallery image"
+    return values[0], values[1:], None
 
 
 @portfolio_bp.route('/portfolio', methods=['GET'])
 def get_portfolio_items():
-    """Get all portfolio items (public endpoint)"""
-    # Sort by display_order (ascending), then by _id for items without order
-    portfolio_items = mongo.portfolio_items.find().sort([("display_order", 1), ("_id", 1)])
-    response = json_util.dumps(portfolio_items)
-    return Response(response, mimetype="application/json")
+    """Get portfolio items (public endpoint)
+
+    Without query params returns the full list (legacy shape). Any of these
+    switches to paginated mode, returning { items: [...], next_cursor }:
+      - limit: page size (default PORTFOLIO_PAGE_SIZE, max PORTFOLIO_PAGE_MAX)
+      - cursor: next_cursor of the previous page
+      - fields: comma separated projection (e.g. name,thumb_img_url)
+      - view=summary: only name, thumb_img_url and gallery_count
+    """
+    if not any(param in request.args for param in PORTFOLIO_PAGE_PARAMS):
+        def build():
+            # Sort by display_order (ascending), then by _id for items without order
+            return portfolio_list_body(mongo.portfolio_items.find().sort(PORTFOLIO_SORT))
+
+        return cached_response(CatalogCache.get_or_build(PORTFOLIO_COLLECTION, "list", build))
+
+    page, error = parse_portfolio_page(request.args, current_app.config)
+    if error:
+        return jsonify({"error": error}), 400
+
+    def build_page():
+        docs = list(mongo.portfolio_items.find(page["query"], page["projection"])
+                    .sort(PORTFOLIO_SORT).limit(page["limit"] + 1))
+        return portfolio_page_body(docs, page["limit"])
+
+    return cached_response(CatalogCache.get_or_build(PORTFOLIO_COLLECTION, page["cache_key"], build_page))
 
 
 @portfolio_bp.route('/portfolio/<id>', methods=['GET'])
 def get_portfolio_item(id):
     """Get single portfolio item (public endpoint)"""
     try:
-        portfolio_item = mongo.portfolio_items.find_one({"_id": ObjectId(id)})
-        if not portfolio_item:
+        object_id = ObjectId(id)
+    except Exception as e:
+        return jsonify({"error": "Invalid portfolio ID"}), 400
+
+    def build():
+        return portfolio_item_body(mongo.portfolio_items.find_one({"_id": object_id}))
+
+    try:
+        cached = CatalogCache.get_or_build(PORTFOLIO_COLLECTION, ("item", id), build)
+        if cached is None:
             return jsonify({"error": "Portfolio item not found"}), 404
-        
-        response = json_util.dumps(portfolio_item)
-        return Response(response, mimetype="application/json")
+        return cached_response(cached)
     except Exception as e:
         return jsonify({"error": "Invalid portfolio ID"}), 400
 
@@ -53,30 +128,13 @@ def update_portfolio_item(id):
         if not all([name, description, thumb_img_data, gallery_data]):
             return jsonify({"error": "Missing required fields: name, description, thumb_img_url, gallery"}), 400
         
-        # Only upload to Cloudinary if it's base64 data (new images)
-        if thumb_img_data and isinstance(thumb_img_data, str) and thumb_img_data.startswith('data:image'):
-            thumb_url, _, error = CloudinaryService.upload_portfolio_images(thumb_img_data, [])
-            if error:
-                return jsonify({"error": error}), 500
-        else:
-            thumb_url = thumb_img_data  # Keep existing URL
-            
-        # Process gallery images
-        gallery_urls = []
         if not isinstance(gallery_data, list):
             return jsonify({"error": "Gallery data must be a list"}), 400
         
-        for img_data in gallery_data:
-            if isinstance(img_data, str) and img_data.startswith('data:image'):
-                # New image - upload to Cloudinary
-                img_url = CloudinaryService.upload_image(img_data, "portfolio/gallery")
-                if img_url:
-                    gallery_urls.append(img_url)
-                else:
-                    return jsonify({"error": "Failed to upload gallery image"}), 500
-            else:
-                # Existing URL - keep it
-                gallery_urls.append(img_data)
+        # Only upload base64 data (new images) to Cloudinary; existing URLs are kept
+        thumb_url, gallery_urls, error = upload_album_images(thumb_img_data, gallery_data)
+        if error:
+            return jsonify({"error": error}), 500
         
         # Update in database
         result = mongo.portfolio_items.update_one(
@@ -86,11 +144,13 @@ def update_portfolio_item(id):
                 "description": description,
                 "thumb_img_url": thumb_url,
                 "gallery": gallery_urls,
+                "gallery_count": len(gallery_urls),
             }}
         )
         
         if result.matched_count == 0:
             return jsonify({"error": "Portfolio item not found"}), 404
+        CatalogCache.invalidate(PORTFOLIO_COLLECTION)
         
         response = {
             "_id": id,
@@ -126,45 +186,27 @@ def add_portfolio_item():
     if not all([name, description, thumb_img_data, gallery_data]):
         return jsonify({"error": "Missing required fields: name, description, thumb_img_url, gallery"}), 400
     
-    # Accept either base64 data URLs (legacy) or direct Cloudinary/remote URLs (modern)
-    # Thumb
-    if isinstance(thumb_img_data, str) and thumb_img_data.startswith('data:image'):
-        thumb_url, _, error = CloudinaryService.upload_portfolio_images(thumb_img_data, [])
-        if error:
-            return jsonify({"error": error}), 500
-    else:
-        thumb_url = thumb_img_data  # assume URL already hosted (ideally in Cloudinary)
-
-    # Gallery
     if not isinstance(gallery_data, list):
         return jsonify({"error": "Gallery data must be a list"}), 400
-    gallery_urls = []
-    for img_data in gallery_data:
-        if isinstance(img_data, str) and img_data.startswith('data:image'):
-            img_url = CloudinaryService.upload_image(img_data, "portfolio/gallery")
-            if img_url:
-                gallery_urls.append(img_url)
-            else:
-                return jsonify({"error": "Failed to upload gallery image"}), 500
-        else:
-            gallery_urls.append(img_data)
-    
-    # Get next display_order (highest + 1)
-    last_item = mongo.portfolio_items.find().sort("display_order", -1).limit(1)
-    next_order = 1
-    for item in last_item:
-        next_order = item.get("display_order", 0) + 1
-        break
+
+    # Accept either base64 data URLs (legacy) or direct Cloudinary/remote URLs (modern)
+    thumb_url, gallery_urls, error = upload_album_images(thumb_img_data, gallery_data)
+    if error:
+        return jsonify({"error": error}), 500
     
     # Save to database
     try:
+        # Reserve the next gapped display_order key (atomic, no sorted lookup)
+        next_order = OrderingService.next_order_key(PORTFOLIO_COLLECTION)
         result = mongo.portfolio_items.insert_one({
             "name": name,
             "description": description,
             "thumb_img_url": thumb_url,
             "gallery": gallery_urls,
+            "gallery_count": len(gallery_urls),
             "display_order": next_order,
         })
+        CatalogCache.invalidate(PORTFOLIO_COLLECTION)
         
         response = {
             "_id": str(result.inserted_id),
@@ -193,29 +235,54 @@ def reorder_portfolio_items():
         if not isinstance(items, list):
             return jsonify({"error": "Items must be an array"}), 400
         
-        # Update display_order for each item
-        for index, item in enumerate(items):
-            item_id = item.get("id")
-            if not item_id:
-                continue
-                
-            try:
-                # Update the display_order field
-                mongo.portfolio_items.update_one(
-                    {"_id": ObjectId(item_id)},
-                    {"$set": {"display_order": index + 1}}
-                )
-            except Exception as e:
-                print(f"Error updating item {item_id}: {str(e)}")
-                continue
-        
-        return jsonify({"message": "Portfolio order updated successfully"}), 200
+        # Rewrite display_order for all items in a single bulk_write
+        item_ids = [item.get("id") if isinstance(item, dict) else None for item in items]
+        result, status_code = OrderingService.apply_order(PORTFOLIO_COLLECTION, item_ids, data.get("version"))
+        if status_code != 200:
+            return jsonify(result), status_code
+        CatalogCache.invalidate(PORTFOLIO_COLLECTION)
+        
+        return jsonify({
+            "message": "Portfolio order updated successfully",
+            "version": result["version"],
+        }), 200
         
     except Exception as e:
         print(f"Reorder error: {str(e)}")
         return jsonify({"error": "Failed to reorder portfolio items"}), 500
 
 
+@portfolio_bp.route('/portfolio/<id>/move', methods=['PUT'])
+@admin_required
+def move_portfolio_item(id):
+    """Move one portfolio item between two neighbours (admin only)
+    Body JSON: { "after": id?, "before": id?, "version": int? }
+    Only the moved item is rewritten. If "version" is sent and the order
+    changed in the meantime, returns 409 with the current version.
+    """
+    try:
+        data = request.get_json() or {}
+        result, status_code = OrderingService.move(
+            PORTFOLIO_COLLECTION, id,
+            after_id=data.get("after"),
+            before_id=data.get("before"),
+            expected_version=data.get("version"),
+        )
+        if status_code == 200:
+            CatalogCache.invalidate(PORTFOLIO_COLLECTION)
+        return jsonify(result), status_code
+    except Exception as e:
+        print(f"Move error: {str(e)}")
+        return jsonify({"error": "Failed to move portfolio item"}), 500
+
+
+@portfolio_bp.route('/portfolio/order-version', methods=['GET'])
+@admin_required
+def get_portfolio_order_version():
+    """Current ordering version, to be sent back with move/reorder (admin only)"""
+    return jsonify({"version": OrderingService.get_version(PORTFOLIO_COLLECTION)}), 200
+
+
 @portfolio_bp.route('/portfolio/<id>', methods=['DELETE'])
 @admin_required
 def delete_portfolio_item(id):
@@ -223,6 +290,7 @@ def delete_portfolio_item(id):
     try:
         result = mongo.portfolio_items.delete_one({"_id": ObjectId(id)})
         if result.deleted_count == 1:
+            CatalogCache.invalidate(PORTFOLIO_COLLECTION)
             return jsonify({"message": f"Portfolio item {id} deleted successfully"}), 200
         else:
             return jsonify({"error": "Portfolio item not found"}), 404
@@ -236,6 +304,7 @@ def clear_all_portfolio_items():
     """Delete all portfolio items (admin only - temporary cleanup)"""
     try:
         result = mongo.portfolio_items.delete_many({})
+        CatalogCache.invalidate(PORTFOLIO_COLLECTION)
         return jsonify({
             "message": f"Deleted {result.deleted_count} portfolio items successfully",
             "deleted_count": result.deleted_count
@@ -0,0 +1,117 @@
+"""
+Serialization of the public catalog responses
+
+Shared by the Flask views and the async read API (app/asgi.py), so both
+return byte-identical bodies (and therefore the same ETags).
+"""
+
+from flask import jsonify
+from bson import json_util
+from app.utils.http_cache import CachedBody
+from app.utils.pagination import encode_cursor, decode_cursor, parse_limit, keyset_filter
+from app.utils.request_timing import timed
+
+PORTFOLIO_SORT = [("display_order", 1), ("_id", 1)]
+PORTFOLIO_FIELDS = {"name", "description", "thumb_img_url", "gallery", "gallery_count", "display_order"}
+# Fields of the covering index {display_order, _id, name, thumb_img_url, gallery_count}
+PORTFOLIO_SUMMARY_PROJECTION = {"display_order": 1, "name": 1, "thumb_img_url": 1, "gallery_count": 1}
+PORTFOLIO_PAGE_PARAMS = ("limit", "cursor", "fields", "view")
+STORE_SORT = [("display_order", 1), ("_id", 1)]
+# Stripe catalog sync state stays out of the public (cacheable) store responses
+STORE_PUBLIC_PROJECTION = {field: 0 for field in (
+    "stripe_product_id", "stripe_price_id", "stripe_price_amount", "stripe_currency", "stripe_synced_at",
+)}
+
+
+def parse_portfolio_page(args, config):
+    """Validate the paginated portfolio query string
+
+    Args:
+        args (Mapping): Query parameters
+        config (Mapping): App config (page size limits)
+
+    Returns:
+        tuple: (page dict with query/projection/view/limit/cursor/cache_key, None)
+               or (None, error message)
+    """
+    limit = parse_limit(args.get("limit"), config['PORTFOLIO_PAGE_SIZE'], config['PORTFOLIO_PAGE_MAX'])
+    view = args.get("view", "full")
+    if view not in ("full", "summary"):
+        return None, "view must be 'full' or 'summary'"
+
+    if view == "summary":
+        projection = PORTFOLIO_SUMMARY_PROJECTION
+    elif args.get("fields"):
+        fields = {field.strip() for field in args["fields"].split(",") if field.strip()}
+        unknown = fields - PORTFOLIO_FIELDS
+        if unknown:
+            return None, f"Unknown fields: {', '.join(sorted(unknown))}"
+        # display_order and _id are always returned: they form the cursor
+        projection = {field: 1 for field in sorted(fields | {"display_order"})}
+    else:
+        projection = None
+
+    query = {}
+    cursor_token = args.get("cursor")
+    if cursor_token:
+        try:
+            query = keyset_filter(PORTFOLIO_SORT, decode_cursor(cursor_token, len(PORTFOLIO_SORT)))
+        except ValueError:
+            return None, "Invalid cursor"
+
+    return {
+        "query": query,
+        "projection": projection,
+        "view": view,
+        "limit": limit,
+        "cache_key": ("page", view, tuple(sorted(projection)) if projection else None, cursor_token, limit),
+    }, None
+
+
+def _dumps(obj):
+    """Extended JSON, timed as "json" in the request breakdown"""
+    with timed("json"):
+        return json_util.dumps(obj)
+
+
+def portfolio_list_body(docs):
+    """Full portfolio list (legacy shape: a JSON array)"""
+    return CachedBody(_dumps(docs))
+
+
+def portfolio_page_body(docs, limit):
+    """One page of portfolio items; `docs` holds up to limit + 1 documents"""
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_cursor = encode_cursor([last.get("display_order"), last["_id"]])
+    return CachedBody(_dumps({"items": docs, "next_cursor": next_cursor}))
+
+
+def portfolio_item_body(doc):
+    """Single portfolio item, None if it does not exist"""
+    if not doc:
+        return None
+    return CachedBody(_dumps(doc))
+
+
+def store_list_body(docs):
+    """Store items with string ids (jsonify, needs an app context)"""
+    for item in docs:
+        if '_id' in item:
+            item['_id'] = str(item['_id'])
+    return CachedBody(jsonify(docs).get_data())
+
+
+def store_item_body(doc):
+    """Single store item with a string id, None if it does not exist"""
+    if not doc:
+        return None
+    doc['_id'] = str(doc['_id'])
+    return CachedBody(jsonify(doc).get_data())
+
+
+def order_body(doc):
+    """Order document as extended JSON"""
+    return _dumps(doc)
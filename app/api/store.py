@@ -2,34 +2,83 @@
 Store API endpoints
 """
 
-from flask import Blueprint, request, jsonify, Response
+from flask import Blueprint, request, jsonify, Response, current_app, stream_with_context
 from bson import json_util
 from bson.objectid import ObjectId
 from app import mongo
-from app.utils.decorators import admin_required
+from app.utils.decorators import admin_required, rate_limit
 from app.utils.validators import validate_email
 from app.services.cloudinary_service import CloudinaryService
+from app.services.catalog_cache import CatalogCache
+from app.services.ordering_service import OrderingService
+from app.services.index_registry import IndexRegistry
+from app.services.job_queue import JobQueue
+from app.services.order_service import STRIPE_EVENT_JOB
+from app.services.stripe_catalog_service import StripeCatalogService
+from app.services.subscriber_service import SubscriberService
+from app.utils.circuit_breaker import CircuitOpenError
+from app.utils.http_cache import cached_response
+from app.utils.export import EXPORT_MIMETYPES, flatten, stream_rows
+from app.utils.pagination import encode_cursor, decode_cursor, parse_limit, keyset_filter
+from app.api.serializers import STORE_SORT, STORE_PUBLIC_PROJECTION, store_list_body, store_item_body, order_body
 import os
 import stripe
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import traceback
-from pymongo import ReturnDocument
 
 store_bp = Blueprint('store', __name__)
-stripe.api_key = os.getenv("STRIPE_SECRET_KEY", "")
+STORE_COLLECTION = "store_items"
+# payment_intent.succeeded is covered by checkout.session.completed for Checkout flow
+STRIPE_HANDLED_EVENTS = {"checkout.session.completed"}
+ORDERS_SORT = [("created_at", -1), ("_id", -1)]
+# Admin list view: enough for the table, the detail view loads the full order
+ORDERS_SUMMARY_PROJECTION = {
+    "order_number": 1, "created_at": 1, "customer_email": 1, "shipping_name": 1,
+    "payment_status": 1, "currency": 1, "amount_total_minor": 1,
+}
+ORDERS_FILTER_PARAMS = ("cursor", "email", "from", "to", "payment_status", "order_number", "view")
+ORDERS_EXPORT_COLUMNS = [
+    "_id", "order_number", "created_at", "session_id", "payment_status", "currency", "amount_total_minor",
+    "customer_email", "customer_phone", "shipping_name",
+    "shipping_address.line1", "shipping_address.line2", "shipping_address.city", "shipping_address.state",
+    "shipping_address.postal_code", "shipping_address.country",
+    "items_count", "items",
+]
+SUBSCRIBERS_EXPORT_COLUMNS = ["_id", "email", "consent", "source", "created_at", "updated_at"]
+
+IndexRegistry.declare_index('store', STORE_COLLECTION, [("display_order", 1), ("_id", 1)], name="store_display_order")
+# One order per Checkout Session, also under concurrent webhook jobs. Databases
+# with the earlier non-unique index: db.orders.dropIndex("orders_session_id"),
+# then `flask indexes apply`.
+IndexRegistry.declare_index('store', "orders", [("session_id", 1)], name="orders_session_id", unique=True)
+IndexRegistry.declare_index('store', "orders", [("created_at", -1), ("_id", -1)], name="orders_created_at")
+IndexRegistry.declare_index('store', "orders", [("customer_email", 1), ("created_at", -1), ("_id", -1)],
+                            name="orders_customer_email_created_at")
+IndexRegistry.declare_index('store', "orders", [("payment_status", 1), ("created_at", -1), ("_id", -1)],
+                            name="orders_payment_status_created_at")
+IndexRegistry.declare_index('store', "orders", [("order_number", 1)], name="orders_order_number")
+IndexRegistry.declare_index('store', "subscribers", [("email", 1)], name="subscribers_email", unique=True)
+IndexRegistry.declare_query('store.list', STORE_COLLECTION, sort=STORE_SORT)
+IndexRegistry.declare_query('orders.by_session', "orders", {"session_id": "cs_test"})
+IndexRegistry.declare_query('orders.recent', "orders", sort=ORDERS_SORT, projection=ORDERS_SUMMARY_PROJECTION)
+IndexRegistry.declare_query('orders.by_email', "orders", {"customer_email": "user@example.com"},
+                            sort=ORDERS_SORT, projection=ORDERS_SUMMARY_PROJECTION)
+IndexRegistry.declare_query('orders.by_payment_status', "orders",
+                            {"payment_status": "paid", "created_at": {"$gte": datetime(2025, 1, 1)}},
+                            sort=ORDERS_SORT, projection=ORDERS_SUMMARY_PROJECTION)
+IndexRegistry.declare_query('orders.by_number', "orders", {"order_number": "PED-2025-00001"})
+IndexRegistry.declare_query('subscribers.by_email', "subscribers", {"email": "user@example.com"})
 
 
 @store_bp.route('/store', methods=['GET'])
 def get_store_items():
     """Get all store items (public endpoint)"""
-    try:
+    def build():
         # Sort by display_order (ascending), then by _id for items without order
-        store_items = list(mongo.store_items.find().sort([("display_order", 1), ("_id", 1)]))
-        # Convert ObjectId to string for JSON serialization
-        for item in store_items:
-            if '_id' in item:
-                item['_id'] = str(item['_id'])
-        return jsonify(store_items), 200
+        return store_list_body(list(mongo.store_items.find({}, STORE_PUBLIC_PROJECTION).sort(STORE_SORT)))
+
+    try:
+        return cached_response(CatalogCache.get_or_build(STORE_COLLECTION, "list", build))
     except Exception as e:
         return jsonify({"error": "Failed to fetch store items"}), 500
 
@@ -38,13 +87,18 @@ def get_store_items():
 def get_store_item(id):
     """Get single store item (public endpoint)"""
     try:
-        store_item = mongo.store_items.find_one({"_id": ObjectId(id)})
-        if not store_item:
+        object_id = ObjectId(id)
+    except Exception as e:
+        return jsonify({"error": "Invalid store item ID"}), 400
+
+    def build():
+        return store_item_body(mongo.store_items.find_one({"_id": object_id}, STORE_PUBLIC_PROJECTION))
+
+    try:
+        cached = CatalogCache.get_or_build(STORE_COLLECTION, ("item", id), build)
+        if cached is None:
             return jsonify({"error": "Store item not found"}), 404
-        
-        # Convert ObjectId to string for JSON serialization
-        store_item['_id'] = str(store_item['_id'])
-        return jsonify(store_item), 200
+        return cached_response(cached)
     except Exception as e:
         return jsonify({"error": "Invalid store item ID"}), 400
 
@@ -79,15 +133,10 @@ def add_store_item():
         return jsonify({"error": "Image must be a Cloudinary URL"}), 400
     image_url = image
     
-    # Get next display_order (highest + 1)
-    last_item = mongo.store_items.find().sort("display_order", -1).limit(1)
-    next_order = 1
-    for item in last_item:
-        next_order = item.get("display_order", 0) + 1
-        break
-    
     # Save to database
     try:
+        # Reserve the next gapped display_order key (atomic, no sorted lookup)
+        next_order = OrderingService.next_order_key(STORE_COLLECTION)
         result = mongo.store_items.insert_one({
             "name": name,
             "price": price,
@@ -95,6 +144,8 @@ def add_store_item():
             "image": image_url,
             "display_order": next_order,
         })
+        CatalogCache.invalidate(STORE_COLLECTION)
+        StripeCatalogService.enqueue_sync(result.inserted_id)
         
         response = {
             "_id": str(result.inserted_id),
@@ -154,6 +205,8 @@ def update_store_item(id):
         
         if result.matched_count == 0:
             return jsonify({"error": "Store item not found"}), 404
+        CatalogCache.invalidate(STORE_COLLECTION)
+        StripeCatalogService.enqueue_sync(id)
         
         response = {
             "_id": id,
@@ -169,13 +222,48 @@ def update_store_item(id):
         return jsonify({"error": "Database error"}), 500
 
 
+@store_bp.route('/store/<id>/move', methods=['PUT'])
+@admin_required
+def move_store_item(id):
+    """Move one store item between two neighbours (admin only)
+    Body JSON: { "after": id?, "before": id?, "version": int? }
+    Only the moved item is rewritten. If "version" is sent and the order
+    changed in the meantime, returns 409 with the current version.
+    """
+    try:
+        data = request.get_json() or {}
+        result, status_code = OrderingService.move(
+            STORE_COLLECTION, id,
+            after_id=data.get("after"),
+            before_id=data.get("before"),
+            expected_version=data.get("version"),
+        )
+        if status_code == 200:
+            CatalogCache.invalidate(STORE_COLLECTION)
+        return jsonify(result), status_code
+    except Exception as e:
+        print(f"Move error: {str(e)}")
+        return jsonify({"error": "Failed to move store item"}), 500
+
+
+@store_bp.route('/store/order-version', methods=['GET'])
+@admin_required
+def get_store_order_version():
+    """Current ordering version, to be sent back with move/reorder (admin only)"""
+    return jsonify({"version": OrderingService.get_version(STORE_COLLECTION)}), 200
+
+
 @store_bp.route('/store/<id>', methods=['DELETE'])
 @admin_required
 def delete_store_item(id):
     """Delete store item (admin only)"""
     try:
-        result = mongo.store_items.delete_one({"_id": ObjectId(id)})
-        if result.deleted_count == 1:
+        item = mongo.store_items.find_one_and_delete(
+            {"_id": ObjectId(id)}, {"stripe_product_id": 1, "stripe_price_id": 1}
+        )
+        if item:
+            CatalogCache.invalidate(STORE_COLLECTION)
+            StripeCatalogService.enqueue_archive(item)
             return jsonify({"message": f"Store item {id} deleted successfully"}), 200
         else:
             return jsonify({"error": "Store item not found"}), 404
@@ -196,30 +284,48 @@ def reorder_store_items():
         if not isinstance(items, list):
             return jsonify({"error": "Items must be an array"}), 400
         
-        # Update display_order for each item
-        for index, item in enumerate(items):
-            item_id = item.get("id")
-            if not item_id:
-                continue
-                
-            try:
-                # Update the display_order field
-                mongo.store_items.update_one(
-                    {"_id": ObjectId(item_id)},
-                    {"$set": {"display_order": index + 1}}
-                )
-            except Exception as e:
-                print(f"Error updating item {item_id}: {str(e)}")
-                continue
+        # Rewrite display_order for all items in a single bulk_write
+        item_ids = [item.get("id") if isinstance(item, dict) else None for item in items]
+        result, status_code = OrderingService.apply_order(STORE_COLLECTION, item_ids, data.get("version"))
+        if status_code != 200:
+            return jsonify(result), status_code
+        CatalogCache.invalidate(STORE_COLLECTION)
         
-        return jsonify({"message": "Store order updated successfully"}), 200
+        return jsonify({
+            "message": "Store order updated successfully",
+            "version": result["version"],
+        }), 200
         
     except Exception as e:
         print(f"Reorder error: {str(e)}")
         return jsonify({"error": "Failed to reorder store items"}), 500
 
 
+def get_price_snapshot(product_ids):
+    """Resolve name/price for the products of a cart
+
+    Prices come from a per-worker snapshot tied to the store_items generation
+    (admin writes invalidate it); misses are loaded with a single $in query.
+
+    Args:
+        product_ids (list): Product ids as strings (already validated)
+
+    Returns:
+        dict: {product_id: {"name", "price", "stripe_price_id", ...}} for the products that exist
+    """
+    def build(keys):
+        docs = mongo.store_items.find(
+            {"_id": {"$in": [ObjectId(key[1]) for key in keys]}},
+            {"name": 1, "price": 1, "stripe_price_id": 1, "stripe_price_amount": 1, "stripe_currency": 1},
+        )
+        return {("price", str(doc["_id"])): {k: v for k, v in doc.items() if k != "_id"} for doc in docs}
+
+    snapshot = CatalogCache.get_many(STORE_COLLECTION, [("price", pid) for pid in product_ids], build)
+    return {key[1]: value for key, value in snapshot.items()}
+
+
 @store_bp.route('/store/checkout/session', methods=['POST'])
+@rate_limit("checkout")
 def create_checkout_session():
     """Create a Stripe Checkout Session for the current cart.
     Expects JSON: { items: [ { name, price, quantity } ] }
@@ -237,19 +343,27 @@ def create_checkout_session():
         if not isinstance(items, list) or len(items) == 0:
             return jsonify({"error": "items array required"}), 400
 
-        line_items = []
+        # Validar el carrito y recoger los productId antes de ir a la base de datos
+        cart = []
+        product_ids = []
         for item in items:
             qty = int(item.get("quantity", 1))
             if qty <= 0:
                 return jsonify({"error": "invalid quantity"}), 400
-
             product_id = item.get("productId") or item.get("product_id")
             if product_id:
-                # Precio seguro: leer de la base de datos
-                try:
-                    doc = mongo.store_items.find_one({"_id": ObjectId(product_id)})
-                except Exception:
+                if not ObjectId.is_valid(product_id):
                     return jsonify({"error": f"invalid productId: {product_id}"}), 400
+                product_ids.append(str(product_id))
+            cart.append((item, product_id, qty))
+
+        # Precio seguro: todo el carrito en una sola consulta (o desde el snapshot del worker)
+        prices = get_price_snapshot(product_ids) if product_ids else {}
+
+        line_items = []
+        for item, product_id, qty in cart:
+            if product_id:
+                doc = prices.get(str(product_id))
                 if not doc:
                     return jsonify({"error": f"product not found: {product_id}"}), 404
                 name = doc.get("name") or "Item"
@@ -262,6 +376,11 @@ def create_checkout_session():
                 if unit_amount < 0:
                     return jsonify({"error": "invalid price"}), 400
                 print("[checkout] productId=", product_id, "name=", name, "unit_amount=", unit_amount, "qty=", qty)
+                # Producto sincronizado con Stripe: enviar solo el Price ID
+                price_id = StripeCatalogService.checkout_price_id(doc, unit_amount, currency)
+                if price_id:
+                    line_items.append({"price": price_id, "quantity": qty})
+                    continue
                 line_items.append({
                     "price_data": {
                         "currency": currency,
@@ -322,6 +441,16 @@ def create_checkout_session():
         print("[checkout] session_id=", session.id)
         return jsonify({"id": session.id, "url": session.url}), 200
 
+    except CircuitOpenError as e:
+        # Stripe está fallando: responder rápido en vez de bloquear el worker
+        response = jsonify({"error": "Payment provider temporarily unavailable, please retry shortly"})
+        response.headers["Retry-After"] = str(e.retry_after)
+        return response, 503
+    except stripe.error.APIConnectionError as e:
+        print("[checkout][error] Stripe unreachable:", str(e))
+        response = jsonify({"error": "Payment provider temporarily unavailable, please retry shortly"})
+        response.headers["Retry-After"] = "5"
+        return response, 503
     except Exception as e:
         print("[checkout][error]", str(e))
         print(traceback.format_exc())
@@ -332,6 +461,9 @@ def create_checkout_session():
 def stripe_webhook():
     """Handle Stripe webhooks.
     Configure STRIPE_WEBHOOK_SECRET and verify signature.
+    The verified event is persisted to the job queue (keyed by event id, so
+    re-deliveries are deduplicated) and acknowledged right away; the job
+    worker (`flask jobs work` / worker.py) creates the order.
     """
     payload = request.data
     sig_header = request.headers.get('Stripe-Signature', None)
@@ -353,117 +485,182 @@ def stripe_webhook():
     if not event:
         return jsonify({"error": "No event"}), 400
 
-    if event.type == "checkout.session.completed":
+    if event.type in STRIPE_HANDLED_EVENTS:
         try:
-            session = event.data.object
-            session_id = session.get("id")
-            currency = (session.get("currency") or "eur").lower()
-            customer_details = session.get("customer_details") or {}
-            customer_email = customer_details.get("email")
-            customer_phone = customer_details.get("phone")
-            shipping = session.get("shipping") or session.get("shipping_details") or {}
-            shipping_name = shipping.get("name") if isinstance(shipping, dict) else None
-            shipping_address = None
-            addr = shipping.get("address") if isinstance(shipping, dict) else None
-            if isinstance(addr, dict):
-                shipping_address = {
-                    "line1": addr.get("line1"),
-                    "line2": addr.get("line2"),
-                    "city": addr.get("city"),
-                    "state": addr.get("state"),
-                    "postal_code": addr.get("postal_code"),
-                    "country": addr.get("country"),
-                }
-
-            # Alert/log if Stripe didn't provide an email (shouldn't happen in normal flow)
-            if not customer_email:
-                try:
-                    mongo.alerts.insert_one({
-                        "type": "missing_customer_email",
-                        "session_id": session_id,
-                        "raw_event_type": event.type,
-                        "customer_details": customer_details,
-                        "created_at": datetime.now(timezone.utc),
-                    })
-                except Exception as _e:
-                    print(f"[webhook][warn] failed to record missing email alert: {_e}")
-                print(f"[webhook][warn] missing customer_email for session {session_id}")
-
-            # Retrieve line items to store order details
-            line_items = stripe.checkout.Session.list_line_items(session_id, limit=100)
-            items = []
-            total_minor = 0
-            for li in line_items.auto_paging_iter():
-                description = li.get("description") or (li.get("price") or {}).get("nickname") or "Item"
-                quantity = li.get("quantity") or 1
-                amount_total = li.get("amount_total") or (li.get("price") or {}).get("unit_amount", 0) * quantity
-                total_minor += int(amount_total or 0)
-                items.append({
-                    "description": description,
-                    "quantity": quantity,
-                    "amount_total_minor": int(amount_total or 0),
-                })
-
-            # Generate friendly order number (atomic counter, reset per year)
-            current_year = datetime.now(timezone.utc).year
-            counter_key = f"orders_{current_year}"
-            counter_doc = mongo.counters.find_one_and_update(
-                {"_id": counter_key},
-                {"$inc": {"seq": 1}, "$setOnInsert": {"created_at": datetime.now(timezone.utc)}},
-                upsert=True,
-                return_document=ReturnDocument.AFTER,
+            JobQueue.enqueue(
+                STRIPE_EVENT_JOB,
+                {"type": event.type, "raw": payload.decode("utf-8")},
+                job_id=event.id,
             )
-            seq_num = int(counter_doc.get("seq", 1))
-            order_number = f"PED-{current_year}-{seq_num:05d}"
-
-            order_doc = {
-                "session_id": session_id,
-                "payment_status": session.get("payment_status"),
-                "currency": currency,
-                "amount_total_minor": total_minor,
-                "order_number": order_number,
-                "customer_email": customer_email,
-                "customer_phone": customer_phone,
-                "shipping_name": shipping_name,
-                "shipping_address": shipping_address,
-                "items": items,
-                "created_at": datetime.now(timezone.utc),
-                "raw": {"type": event.type},
-            }
-
-            mongo.orders.insert_one(order_doc)
         except Exception as e:
-            # Log but don't fail webhook acknowledgment
-            print(f"Order save error: {str(e)}")
-
-    elif event.type == "payment_intent.succeeded":
-        # No-op: covered by checkout.session.completed for Checkout flow
-        pass
+            # Not persisted: let Stripe retry the delivery
+            print(f"[webhook][error] failed to enqueue {event.id}: {str(e)}")
+            return jsonify({"error": "Temporary failure"}), 503
 
     return jsonify({"received": True}), 200
 
 
+def parse_order_date(value, end_of_day=False):
+    """Parse a from/to query param (YYYY-MM-DD or ISO 8601) as a UTC datetime"""
+    parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    if end_of_day and len(value.strip()) == 10:
+        parsed += timedelta(days=1)  # "to=2025-03-31" includes the whole day
+    return parsed
+
+
+def build_orders_filter(args):
+    """Orders filter from query params (email, payment_status, order_number, from, to)
+
+    Each filter is served by one of the orders_* compound indexes.
+
+    Raises:
+        ValueError: If from/to are not valid dates
+    """
+    query = {}
+    if args.get("email"):
+        query["customer_email"] = args["email"].strip().lower()
+    if args.get("payment_status"):
+        query["payment_status"] = args["payment_status"].strip()
+    if args.get("order_number"):
+        query["order_number"] = args["order_number"].strip().upper()
+    created_at = {}
+    if args.get("from"):
+        created_at["$gte"] = parse_order_date(args["from"])
+    if args.get("to"):
+        created_at["$lt"] = parse_order_date(args["to"], end_of_day=True)
+    if created_at:
+        query["created_at"] = created_at
+    return query
+
+
 @store_bp.route('/store/orders', methods=['GET'])
 @admin_required
 def list_orders():
-    """List recent orders (admin only)
+    """List recent orders (admin only), newest first
     Query params:
       - limit: max number of orders to return (default 20, max 100)
+      - page: legacy offset pagination (returns a plain list)
+    Any of these switches to cursor pagination, returning { items, next_cursor }:
+      - cursor: next_cursor of the previous page
+      - email, payment_status, order_number: exact match filters
+      - from / to: created_at range (YYYY-MM-DD or ISO 8601, "to" inclusive)
+      - view: summary (default) or full
     """
+    limit = parse_limit(request.args.get('limit'), 20, 100)
+
+    if not any(param in request.args for param in ORDERS_FILTER_PARAMS):
+        try:
+            page = int(request.args.get('page', 1))
+            page = max(1, page)
+        except Exception:
+            page = 1
+        skip = (page - 1) * limit
+
+        orders_cursor = mongo.orders.find().sort(ORDERS_SORT).skip(skip).limit(limit)
+        return Response(json_util.dumps(list(orders_cursor)), mimetype="application/json")
+
+    view = request.args.get("view", "summary")
+    if view not in ("summary", "full"):
+        return jsonify({"error": "view must be 'summary' or 'full'"}), 400
+
     try:
-        limit = int(request.args.get('limit', 20))
-        limit = max(1, min(limit, 100))
-    except Exception:
-        limit = 20
+        query = build_orders_filter(request.args)
+    except ValueError:
+        return jsonify({"error": "from/to must be dates (YYYY-MM-DD or ISO 8601)"}), 400
+
+    cursor_token = request.args.get("cursor")
+    if cursor_token:
+        try:
+            after = keyset_filter(ORDERS_SORT, decode_cursor(cursor_token, len(ORDERS_SORT)))
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+        query = {"$and": [query, after]} if query else after
+
+    projection = ORDERS_SUMMARY_PROJECTION if view == "summary" else None
+    docs = list(mongo.orders.find(query, projection).sort(ORDERS_SORT).limit(limit + 1))
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_cursor = encode_cursor([last.get("created_at"), last["_id"]])
+    return Response(json_util.dumps({"items": docs, "next_cursor": next_cursor}), mimetype="application/json")
+
+
+def order_export_row(order):
+    """Flatten an order for export: shipping_address.* columns, items as text"""
+    items = order.pop("items", None) or []
+    row = flatten(order)
+    row["items_count"] = sum(int(item.get("quantity") or 1) for item in items)
+    row["items"] = " | ".join(
+        f"{item.get('description') or 'Item'} x{item.get('quantity') or 1} ({item.get('amount_total_minor') or 0})"
+        for item in items
+    )
+    return row
+
+
+def export_response(collection, query, sort, columns, to_row, filename):
+    """Stream a collection as CSV/NDJSON (format query param, default csv)
+
+    Documents are read through a batched cursor and serialized in chunks, so
+    memory stays flat regardless of the number of rows.
+    """
+    fmt = request.args.get("format", "csv").lower()
+    if fmt not in EXPORT_MIMETYPES:
+        return jsonify({"error": "format must be 'csv' or 'ndjson'"}), 400
+
+    batch_size = current_app.config['EXPORT_BATCH_SIZE']
+
+    def rows():
+        cursor = mongo[collection].find(query).sort(sort).batch_size(batch_size)
+        try:
+            for doc in cursor:
+                yield to_row(doc)
+        finally:
+            cursor.close()
+
+    response = Response(
+        stream_with_context(stream_rows(rows(), columns, fmt)),
+        content_type=EXPORT_MIMETYPES[fmt],
+    )
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}-{stamp}.{fmt}"'
+    response.headers["X-Accel-Buffering"] = "no"  # no proxy buffering of the stream
+    return response
+
+
+@store_bp.route('/store/orders/export', methods=['GET'])
+@admin_required
+def export_orders():
+    """Export orders as CSV or NDJSON (admin only)
+    Query params: format (csv|ndjson) plus the list_orders filters
+    (email, from, to, payment_status, order_number).
+    """
     try:
-        page = int(request.args.get('page', 1))
-        page = max(1, page)
-    except Exception:
-        page = 1
-    skip = (page - 1) * limit
+        query = build_orders_filter(request.args)
+    except ValueError:
+        return jsonify({"error": "from/to must be dates (YYYY-MM-DD or ISO 8601)"}), 400
+    return export_response("orders", query, ORDERS_SORT, ORDERS_EXPORT_COLUMNS, order_export_row, "orders")
+
+
+@store_bp.route('/store/subscribers/export', methods=['GET'])
+@admin_required
+def export_subscribers():
+    """Export newsletter subscribers as CSV or NDJSON (admin only)"""
+    return export_response("subscribers", {}, [("_id", 1)], SUBSCRIBERS_EXPORT_COLUMNS, flatten, "subscribers")
 
-    orders_cursor = mongo.orders.find().sort([("created_at", -1)]).skip(skip).limit(limit)
-    return Response(json_util.dumps(list(orders_cursor)), mimetype="application/json")
+
+@store_bp.route('/store/orders/<id>', methods=['GET'])
+@admin_required
+def get_order(id):
+    """Get a full order by id (admin only)"""
+    if not ObjectId.is_valid(id):
+        return jsonify({"error": "Invalid order ID"}), 400
+    doc = mongo.orders.find_one({"_id": ObjectId(id)})
+    if not doc:
+        return jsonify({"error": "Order not found"}), 404
+    return Response(json_util.dumps(doc), mimetype="application/json")
 
 
 @store_bp.route('/store/orders/by-session/<session_id>', methods=['GET'])
@@ -475,12 +672,52 @@ def get_order_by_session(session_id: str):
         doc = mongo.orders.find_one({"session_id": session_id})
         if not doc:
             return jsonify({"error": "Order not found"}), 404
-        return Response(json_util.dumps(doc), mimetype="application/json")
+        return Response(order_body(doc), mimetype="application/json")
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@store_bp.route('/store/subscribers/import', methods=['POST'])
+@admin_required
+def import_subscribers():
+    """Bulk import newsletter subscribers (admin only)
+    Body: multipart `file` or the raw file (Content-Type text/csv or
+    application/x-ndjson). CSV needs an `email` column; optional `consent`
+    and `source` columns/keys.
+    Query params: format (csv|ndjson, inferred from the upload when omitted),
+    source (default "import").
+    Returns the import report with per-row errors.
+    """
+    upload = request.files.get("file")
+    fmt = (request.args.get("format") or "").lower()
+    if not fmt:
+        name = (upload.filename if upload else "") or ""
+        content_type = (upload.mimetype if upload else request.mimetype) or ""
+        fmt = "ndjson" if name.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type else "csv"
+    if fmt not in ("csv", "ndjson"):
+        return jsonify({"error": "format must be 'csv' or 'ndjson'"}), 400
+
+    stream = upload.stream if upload else request.stream
+    source = (request.args.get("source") or "").strip() or "import"
+
+    def log_progress(report):
+        print(f"[subscribers][import] {report['rows']} rows read, {report['inserted']} inserted, "
+              f"{report['updated']} updated, {report['invalid']} invalid")
+
+    try:
+        report = SubscriberService.import_rows(
+            SubscriberService.parse_rows(stream, fmt),
+            source=source,
+            batch_size=current_app.config['SUBSCRIBER_IMPORT_BATCH_SIZE'],
+            progress=log_progress,
+        )
+    except UnicodeDecodeError:
+        return jsonify({"error": "File must be UTF-8 encoded"}), 400
+    return jsonify(report), 200
+
+
 @store_bp.route('/store/subscribe', methods=['POST'])
+@rate_limit("subscribe")
 def subscribe_newsletter():
     """Subscribe an email to the newsletter/updates list (public).
     Body JSON: { "email": string, "source": string? }
@@ -0,0 +1,50 @@
+"""
+System/diagnostics API endpoints
+"""
+
+import os
+from flask import Blueprint, jsonify, current_app
+from app import mongo
+from app.utils.decorators import admin_required
+from app.services.stripe_client import stripe_breaker, stripe_latency
+
+system_bp = Blueprint('system', __name__)
+
+
+@system_bp.route('/system/mongo-pool', methods=['GET'])
+@admin_required
+def get_mongo_pool_stats():
+    """Connection pool statistics of the worker serving the request (admin only)
+    Use them to size MONGO_MAX_POOL_SIZE: sustained waits or
+    checkout failures with reason "timeout" mean the pool is too small.
+    """
+    config = current_app.config
+    return jsonify({
+        "pid": os.getpid(),
+        "config": {
+            "max_pool_size": config['MONGO_MAX_POOL_SIZE'],
+            "min_pool_size": config['MONGO_MIN_POOL_SIZE'],
+            "wait_queue_timeout_ms": config['MONGO_WAIT_QUEUE_TIMEOUT_MS'],
+            "server_selection_timeout_ms": config['MONGO_SERVER_SELECTION_TIMEOUT_MS'],
+            "max_idle_time_ms": config['MONGO_MAX_IDLE_TIME_MS'],
+        },
+        "stats": mongo.pool_stats.snapshot(),
+    }), 200
+
+
+@system_bp.route('/system/stripe', methods=['GET'])
+@admin_required
+def get_stripe_client_stats():
+    """Stripe circuit breaker state and per call site latency of this worker (admin only)"""
+    config = current_app.config
+    return jsonify({
+        "pid": os.getpid(),
+        "config": {
+            "connect_timeout": config['STRIPE_CONNECT_TIMEOUT'],
+            "read_timeout": config['STRIPE_READ_TIMEOUT'],
+            "pool_maxsize": config['STRIPE_POOL_MAXSIZE'],
+            "max_network_retries": config['STRIPE_MAX_NETWORK_RETRIES'],
+        },
+        "breaker": stripe_breaker.snapshot(),
+        "latency": stripe_latency.snapshot(),
+    }), 200
@@ -0,0 +1,88 @@
+"""
+Streaming image upload API endpoints
+"""
+
+from tempfile import SpooledTemporaryFile
+from flask import Blueprint, request, jsonify, current_app
+from werkzeug.formparser import parse_form_data
+from app.utils.decorators import admin_required
+from app.services.cloudinary_service import CloudinaryService
+
+uploads_bp = Blueprint('uploads', __name__)
+
+# Public folder names -> Cloudinary folders
+UPLOAD_FOLDERS = {
+    "gallery": "portfolio/gallery",
+    "thumbnails": "portfolio/thumbnails",
+    "store": "store/products",
+}
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def _spool_factory(max_memory):
+    """Stream factory: keep up to max_memory bytes per file in RAM, then spill to disk"""
+    def factory(total_content_length, content_type, filename, content_length=None):
+        return SpooledTemporaryFile(max_size=max_memory, mode="rb+")
+    return factory
+
+
+def _spool_body(max_memory):
+    """Copy the raw request body into a spooled temp file, chunk by chunk"""
+    spool = SpooledTemporaryFile(max_size=max_memory, mode="rb+")
+    while True:
+        chunk = request.stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+@uploads_bp.route('/uploads', methods=['POST'])
+@admin_required
+def upload_images():
+    """Upload images without base64/JSON overhead (admin only)
+
+    Accepts either:
+      - multipart/form-data with one or more file parts (order is preserved)
+      - a raw binary body with Content-Type image/* (one image)
+    Query/form param `folder`: gallery (default), thumbnails or store.
+
+    Each file is spooled to a temp file while the body is read and then sent
+    to Cloudinary in CLOUDINARY_CHUNK_SIZE chunks, so the album is never held
+    in worker memory. Returns { "urls": [...] } in upload order; the URLs can
+    then be sent to the portfolio/store JSON endpoints.
+    """
+    config = current_app.config
+    max_memory = config['UPLOAD_SPOOL_MAX_MEMORY']
+    content_type = request.mimetype or ""
+
+    if content_type == "multipart/form-data":
+        _, form, files = parse_form_data(
+            request.environ,
+            stream_factory=_spool_factory(max_memory),
+            max_content_length=config.get('MAX_CONTENT_LENGTH'),
+        )
+        folder_name = request.args.get("folder") or form.get("folder") or "gallery"
+        streams = [storage.stream for _, storage in files.items(multi=True) if storage.filename]
+    elif content_type.startswith("image/"):
+        folder_name = request.args.get("folder") or "gallery"
+        streams = [_spool_body(max_memory)]
+    else:
+        return jsonify({"error": "multipart/form-data or image/* body required"}), 415
+
+    folder = UPLOAD_FOLDERS.get(folder_name)
+    if not folder:
+        return jsonify({"error": f"folder must be one of: {', '.join(UPLOAD_FOLDERS)}"}), 400
+    if not streams:
+        return jsonify({"error": "No files received"}), 400
+
+    try:
+        urls, error_index = CloudinaryService.upload_images([(stream, folder) for stream in streams])
+    finally:
+        for stream in streams:
+            stream.close()
+    if error_index is not None:
+        return jsonify({"error": f"Failed to upload image #{error_index + 1}"}), 500
+
+    return jsonify({"urls": urls}), 201
@@ -0,0 +1,192 @@
+"""
+Async read API for the public catalog (ASGI)
+
+The public GET endpoints (portfolio, store, order summary by session) are
+pure I/O and carry almost all of the traffic. Here they run on one event
+loop with the motor driver, so a worker holds thousands of concurrent (slow)
+clients without more threads or processes. Every other request falls
+through to the Flask app, run by WsgiToAsgi in a thread pool.
+
+Bodies come from app/api/serializers.py and the CatalogCache is the same
+one the Flask views use, so both paths return identical responses (and
+ETags), and admin writes made through Flask invalidate this API too.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from functools import wraps
+from asgiref.wsgi import WsgiToAsgi
+from bson.objectid import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from starlette.applications import Starlette
+from starlette.convertors import Convertor, register_url_convertor
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Mount, Route
+from werkzeug.http import parse_accept_header, parse_etags
+from app.api.portfolio import PORTFOLIO_COLLECTION
+from app.api.serializers import (
+    PORTFOLIO_SORT, PORTFOLIO_PAGE_PARAMS, STORE_SORT, STORE_PUBLIC_PROJECTION, parse_portfolio_page,
+    portfolio_list_body, portfolio_page_body, portfolio_item_body,
+    store_list_body, store_item_body, order_body,
+)
+from app.api.store import STORE_COLLECTION
+from app.services.catalog_cache import CatalogCache
+from app.utils.http_cache import negotiate
+
+
+class ObjectIdConvertor(Convertor):
+    """Only 24-hex ids match, so /api/store/orders etc. reach the Flask routes"""
+
+    regex = "[0-9a-fA-F]{24}"
+
+    def convert(self, value):
+        return ObjectId(value)
+
+    def to_string(self, value):
+        return str(value)
+
+
+register_url_convertor("objectid", ObjectIdConvertor())
+
+
+def create_asgi_app(flask_app):
+    """Compose the async catalog routes with the Flask app
+
+    Args:
+        flask_app (Flask): Application from create_app(); serves every other route
+
+    Returns:
+        Starlette: ASGI application
+    """
+    config = flask_app.config
+    origins = set(config['CORS_ORIGINS'])
+
+    @asynccontextmanager
+    async def lifespan(app):
+        # One motor client per worker process, bound to its event loop
+        client = AsyncIOMotorClient(
+            config['MONGO_CLUSTER'],
+            maxPoolSize=config['ASYNC_MONGO_MAX_POOL_SIZE'],
+            minPoolSize=config['MONGO_MIN_POOL_SIZE'],
+            maxIdleTimeMS=config['MONGO_MAX_IDLE_TIME_MS'],
+            waitQueueTimeoutMS=config['MONGO_WAIT_QUEUE_TIMEOUT_MS'],
+            serverSelectionTimeoutMS=config['MONGO_SERVER_SELECTION_TIMEOUT_MS'],
+            connectTimeoutMS=config['MONGO_CONNECT_TIMEOUT_MS'],
+            socketTimeoutMS=config['MONGO_SOCKET_TIMEOUT_MS'],
+        )
+        app.state.db = client[config['MONGO_DB_NAME']]
+        try:
+            yield
+        finally:
+            client.close()
+
+    def endpoint(handler):
+        """Run a handler inside a Flask app context and add the CORS headers
+        Flask-CORS would (credentials allowed, per-origin)."""
+        @wraps(handler)
+        async def wrapper(request):
+            with flask_app.app_context():
+                response = await handler(request, request.app.state.db)
+            origin = request.headers.get("origin")
+            if origin in origins:
+                response.headers["Access-Control-Allow-Origin"] = origin
+                response.headers["Access-Control-Allow-Credentials"] = "true"
+                response.headers.add_vary_header("Origin")
+            return response
+        return wrapper
+
+    def cached_response(request, cached):
+        status, body, headers = negotiate(
+            cached,
+            parse_etags(request.headers.get("if-none-match")),
+            parse_accept_header(request.headers.get("accept-encoding")),
+        )
+        return Response(body, status_code=status, headers=headers,
+                        media_type=None if status == 304 else "application/json")
+
+    # Serializing and compressing a cold body is CPU work: keep it off the loop
+    # (to_thread copies the context, so current_app is still available)
+    serialize = asyncio.to_thread
+
+    @endpoint
+    async def get_portfolio_items(request, db):
+        if not any(param in request.query_params for param in PORTFOLIO_PAGE_PARAMS):
+            async def build():
+                docs = await db.portfolio_items.find().sort(PORTFOLIO_SORT).to_list(None)
+                return await serialize(portfolio_list_body, docs)
+
+            return cached_response(request, await CatalogCache.get_or_build_async(
+                PORTFOLIO_COLLECTION, "list", build, db))
+
+        page, error = parse_portfolio_page(request.query_params, config)
+        if error:
+            return JSONResponse({"error": error}, status_code=400)
+
+        async def build_page():
+            docs = await (db.portfolio_items.find(page["query"], page["projection"])
+                          .sort(PORTFOLIO_SORT).limit(page["limit"] + 1).to_list(None))
+            return await serialize(portfolio_page_body, docs, page["limit"])
+
+        return cached_response(request, await CatalogCache.get_or_build_async(
+            PORTFOLIO_COLLECTION, page["cache_key"], build_page, db))
+
+    @endpoint
+    async def get_portfolio_item(request, db):
+        object_id = request.path_params["id"]
+
+        async def build():
+            return await serialize(portfolio_item_body, await db.portfolio_items.find_one({"_id": object_id}))
+
+        cached = await CatalogCache.get_or_build_async(PORTFOLIO_COLLECTION, ("item", str(object_id)), build, db)
+        if cached is None:
+            return JSONResponse({"error": "Portfolio item not found"}, status_code=404)
+        return cached_response(request, cached)
+
+    @endpoint
+    async def get_store_items(request, db):
+        async def build():
+            docs = await db.store_items.find({}, STORE_PUBLIC_PROJECTION).sort(STORE_SORT).to_list(None)
+            return await serialize(store_list_body, docs)
+
+        try:
+            return cached_response(request, await CatalogCache.get_or_build_async(STORE_COLLECTION, "list", build, db))
+        except Exception:
+            return JSONResponse({"error": "Failed to fetch store items"}, status_code=500)
+
+    @endpoint
+    async def get_store_item(request, db):
+        object_id = request.path_params["id"]
+
+        async def build():
+            return await serialize(store_item_body, await db.store_items.find_one({"_id": object_id}, STORE_PUBLIC_PROJECTION))
+
+        cached = await CatalogCache.get_or_build_async(STORE_COLLECTION, ("item", str(object_id)), build, db)
+        if cached is None:
+            return JSONResponse({"error": "Store item not found"}, status_code=404)
+        return cached_response(request, cached)
+
+    @endpoint
+    async def get_order_by_session(request, db):
+        try:
+            doc = await db.orders.find_one({"session_id": request.path_params["session_id"]})
+            if not doc:
+                return JSONResponse({"error": "Order not found"}, status_code=404)
+            return Response(order_body(doc), media_type="application/json")
+        except Exception as e:
+            return JSONResponse({"error": str(e)}, status_code=500)
+
+    routes = [
+        Route("/api/portfolio", get_portfolio_items, methods=["GET"]),
+        Route("/api/portfolio/{id:objectid}", get_portfolio_item, methods=["GET"]),
+        Route("/api/store", get_store_items, methods=["GET"]),
+        Route("/api/store/{id:objectid}", get_store_item, methods=["GET"]),
+        Route("/api/store/orders/by-session/{session_id}", get_order_by_session, methods=["GET"]),
+        # Everything else (writes, admin, auth, CORS preflight): the Flask app
+        Mount("/", app=WsgiToAsgi(flask_app)),
+    ]
+
+    async def internal_error(request, exc):
+        print(f"[asgi][error] {request.method} {request.url.path}: {exc!r}")
+        return JSONResponse({"message": "Internal server error", "status": 500}, status_code=500)
+
+    return Starlette(routes=routes, lifespan=lifespan, exception_handlers={500: internal_error})
@@ -0,0 +1,160 @@
+"""
+Flask CLI commands
+"""
+
+import click
+from flask.cli import AppGroup
+
+indexes_cli = AppGroup('indexes', help="Manage MongoDB indexes")
+jobs_cli = AppGroup('jobs', help="Background job queue")
+stripe_cli = AppGroup('stripe', help="Stripe integration")
+analytics_cli = AppGroup('analytics', help="Sales analytics rollups")
+subscribers_cli = AppGroup('subscribers', help="Newsletter subscribers")
+portfolio_cli = AppGroup('portfolio', help="Portfolio maintenance")
+
+
+@indexes_cli.command('list')
+def list_indexes():
+    """List the indexes declared by each blueprint"""
+    from app.services.index_registry import IndexRegistry
+    for entry in IndexRegistry.indexes():
+        document = entry["model"].document
+        options = {k: v for k, v in document.items() if k not in ("key", "name")}
+        keys = ", ".join(f"{field}:{direction}" for field, direction in document["key"].items())
+        click.echo(f"[{entry['blueprint']}] {entry['collection']}.{document['name']} ({keys}) {options or ''}")
+
+
+@indexes_cli.command('apply')
+def apply_indexes():
+    """Create all declared indexes (idempotent)"""
+    from app import mongo
+    from app.services.index_registry import IndexRegistry
+    failed = 0
+    for entry in IndexRegistry.apply(mongo):
+        status = "ok" if entry["ok"] else f"FAILED: {entry['error']}"
+        failed += 0 if entry["ok"] else 1
+        click.echo(f"{entry['collection']}.{entry['name']}: {status}")
+    if failed:
+        raise SystemExit(1)
+
+
+@indexes_cli.command('explain')
+@click.option('--strict', is_flag=True, help="Exit with status 1 if any query scans or sorts in memory")
+def explain_queries(strict):
+    """Explain every known query shape and flag COLLSCANs / in-memory sorts"""
+    from app import mongo
+    from app.services.index_registry import IndexRegistry
+    problems = 0
+    for entry in IndexRegistry.explain(mongo):
+        if entry["error"]:
+            click.echo(f"{entry['name']}: ERROR {entry['error']}")
+            problems += 1
+            continue
+        flags = []
+        if entry["collscan"]:
+            flags.append("COLLSCAN")
+        if entry["in_memory_sort"]:
+            flags.append("IN-MEMORY SORT")
+        if entry["covered"]:
+            flags.append("covered")
+        problems += 1 if entry["collscan"] or entry["in_memory_sort"] else 0
+        click.echo(f"{entry['name']}: {' > '.join(entry['stages'])} {'[' + ', '.join(flags) + ']' if flags else ''}")
+    click.echo(f"{problems} problem(s) found")
+    if strict and problems:
+        raise SystemExit(1)
+
+
+@jobs_cli.command('work')
+@click.option('--max-jobs', type=int, default=None, help="Stop after processing this many jobs")
+@click.option('--poll-interval', type=float, default=None, help="Seconds to sleep when idle")
+def work_jobs(max_jobs, poll_interval):
+    """Process queued jobs (Stripe events, ...) until stopped"""
+    from app.services.job_queue import JobQueue
+    JobQueue.work(poll_interval=poll_interval, max_jobs=max_jobs)
+
+
+@jobs_cli.command('stats')
+def job_stats():
+    """Show job counts by kind and status"""
+    from app.services.job_queue import JobQueue
+    for row in JobQueue.stats():
+        click.echo(f"{row['kind']:<24} {row['status']:<10} {row['count']}")
+
+
+@jobs_cli.command('retry-failed')
+@click.option('--kind', default=None, help="Only retry jobs of this kind")
+def retry_failed_jobs(kind):
+    """Move failed jobs back to pending (attempt counter is reset)"""
+    from datetime import datetime, timezone
+    from app import mongo
+    from app.services.job_queue import JOBS_COLLECTION
+    query = {"status": "failed"}
+    if kind:
+        query["kind"] = kind
+    result = mongo[JOBS_COLLECTION].update_many(
+        query,
+        {"$set": {"status": "pending", "attempts": 0, "run_at": datetime.now(timezone.utc)}},
+    )
+    click.echo(f"{result.modified_count} job(s) re-queued")
+
+
+@stripe_cli.command('sync-catalog')
+@click.option('--dry-run', is_flag=True, help="Only report what would be synced/archived")
+def sync_stripe_catalog(dry_run):
+    """Reconcile store items with Stripe Products/Prices"""
+    from app.services.stripe_catalog_service import StripeCatalogService
+    report = StripeCatalogService.reconcile(dry_run=dry_run)
+    prefix = "would " if dry_run else ""
+    click.echo(f"{prefix}sync {len(report['synced'])} item(s): {', '.join(report['synced'])}")
+    click.echo(f"{prefix}archive {len(report['archived'])} product(s): {', '.join(report['archived'])}")
+    for error in report["errors"]:
+        click.echo(f"ERROR {error}")
+    if report["errors"]:
+        raise SystemExit(1)
+
+
+@analytics_cli.command('backfill')
+def backfill_rollups():
+    """Rebuild the sales rollups from the whole orders history"""
+    from app.services.analytics_service import SalesRollupService
+    counts = SalesRollupService.rebuild()
+    for dim, count in counts.items():
+        click.echo(f"{dim}: {count} rollup doc(s)")
+
+
+@subscribers_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), default=None,
+              help="File format (default: from the extension)")
+@click.option('--source', default="import", help="source stored on subscribers without one")
+@click.option('--batch-size', type=int, default=None, help="Upserts per bulk_write")
+def import_subscribers(path, fmt, source, batch_size):
+    """Bulk import newsletter subscribers from a CSV/NDJSON file"""
+    from flask import current_app
+    from app.services.subscriber_service import SubscriberService
+    if fmt is None:
+        fmt = "ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv"
+
+    def show_progress(report):
+        click.echo(f"{report['rows']} rows: {report['inserted']} inserted, {report['updated']} updated, "
+                   f"{report['duplicates']} duplicates, {report['invalid']} invalid")
+
+    with open(path, "rb") as stream:
+        report = SubscriberService.import_rows(
+            SubscriberService.parse_rows(stream, fmt),
+            source=source,
+            batch_size=batch_size or current_app.config['SUBSCRIBER_IMPORT_BATCH_SIZE'],
+            progress=show_progress,
+        )
+    for error in report["errors"]:
+        click.echo(f"row {error['row']}: {error['error']} ({error['email']})")
+    show_progress(report)
+    if report["write_errors"]:
+        raise SystemExit(1)
+
+
+@portfolio_cli.command('backfill-gallery-count')
+def backfill_gallery_count():
+    """Set gallery_count on albums stored before it existed (summary view)"""
+    from app.api.portfolio import backfill_gallery_count as backfill
+    click.echo(f"{backfill()} album(s) updated")
@@ -15,6 +15,23 @@ class Config:
     # Use env SECRET_KEY in prod; otherwise generate a strong random key
     SECRET_KEY = os.getenv('SECRET_KEY') or secrets.token_urlsafe(32)
     MONGO_CLUSTER = os.getenv('ATLAS_URI')
+    MONGO_DB_NAME = os.getenv('MONGO_DB_NAME', 'marina_db')
+    # Connection pool (per worker process). Timeouts in milliseconds.
+    MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', '20'))
+    MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', '0'))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', '60000'))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', '2000'))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', '5000'))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', '0')) or None  # None = no timeout
+    # Async read API (asgi.py): motor pool shared by all requests on the event loop
+    ASYNC_MONGO_MAX_POOL_SIZE = int(os.getenv('ASYNC_MONGO_MAX_POOL_SIZE', '100'))
+    # Frontends allowed to call /api/* (comma separated)
+    CORS_ORIGINS = [
+        origin.strip()
+        for origin in os.getenv('CORS_ORIGINS', 'http://localhost:5173,https://marina-ibarra.netlify.app').split(',')
+        if origin.strip()
+    ]
     JWT_SECRET_KEY = os.getenv('JWT_SECRET')
     # Increase access token lifetime to reduce unexpected logouts
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=8)
@@ -35,6 +52,108 @@ class Config:
     
     # Admin creation
     ADMIN_CREATION_KEY = os.getenv('ADMIN_CREATION_KEY')
+    
+    # JWT authorization: per-worker cache of {role, security_version} by email
+    AUTH_STATE_CACHE_TTL = float(os.getenv('AUTH_STATE_CACHE_TTL', '30'))  # seconds
+    AUTH_STATE_CACHE_SIZE = int(os.getenv('AUTH_STATE_CACHE_SIZE', '1024'))
+
+    # Password hashing: werkzeug method (older hashes are upgraded on login),
+    # processes per worker (0 = hash on the request thread), seconds to wait
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:260000')
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '1'))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', '10'))
+
+    # Rate limiting of public write endpoints (token bucket, "<count>/<period>",
+    # "0" disables a bucket). mongo = shared by all workers, memory = per process
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'mongo').lower()
+    # Proxies in front of the app that append to X-Forwarded-For (Render: 1)
+    RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv('RATE_LIMIT_TRUSTED_PROXIES', '1'))
+    RATE_LIMITS = {
+        "token:ip": os.getenv('RATE_LIMIT_TOKEN_IP', '20/minute'),
+        "token:email": os.getenv('RATE_LIMIT_TOKEN_EMAIL', '5/minute'),
+        "subscribe:ip": os.getenv('RATE_LIMIT_SUBSCRIBE_IP', '10/minute'),
+        "checkout:ip": os.getenv('RATE_LIMIT_CHECKOUT_IP', '20/minute'),
+    }
+
+    # Create declared indexes when the app starts (also: `flask indexes apply`)
+    AUTO_CREATE_INDEXES = os.getenv('AUTO_CREATE_INDEXES', 'true').lower() == 'true'
+
+    # Background job queue (Stripe webhook outbox)
+    JOB_QUEUE_INLINE = os.getenv('JOB_QUEUE_INLINE', 'false').lower() == 'true'  # dev: process in-request
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '8'))
+    JOB_BACKOFF_BASE = float(os.getenv('JOB_BACKOFF_BASE', '5'))  # seconds, doubled per attempt
+    JOB_BACKOFF_MAX = float(os.getenv('JOB_BACKOFF_MAX', '900'))
+    JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', '120'))
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '1.0'))
+    # Order numbers (PED-YYYY-NNNNN): 'gapless' = one counter round-trip per order;
+    # 'block' = each worker reserves ORDER_NUMBER_BLOCK_SIZE numbers at once
+    # (unused numbers of a block are lost when the worker stops)
+    ORDER_NUMBER_MODE = os.getenv('ORDER_NUMBER_MODE', 'gapless').lower()
+    ORDER_NUMBER_BLOCK_SIZE = int(os.getenv('ORDER_NUMBER_BLOCK_SIZE', '20'))
+
+    # Stripe SDK. STRIPE_API_BASE points it at a stand-in such as stripe-mock
+    # (http://localhost:12111)
+    STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY', '')
+    STRIPE_API_BASE = os.getenv('STRIPE_API_BASE')
+    # HTTP client (per worker): timeouts in seconds, keep-alive connections per thread
+    STRIPE_CONNECT_TIMEOUT = float(os.getenv('STRIPE_CONNECT_TIMEOUT', '3'))
+    STRIPE_READ_TIMEOUT = float(os.getenv('STRIPE_READ_TIMEOUT', '15'))
+    STRIPE_POOL_MAXSIZE = int(os.getenv('STRIPE_POOL_MAXSIZE', '10'))
+    STRIPE_MAX_NETWORK_RETRIES = int(os.getenv('STRIPE_MAX_NETWORK_RETRIES', '1'))
+    # Circuit breaker: open when >= FAILURE_RATE of the calls in the last WINDOW
+    # seconds failed (with at least MIN_CALLS calls); stay open COOLDOWN seconds
+    STRIPE_BREAKER_FAILURE_RATE = float(os.getenv('STRIPE_BREAKER_FAILURE_RATE', '0.5'))
+    STRIPE_BREAKER_MIN_CALLS = int(os.getenv('STRIPE_BREAKER_MIN_CALLS', '5'))
+    STRIPE_BREAKER_WINDOW = float(os.getenv('STRIPE_BREAKER_WINDOW', '30'))
+    STRIPE_BREAKER_COOLDOWN = float(os.getenv('STRIPE_BREAKER_COOLDOWN', '20'))
+    # Catalog sync (store_items -> Products/Prices)
+    STRIPE_CURRENCY = os.getenv('STRIPE_CURRENCY', 'eur').lower()
+    STRIPE_CATALOG_SYNC = os.getenv('STRIPE_CATALOG_SYNC', 'true').lower() == 'true'
+
+    # Public catalog cache (per worker, invalidated through a generation counter)
+    CATALOG_CACHE_ENABLED = os.getenv('CATALOG_CACHE_ENABLED', 'true').lower() == 'true'
+    CATALOG_VERSION_CHECK_INTERVAL = float(os.getenv('CATALOG_VERSION_CHECK_INTERVAL', '1.0'))  # seconds
+    CATALOG_CACHE_MAX_ENTRIES = int(os.getenv('CATALOG_CACHE_MAX_ENTRIES', '256'))  # per collection
+
+    # Precompressed response bodies (computed once per catalog generation)
+    HTTP_COMPRESS_MIN_SIZE = int(os.getenv('HTTP_COMPRESS_MIN_SIZE', '512'))  # bytes
+    HTTP_GZIP_LEVEL = int(os.getenv('HTTP_GZIP_LEVEL', '6'))
+    HTTP_BROTLI_QUALITY = int(os.getenv('HTTP_BROTLI_QUALITY', '9'))
+
+    # Request timing: Server-Timing header (mongo/stripe/cloudinary/json/app)
+    # and per-route Prometheus metrics at /metrics. /metrics requires the bearer
+    # METRICS_TOKEN; without one it is only served in development (DEBUG)
+    SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'true').lower() == 'true'
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+    # Manual ordering (portfolio/store): spacing between display_order keys
+    ORDER_KEY_GAP = int(os.getenv('ORDER_KEY_GAP', '1024'))
+
+    # Portfolio keyset pagination
+    PORTFOLIO_PAGE_SIZE = int(os.getenv('PORTFOLIO_PAGE_SIZE', '24'))
+    PORTFOLIO_PAGE_MAX = int(os.getenv('PORTFOLIO_PAGE_MAX', '100'))
+
+    # CSV/NDJSON exports: documents fetched per cursor batch
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))
+    # Subscriber bulk import: upserts per unordered bulk_write
+    SUBSCRIBER_IMPORT_BATCH_SIZE = int(os.getenv('SUBSCRIBER_IMPORT_BATCH_SIZE', '1000'))
+
+    # Cloudinary: max parallel uploads per request (album create/update)
+    CLOUDINARY_UPLOAD_CONCURRENCY = int(os.getenv('CLOUDINARY_UPLOAD_CONCURRENCY', '4'))
+    # Cloudinary HTTP: keep-alive connections per worker (shared by all threads) and timeouts (seconds)
+    CLOUDINARY_POOL_MAXSIZE = int(os.getenv('CLOUDINARY_POOL_MAXSIZE', '16'))
+    CLOUDINARY_CONNECT_TIMEOUT = float(os.getenv('CLOUDINARY_CONNECT_TIMEOUT', '5'))
+    CLOUDINARY_READ_TIMEOUT = float(os.getenv('CLOUDINARY_READ_TIMEOUT', '60'))
+    # Skip uploads whose bytes were already uploaded (SHA-256 -> asset in image_hashes)
+    IMAGE_DEDUP_ENABLED = os.getenv('IMAGE_DEDUP_ENABLED', 'true').lower() == 'true'
+
+    # Streaming uploads (multipart/binary): bytes sent to Cloudinary per chunk
+    # (min 5MB) and bytes kept in RAM per file before spooling to a temp file
+    CLOUDINARY_CHUNK_SIZE = int(os.getenv('CLOUDINARY_CHUNK_SIZE', str(6 * 1024 * 1024)))
+    UPLOAD_SPOOL_MAX_MEMORY = int(os.getenv('UPLOAD_SPOOL_MAX_MEMORY', str(512 * 1024)))
+    MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', '0')) or None
 
 
 class DevelopmentConfig(Config):
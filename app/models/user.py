@@ -2,10 +2,10 @@
 User model and related functions
 """
 
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask import current_app
 from app import mongo
 from app.utils.validators import validate_password, validate_email
+from app.services.password_hasher import PasswordHasher
 
 
 class UserModel:
@@ -44,7 +44,7 @@ class UserModel:
                 role = current_app.config['ROLE_ADMIN']
             
             # Create user with hashed password
-            hashed_password = generate_password_hash(password)
+            hashed_password = PasswordHasher.hash(password)
             result = mongo.users.insert_one({
                 "username": username,
                 "email": email,
@@ -52,6 +52,9 @@ class UserModel:
                 "role": role,
                 "created_at": "now"
             })
+            # Drop a cached "no such user" (e.g. the email was deleted before)
+            from app.services.auth_service import AuthService
+            AuthService.invalidate_security_state(email)
             
             return {
                 "message": "User created successfully",
@@ -80,9 +83,22 @@ class UserModel:
             if not user:
                 return None
             
-            if check_password_hash(user["password"], password):
-                return user
-            return None
+            if not PasswordHasher.verify(user.get("password"), password):
+                return None
+            
+            # Upgrade hashes made with an older method/cost (same password,
+            # so the security version and issued tokens are unaffected)
+            if PasswordHasher.needs_rehash(user["password"]):
+                try:
+                    new_hash = PasswordHasher.hash(password)
+                    mongo.users.update_one(
+                        {"_id": user["_id"], "password": user["password"]},
+                        {"$set": {"password": new_hash}},
+                    )
+                    user["password"] = new_hash
+                except Exception as e:
+                    print(f"[auth][warn] password rehash failed for {email}: {e}")
+            return user
             
         except Exception:
             return None
@@ -119,6 +135,9 @@ class UserModel:
     def update_user(user_id, update_data):
         """Update user information
         
+        Changes to role, email or password bump the user's security_version,
+        which revokes JWTs issued before the change.
+        
         Args:
             user_id (str): User's ObjectId as string
             update_data (dict): Fields to update
@@ -127,15 +146,27 @@ class UserModel:
             bool: True if update successful
         """
         from bson.objectid import ObjectId
+        from app.services.auth_service import AuthService
         try:
+            current = mongo.users.find_one({"_id": ObjectId(user_id)}, {"email": 1, "role": 1})
+            if not current:
+                return False
+            
             # Hash password if provided
             if 'password' in update_data:
-                update_data['password'] = generate_password_hash(update_data['password'])
+                update_data['password'] = PasswordHasher.hash(update_data['password'])
             
-            result = mongo.users.update_one(
-                {"_id": ObjectId(user_id)},
-                {"$set": update_data}
+            update = {"$set": update_data}
+            security_change = (
+                'password' in update_data
+                or update_data.get('role', current.get('role')) != current.get('role')
+                or update_data.get('email', current.get('email')) != current.get('email')
             )
+            if security_change:
+                update["$inc"] = {"security_version": 1}
+            
+            result = mongo.users.update_one({"_id": ObjectId(user_id)}, update)
+            AuthService.invalidate_security_state(current.get('email'), update_data.get('email'))
             # Consider matched but not modified as success (no-op updates)
             return result.matched_count > 0
         except:
@@ -152,9 +183,13 @@ class UserModel:
             bool: True if deletion successful
         """
         from bson.objectid import ObjectId
+        from app.services.auth_service import AuthService
         try:
-            result = mongo.users.delete_one({"_id": ObjectId(user_id)})
-            return result.deleted_count > 0
+            user = mongo.users.find_one_and_delete({"_id": ObjectId(user_id)}, projection={"email": 1})
+            if not user:
+                return False
+            AuthService.invalidate_security_state(user.get('email'))
+            return True
         except:
             return False
     
@@ -0,0 +1,277 @@
+"""
+Sales analytics: rollups maintained incrementally from the order path
+"""
+
+from datetime import datetime, timedelta, timezone
+from pymongo import UpdateOne
+from app import mongo
+from app.services.index_registry import IndexRegistry
+
+ROLLUPS_COLLECTION = "sales_rollups"
+ROLLUP_DIMENSIONS = ("total", "product", "country")
+# Orders that count as revenue
+PAID_STATUSES = ("paid", "no_payment_required")
+# A worker that crashed while recording an order loses its claim after this
+ROLLUP_CLAIM_SECONDS = 300
+
+IndexRegistry.declare_index('analytics', ROLLUPS_COLLECTION, [("dim", 1), ("day", 1)], name="sales_rollups_dim_day")
+IndexRegistry.declare_query('sales_rollups.range', ROLLUPS_COLLECTION,
+                            {"dim": "product", "day": {"$gte": "2025-01-01", "$lte": "2025-12-31"}},
+                            sort=[("day", 1)])
+
+
+class SalesRollupService:
+    """Per-day sales rollups in `sales_rollups`.
+
+    One document per (day, dimension, key, currency):
+      - _id: "<YYYY-MM-DD>|<dim>|<key>|<currency>"
+      - dim: total (key "all") / product (item description) / country
+      - orders, units, revenue_minor: counters ($inc)
+      - pending_orders: orders being recorded right now (idempotency guard)
+
+    New paid orders are added with guarded $inc updates (`rolled_up` on the
+    order marks them as counted); `rebuild` recomputes the whole collection
+    from `orders` with an aggregation pipeline.
+    """
+
+    @staticmethod
+    def _day(created_at):
+        return (created_at or datetime.now(timezone.utc)).strftime("%Y-%m-%d")
+
+    @staticmethod
+    def _increments(order_id, day, dim, key, currency, orders, units, revenue_minor):
+        """Create the rollup document if needed, then $inc it unless this order is pending in it"""
+        rollup_id = f"{day}|{dim}|{key}|{currency}"
+        create = UpdateOne(
+            {"_id": rollup_id},
+            {"$setOnInsert": {"day": day, "dim": dim, "key": key, "currency": currency,
+                              "orders": 0, "units": 0, "revenue_minor": 0}},
+            upsert=True,
+        )
+        increment = UpdateOne(
+            {"_id": rollup_id, "pending_orders": {"$ne": order_id}},
+            {
+                "$inc": {"orders": orders, "units": units, "revenue_minor": revenue_minor},
+                "$push": {"pending_orders": order_id},
+            },
+        )
+        return rollup_id, create, increment
+
+    @staticmethod
+    def _order_increments(order):
+        """Rollup updates for one order; line items of the same product are merged"""
+        order_id = order["_id"]
+        day = SalesRollupService._day(order.get("created_at"))
+        currency = order.get("currency") or "eur"
+        items = order.get("items") or []
+        units = sum(int(item.get("quantity") or 1) for item in items)
+        country = (order.get("shipping_address") or {}).get("country") or "unknown"
+        amount = int(order.get("amount_total_minor") or 0)
+
+        products = {}  # key -> [units, revenue_minor]
+        for item in items:
+            product = products.setdefault(item.get("description") or "Item", [0, 0])
+            product[0] += int(item.get("quantity") or 1)
+            product[1] += int(item.get("amount_total_minor") or 0)
+
+        updates = [
+            SalesRollupService._increments(order_id, day, "total", "all", currency, 1, units, amount),
+            SalesRollupService._increments(order_id, day, "country", country, currency, 1, units, amount),
+        ]
+        for key, (product_units, revenue_minor) in products.items():
+            updates.append(SalesRollupService._increments(
+                order_id, day, "product", key, currency, 1, product_units, revenue_minor,
+            ))
+        return updates
+
+    @staticmethod
+    def record_order(order):
+        """Add a stored order to the rollups (exactly once per order)
+
+        The caller first claims the order (`rollup_claimed_at`), so only one
+        worker applies it at a time; a claim left by a crashed worker expires
+        after ROLLUP_CLAIM_SECONDS. While the order is being applied its id
+        sits in `pending_orders` of each rollup document it touches, and the
+        $inc only matches documents where it is not pending yet, so a retry
+        after a partial failure only applies the missing increments. Once the
+        order is flagged `rolled_up` the flag is the guard and the id is
+        pulled again, which keeps `pending_orders` down to in-flight orders.
+
+        Args:
+            order (dict): Order document (with _id)
+
+        Returns:
+            bool: True if the rollups were updated
+        """
+        if order.get("payment_status") not in PAID_STATUSES or order.get("rolled_up"):
+            return False
+
+        order_id = order["_id"]
+        now = datetime.now(timezone.utc)
+        claimed = mongo.orders.update_one(
+            {"_id": order_id, "rolled_up": {"$ne": True},
+             "$or": [{"rollup_claimed_at": None},
+                     {"rollup_claimed_at": {"$lt": now - timedelta(seconds=ROLLUP_CLAIM_SECONDS)}}]},
+            {"$set": {"rollup_claimed_at": now}},
+        )
+        if not claimed.modified_count:
+            return False  # already rolled up, or another worker is on it
+
+        updates = SalesRollupService._order_increments(order)
+        try:
+            # Two unordered batches: every document exists before any guarded $inc
+            mongo[ROLLUPS_COLLECTION].bulk_write([create for _, create, _ in updates], ordered=False)
+            mongo[ROLLUPS_COLLECTION].bulk_write([increment for _, _, increment in updates], ordered=False)
+        except Exception:
+            # Let the next attempt (e.g. a webhook retry) take over right away
+            mongo.orders.update_one({"_id": order_id, "rollup_claimed_at": now},
+                                    {"$unset": {"rollup_claimed_at": ""}})
+            raise
+        mongo.orders.update_one(
+            {"_id": order_id},
+            {"$set": {"rolled_up": True, "rolled_up_at": datetime.now(timezone.utc)},
+             "$unset": {"rollup_claimed_at": ""}},
+        )
+        mongo[ROLLUPS_COLLECTION].update_many(
+            {"_id": {"$in": [rollup_id for rollup_id, _, _ in updates]}},
+            {"$pull": {"pending_orders": order_id}},
+        )
+        return True
+
+    @staticmethod
+    def _pipelines(cutoff):
+        """One aggregation per dimension over the paid orders up to `cutoff` (_id)"""
+        day = {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}}
+        currency = {"$ifNull": ["$currency", "eur"]}
+        paid = {"$match": {"payment_status": {"$in": list(PAID_STATUSES)}, "_id": {"$lte": cutoff}}}
+        # OrderService always stores items[].quantity
+        with_units = {"$addFields": {"_units": {"$sum": "$items.quantity"}}}
+
+        def finish(dim):
+            return [
+                {"$project": {
+                    "_id": {"$concat": ["$_id.day", f"|{dim}|", {"$toString": "$_id.key"}, "|", "$_id.currency"]},
+                    "day": "$_id.day", "dim": dim, "key": "$_id.key", "currency": "$_id.currency",
+                    "orders": 1, "units": 1, "revenue_minor": 1,
+                }},
+            ]
+
+        total = [
+            paid,
+            with_units,
+            {"$group": {"_id": {"day": day, "key": "all", "currency": currency},
+                        "orders": {"$sum": 1}, "units": {"$sum": "$_units"},
+                        "revenue_minor": {"$sum": {"$ifNull": ["$amount_total_minor", 0]}}}},
+        ] + finish("total")
+        country = [
+            paid,
+            with_units,
+            {"$group": {"_id": {"day": day, "key": {"$ifNull": ["$shipping_address.country", "unknown"]},
+                                "currency": currency},
+                        "orders": {"$sum": 1}, "units": {"$sum": "$_units"},
+                        "revenue_minor": {"$sum": {"$ifNull": ["$amount_total_minor", 0]}}}},
+        ] + finish("country")
+        # Per order and product first, so an order counts once per product
+        # even with several line items of it (as in record_order)
+        product = [
+            paid,
+            {"$unwind": "$items"},
+            {"$group": {"_id": {"order": "$_id", "day": day, "key": {"$ifNull": ["$items.description", "Item"]},
+                                "currency": currency},
+                        "units": {"$sum": {"$ifNull": ["$items.quantity", 1]}},
+                        "revenue_minor": {"$sum": {"$ifNull": ["$items.amount_total_minor", 0]}}}},
+            {"$group": {"_id": {"day": "$_id.day", "key": "$_id.key", "currency": "$_id.currency"},
+                        "orders": {"$sum": 1}, "units": {"$sum": "$units"},
+                        "revenue_minor": {"$sum": "$revenue_minor"}}},
+        ] + finish("product")
+        return {"total": total, "country": country, "product": product}
+
+    @staticmethod
+    def rebuild():
+        """Recompute all rollups from the orders history
+
+        Aggregates the orders up to a cutoff (the newest _id when the rebuild
+        starts) into a staging collection, then swaps it in with a single
+        rename, so readers never see partial rollups. Orders stored after the
+        cutoff are not in the staging data, and whatever record_order added
+        for them before the swap went to the replaced collection: they are
+        replayed through record_order once the new rollups are live.
+
+        Returns:
+            dict: Number of rollup documents per dimension
+        """
+        staging = f"{ROLLUPS_COLLECTION}_rebuild"
+        paid = {"payment_status": {"$in": list(PAID_STATUSES)}}
+        mongo[staging].drop()
+        # The staging collection replaces the live one: give it the same indexes
+        for entry in IndexRegistry.indexes():
+            if entry["collection"] == ROLLUPS_COLLECTION:
+                mongo[staging].create_indexes([entry["model"]])
+        last = mongo.orders.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+        cutoff = last["_id"] if last else None
+        if cutoff is not None:
+            for dim, pipeline in SalesRollupService._pipelines(cutoff).items():
+                mongo.orders.aggregate(pipeline + [
+                    {"$merge": {"into": staging, "whenMatched": "replace", "whenNotMatched": "insert"}},
+                ])
+        counts = {dim: mongo[staging].count_documents({"dim": dim}) for dim in ROLLUP_DIMENSIONS}
+        swapped_at = datetime.now(timezone.utc)
+        if sum(counts.values()):
+            mongo[staging].rename(ROLLUPS_COLLECTION, dropTarget=True)
+        else:
+            mongo[staging].drop()
+            mongo[ROLLUPS_COLLECTION].delete_many({})
+
+        late = dict(paid)
+        if cutoff is not None:
+            mongo.orders.update_many(dict(paid, _id={"$lte": cutoff}),
+                                     {"$set": {"rolled_up": True, "rolled_up_at": swapped_at}})
+            late["_id"] = {"$gt": cutoff}
+        # Late orders not rolled up yet, or rolled up into the replaced collection
+        late["$or"] = [{"rolled_up": {"$ne": True}}, {"rolled_up_at": {"$lt": swapped_at}}]
+        for order in mongo.orders.find(late):
+            mongo.orders.update_one({"_id": order["_id"], "rolled_up_at": order.get("rolled_up_at")},
+                                    {"$unset": {"rolled_up": "", "rolled_up_at": ""}})
+            order.pop("rolled_up", None)
+            SalesRollupService.record_order(order)
+        return counts
+
+    @staticmethod
+    def query(dim, date_from=None, date_to=None, currency=None, group_by_day=True):
+        """Read rollups for a dimension
+
+        Args:
+            dim (str): total / product / country
+            date_from, date_to (str): Inclusive YYYY-MM-DD bounds
+            currency (str): Only this currency
+            group_by_day (bool): One row per day and key; False sums the range per key
+
+        Returns:
+            list: Rollup rows
+        """
+        query = {"dim": dim}
+        if date_from or date_to:
+            query["day"] = {}
+            if date_from:
+                query["day"]["$gte"] = date_from
+            if date_to:
+                query["day"]["$lte"] = date_to
+        if currency:
+            query["currency"] = currency
+
+        projection = {"_id": 0, "day": 1, "key": 1, "currency": 1, "orders": 1, "units": 1, "revenue_minor": 1}
+        if group_by_day:
+            return list(mongo[ROLLUPS_COLLECTION].find(query, projection).sort([("day", 1), ("key", 1)]))
+
+        pipeline = [
+            {"$match": query},
+            {"$group": {"_id": {"key": "$key", "currency": "$currency"},
+                        "orders": {"$sum": "$orders"}, "units": {"$sum": "$units"},
+                        "revenue_minor": {"$sum": "$revenue_minor"}}},
+            {"$sort": {"revenue_minor": -1}},
+        ]
+        return [
+            {"key": row["_id"]["key"], "currency": row["_id"]["currency"], "orders": row["orders"],
+             "units": row["units"], "revenue_minor": row["revenue_minor"]}
+            for row in mongo[ROLLUPS_COLLECTION].aggregate(pipeline)
+        ]
@@ -3,14 +3,120 @@ Authentication service
 """
 
 import os
+import threading
 from flask import current_app
 from flask_jwt_extended import create_access_token, create_refresh_token, decode_token
 from app.models.user import UserModel
+from app.utils.ttl_cache import TTLCache
+
+# email -> {"uid", "role", "sv"}; per worker, refreshed every AUTH_STATE_CACHE_TTL seconds
+_security_state_cache = None
+_security_state_lock = threading.Lock()
 
 
 class AuthService:
     """Service for handling authentication logic"""
     
+    @staticmethod
+    def build_claims(user):
+        """JWT claims used for authorization without re-reading the user
+        
+        Args:
+            user (dict): User document
+            
+        Returns:
+            dict: {"uid": str, "role": str, "sv": int} (sv = security version)
+        """
+        return {
+            "uid": str(user["_id"]),
+            "role": user.get("role", current_app.config['ROLE_USER']),
+            "sv": int(user.get("security_version", 0)),
+        }
+    
+    @staticmethod
+    def issue_access_token(user):
+        """Create an access token bound to the user's id and security version"""
+        return create_access_token(identity=user["email"], additional_claims=AuthService.build_claims(user))
+    
+    @staticmethod
+    def issue_refresh_token(user):
+        """Create a refresh token bound to the user's id and security version"""
+        return create_refresh_token(identity=user["email"], additional_claims=AuthService.build_claims(user))
+    
+    @staticmethod
+    def _state_cache():
+        global _security_state_cache
+        if _security_state_cache is None:
+            with _security_state_lock:
+                # Threads racing here must share one cache, or invalidations are lost
+                if _security_state_cache is None:
+                    _security_state_cache = TTLCache(
+                        maxsize=current_app.config['AUTH_STATE_CACHE_SIZE'],
+                        ttl=current_app.config['AUTH_STATE_CACHE_TTL'],
+                    )
+        return _security_state_cache
+    
+    @staticmethod
+    def get_security_state(email):
+        """Current role and security version of a user, cached per worker
+        
+        Args:
+            email (str): User email (JWT identity)
+            
+        Returns:
+            dict or None: {"uid", "role", "sv"} or None if the user does not exist
+        """
+        cache = AuthService._state_cache()
+        state = cache.get(email)
+        if state is not None:
+            return state or None
+        
+        user = UserModel.get_user_by_email(email)
+        state = AuthService.build_claims(user) if user else {}
+        cache.set(email, state)
+        return state or None
+    
+    @staticmethod
+    def invalidate_security_state(*emails):
+        """Drop cached security state (this worker) after a user change"""
+        if _security_state_cache is None:
+            return
+        for email in emails:
+            if email:
+                _security_state_cache.pop(email)
+    
+    @staticmethod
+    def authorize_claims(email, claims, allowed_roles=None):
+        """Authorize a request from its JWT claims
+        
+        The role is always the user's current one (cached per worker), never
+        the one embedded in the token. The token must belong to the same user
+        document (uid) and carry its current security version, so role
+        changes, password resets and deletions revoke older tokens within
+        AUTH_STATE_CACHE_TTL seconds (immediately in the worker that made the
+        change), and a user re-created with the same email does not inherit
+        them. Tokens issued before these claims existed skip those checks.
+        
+        Args:
+            email (str): JWT identity
+            claims (dict): Decoded JWT claims
+            allowed_roles (list): Roles allowed, None for any existing user
+            
+        Returns:
+            tuple: (is_allowed: bool, error_message: str, status_code: int)
+        """
+        state = AuthService.get_security_state(email)
+        if not state:
+            return False, "Valid user account required", 403
+        if "uid" in claims and claims["uid"] != state["uid"]:
+            return False, "Token revoked, please log in again", 401
+        if "sv" in claims and claims["sv"] != state["sv"]:
+            return False, "Token revoked, please log in again", 401
+        
+        if allowed_roles is not None and state["role"] not in allowed_roles:
+            return False, "Admin access required", 403
+        return True, "", 200
+    
     @staticmethod
     def create_token(email, password):
         """Create JWT token for user
@@ -30,8 +136,8 @@ class AuthService:
         if not user:
             return {"msg": "Wrong email or password"}, 401
         
-        access_token = create_access_token(identity=email)
-        refresh_token = create_refresh_token(identity=email)
+        access_token = AuthService.issue_access_token(user)
+        refresh_token = AuthService.issue_refresh_token(user)
         response = {
             "access_token": access_token,
             "refresh_token": refresh_token,
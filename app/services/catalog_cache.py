@@ -0,0 +1,214 @@
+"""
+Catalog cache service for the public read endpoints
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from pymongo import ReturnDocument
+from app import mongo
+
+
+class CatalogCache:
+    """Per-worker cache of serialized catalog responses.
+
+    Every cached body is tagged with the generation counter of its collection,
+    stored in Mongo (`counters` collection, `_id: catalog_<collection>`).
+    Admin mutations bump the counter, so every worker notices the new
+    generation on its next version check and drops its stale copies.
+    """
+
+    _lock = threading.Lock()
+    _entries = {}      # collection -> {"generation": int, "items": OrderedDict}
+    _generations = {}  # collection -> (generation, checked_at)
+
+    @staticmethod
+    def _counter_id(collection):
+        return f"catalog_{collection}"
+
+    @staticmethod
+    def _known_generation(collection):
+        """Generation checked less than CATALOG_VERSION_CHECK_INTERVAL ago, else None"""
+        interval = current_app.config['CATALOG_VERSION_CHECK_INTERVAL']
+        known = CatalogCache._generations.get(collection)
+        if known and time.monotonic() - known[1] < interval:
+            return known[0]
+        return None
+
+    @staticmethod
+    def _remember_generation(collection, doc):
+        """Record the counter document just read from Mongo; returns the generation"""
+        generation = int(doc.get("gen", 0)) if doc else 0
+        with CatalogCache._lock:
+            CatalogCache._generations[collection] = (generation, time.monotonic())
+        return generation
+
+    @staticmethod
+    def generation(collection):
+        """Get the current generation of a collection
+
+        The counter is read from Mongo at most once every
+        CATALOG_VERSION_CHECK_INTERVAL seconds per worker; within that window
+        cache hits do not touch the database at all.
+
+        Args:
+            collection (str): Collection name (e.g. "portfolio_items")
+
+        Returns:
+            int: Current generation number
+        """
+        generation = CatalogCache._known_generation(collection)
+        if generation is not None:
+            return generation
+        doc = mongo.counters.find_one({"_id": CatalogCache._counter_id(collection)}, {"gen": 1})
+        return CatalogCache._remember_generation(collection, doc)
+
+    @staticmethod
+    def _lookup(collection, key, generation):
+        with CatalogCache._lock:
+            bucket = CatalogCache._entries.get(collection)
+            if bucket and bucket["generation"] == generation and key in bucket["items"]:
+                bucket["items"].move_to_end(key)
+                return bucket["items"][key]
+        return None
+
+    @staticmethod
+    def _store(collection, generation, values):
+        with CatalogCache._lock:
+            # An invalidation may have happened while building; never store
+            # a value under a generation older than the latest one we know.
+            known = CatalogCache._generations.get(collection)
+            if known and known[0] > generation:
+                return
+
+            bucket = CatalogCache._entries.get(collection)
+            if not bucket or bucket["generation"] != generation:
+                bucket = {"generation": generation, "items": OrderedDict()}
+                CatalogCache._entries[collection] = bucket
+            for key, value in values.items():
+                if value is not None:
+                    bucket["items"][key] = value
+            max_entries = current_app.config['CATALOG_CACHE_MAX_ENTRIES']
+            while len(bucket["items"]) > max_entries:
+                bucket["items"].popitem(last=False)
+
+    @staticmethod
+    def get_or_build(collection, key, builder):
+        """Return the cached value for key, building it on a miss
+
+        Args:
+            collection (str): Collection the value is derived from
+            key (hashable): Cache key within the collection
+            builder (callable): Produces the value (runs the DB query)
+
+        Returns:
+            Cached or freshly built value (None results are not cached)
+        """
+        if not current_app.config['CATALOG_CACHE_ENABLED']:
+            return builder()
+
+        generation = CatalogCache.generation(collection)
+        value = CatalogCache._lookup(collection, key, generation)
+        if value is not None:
+            return value
+
+        value = builder()
+        if value is not None:
+            CatalogCache._store(collection, generation, {key: value})
+        return value
+
+    @staticmethod
+    async def get_or_build_async(collection, key, builder, db):
+        """get_or_build for the async API: same entries, async builder
+
+        Args:
+            collection (str): Collection the value is derived from
+            key (hashable): Cache key within the collection
+            builder (coroutine function): Produces the value (awaits the DB query)
+            db: Async (motor) database used for the generation check
+
+        Returns:
+            Cached or freshly built value (None results are not cached)
+        """
+        if not current_app.config['CATALOG_CACHE_ENABLED']:
+            return await builder()
+
+        generation = CatalogCache._known_generation(collection)
+        if generation is None:
+            doc = await db.counters.find_one({"_id": CatalogCache._counter_id(collection)}, {"gen": 1})
+            generation = CatalogCache._remember_generation(collection, doc)
+        value = CatalogCache._lookup(collection, key, generation)
+        if value is not None:
+            return value
+
+        value = await builder()
+        if value is not None:
+            CatalogCache._store(collection, generation, {key: value})
+        return value
+
+    @staticmethod
+    def get_many(collection, keys, builder):
+        """Return cached values for several keys, building the misses in one go
+
+        Args:
+            collection (str): Collection the values are derived from
+            keys (iterable): Cache keys within the collection
+            builder (callable): Receives the list of missing keys and returns
+                                a dict {key: value} (one DB query for all of them)
+
+        Returns:
+            dict: {key: value} for the keys that exist (missing keys are absent)
+        """
+        keys = list(dict.fromkeys(keys))
+        if not current_app.config['CATALOG_CACHE_ENABLED']:
+            return builder(keys)
+
+        generation = CatalogCache.generation(collection)
+        found = {}
+        with CatalogCache._lock:
+            bucket = CatalogCache._entries.get(collection)
+            if bucket and bucket["generation"] == generation:
+                for key in keys:
+                    if key in bucket["items"]:
+                        bucket["items"].move_to_end(key)
+                        found[key] = bucket["items"][key]
+
+        missing = [key for key in keys if key not in found]
+        if not missing:
+            return found
+
+        built = builder(missing)
+        found.update(built)
+        CatalogCache._store(collection, generation, built)
+        return found
+
+    @staticmethod
+    def invalidate(collection):
+        """Bump the generation of a collection after a write
+
+        Args:
+            collection (str): Collection that was modified
+
+        Returns:
+            int or None: New generation, None if the counter could not be bumped
+        """
+        generation = None
+        try:
+            doc = mongo.counters.find_one_and_update(
+                {"_id": CatalogCache._counter_id(collection)},
+                {"$inc": {"gen": 1}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            generation = int(doc.get("gen", 0))
+        except Exception as e:
+            print(f"[catalog-cache][warn] failed to bump generation for {collection}: {e}")
+
+        with CatalogCache._lock:
+            CatalogCache._entries.pop(collection, None)
+            if generation is not None:
+                CatalogCache._generations[collection] = (generation, time.monotonic())
+            else:
+                CatalogCache._generations.pop(collection, None)
+        return generation
@@ -3,12 +3,153 @@ Cloudinary service for image management
 """
 
 import os
+import base64
+import contextvars
+import hashlib
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, wait
+from flask import current_app, has_app_context
+import cloudinary
 import cloudinary.uploader
+import urllib3
+from cloudinary.utils import get_http_connector
+from app import mongo
+from app.utils.request_timing import timed
+
+HASH_READ_CHUNK_SIZE = 1024 * 1024
+
+
+def configure_cloudinary(app):
+    """Configure the Cloudinary SDK (credentials, HTTP pool and timeouts)
+
+    The uploader sends every request through one module-level urllib3
+    PoolManager. Its default pool keeps a single connection, so with several
+    request threads (plus the upload_images pool) most uploads would open a
+    new TLS connection and throw it away, and requests had no timeout at
+    all. The PoolManager is thread-safe; it is replaced with one that keeps
+    CLOUDINARY_POOL_MAXSIZE connections and has connect/read timeouts.
+    """
+    config = app.config
+    cloudinary.config(
+        cloud_name=os.getenv('CLOUDINARY_CLOUD_NAME'),
+        api_key=os.getenv('CLOUDINARY_API_KEY'),
+        api_secret=os.getenv('CLOUDINARY_API_SECRET')
+    )
+    cloudinary.uploader._http = get_http_connector(
+        cloudinary.config(),
+        dict(
+            cloudinary.CERT_KWARGS,
+            maxsize=config['CLOUDINARY_POOL_MAXSIZE'],
+            timeout=urllib3.Timeout(
+                connect=config['CLOUDINARY_CONNECT_TIMEOUT'],
+                read=config['CLOUDINARY_READ_TIMEOUT'],
+            ),
+        ),
+    )
 
 
 class CloudinaryService:
     """Service for handling image uploads to Cloudinary"""
     
+    @staticmethod
+    def _upload_kwargs(folder):
+        """Common Cloudinary upload options"""
+        upload_kwargs = {
+            "folder": folder,
+            "resource_type": "image",
+        }
+        # Use an upload preset if provided (to apply incoming transformations server-side)
+        preset = os.getenv("CLOUDINARY_UPLOAD_PRESET")
+        if preset:
+            upload_kwargs["upload_preset"] = preset
+
+        # Optionally restrict allowed formats (safe defaults)
+        allowed = os.getenv("CLOUDINARY_ALLOWED_FORMATS", "jpg,png,jpeg,webp,heic").split(",")
+        allowed = [fmt.strip() for fmt in allowed if fmt.strip()]
+        if allowed:
+            upload_kwargs["allowed_formats"] = allowed
+        return upload_kwargs
+
+    @staticmethod
+    def content_hash(image_data):
+        """SHA-256 of the decoded image bytes
+        
+        Args:
+            image_data (str or file): Base64 data URL or binary file-like object
+            
+        Returns:
+            str or None: Hex digest, None if the data cannot be hashed
+        """
+        digest = hashlib.sha256()
+        if hasattr(image_data, "read"):
+            position = image_data.tell()
+            for chunk in iter(lambda: image_data.read(HASH_READ_CHUNK_SIZE), b""):
+                digest.update(chunk)
+            image_data.seek(position)
+            return digest.hexdigest()
+        if CloudinaryService.is_data_url(image_data):
+            _, _, payload = image_data.partition(",")
+            try:
+                digest.update(base64.b64decode(payload))
+            except Exception:
+                return None
+            return digest.hexdigest()
+        return None
+
+    @staticmethod
+    def _upload(image_data, folder, chunk_size=None, dedup=False):
+        """Upload one image and return the raw Cloudinary result (raises on failure)
+        
+        File-like objects are sent with the chunked upload API, reading
+        `chunk_size` bytes at a time, so they are never held fully in memory.
+        
+        With dedup, the decoded bytes are hashed and looked up in the
+        `image_hashes` collection (_id = SHA-256) first; a hit returns the
+        stored asset without uploading. Results carry `content_hash`,
+        `deduplicated` and `owns_hash` (this upload inserted the dedup entry)
+        so batch rollbacks only touch what they created.
+        """
+        digest = CloudinaryService.content_hash(image_data) if dedup else None
+        if digest:
+            known = mongo.image_hashes.find_one({"_id": digest}, {"secure_url": 1, "public_id": 1})
+            if known:
+                return {
+                    "secure_url": known["secure_url"],
+                    "public_id": known["public_id"],
+                    "content_hash": digest,
+                    "deduplicated": True,
+                }
+
+        with timed("cloudinary"):
+            if hasattr(image_data, "read"):
+                result = cloudinary.uploader.upload_large(
+                    image_data,
+                    chunk_size=chunk_size or 6 * 1024 * 1024,
+                    **CloudinaryService._upload_kwargs(folder),
+                )
+            else:
+                result = cloudinary.uploader.upload(
+                    image_data,
+                    **CloudinaryService._upload_kwargs(folder),
+                )
+
+        owns_hash = False
+        if digest:
+            # A concurrent upload of the same bytes may have inserted it first
+            inserted = mongo.image_hashes.update_one(
+                {"_id": digest},
+                {"$setOnInsert": {
+                    "secure_url": result["secure_url"],
+                    "public_id": result["public_id"],
+                    "folder": folder,
+                    "bytes": result.get("bytes"),
+                    "created_at": datetime.now(timezone.utc),
+                }},
+                upsert=True,
+            )
+            owns_hash = inserted.upserted_id is not None
+        return dict(result, content_hash=digest, deduplicated=False, owns_hash=owns_hash)
+
     @staticmethod
     def upload_image(image_data, folder="portfolio"):
         """Upload image data to Cloudinary and return URL
@@ -21,29 +162,132 @@ class CloudinaryService:
             str or None: Secure URL if successful, None if failed
         """
         try:
-            upload_kwargs = {
-                "folder": folder,
-                "resource_type": "image",
-            }
-            # Use an upload preset if provided (to apply incoming transformations server-side)
-            preset = os.getenv("CLOUDINARY_UPLOAD_PRESET")
-            if preset:
-                upload_kwargs["upload_preset"] = preset
-
-            # Optionally restrict allowed formats (safe defaults)
-            allowed = os.getenv("CLOUDINARY_ALLOWED_FORMATS", "jpg,png,jpeg,webp,heic").split(",")
-            allowed = [fmt.strip() for fmt in allowed if fmt.strip()]
-            if allowed:
-                upload_kwargs["allowed_formats"] = allowed
-
-            result = cloudinary.uploader.upload(
-                image_data,
-                **upload_kwargs,
-            )
+            dedup = current_app.config['IMAGE_DEDUP_ENABLED'] if has_app_context() else False
+            result = CloudinaryService._upload(image_data, folder, dedup=dedup)
             return result['secure_url']
         except Exception as e:
             # Avoid noisy prints in production; caller handles the error
             return None
+
+    @staticmethod
+    def delete_images(public_ids, content_hashes=None):
+        """Delete uploaded assets (best effort, used to roll back failed batches)
+        
+        Args:
+            public_ids (list): Cloudinary public IDs
+            content_hashes (list): (digest, public_id) of the dedup entries
+                                   inserted for those assets
+        """
+        if content_hashes:
+            try:
+                # Only entries still pointing to these assets; another upload
+                # of the same bytes may own the entry for a digest
+                mongo.image_hashes.delete_many({"$or": [
+                    {"_id": digest, "public_id": public_id} for digest, public_id in content_hashes
+                ]})
+            except Exception as e:
+                print(f"[cloudinary][warn] failed to drop dedup entries: {e}")
+        for public_id in public_ids:
+            try:
+                with timed("cloudinary"):
+                    cloudinary.uploader.destroy(public_id, resource_type="image")
+            except Exception as e:
+                print(f"[cloudinary][warn] rollback failed for {public_id}: {e}")
+
+    @staticmethod
+    def upload_images(images, max_workers=None):
+        """Upload a batch of images in parallel, preserving their order
+        
+        At most `max_workers` uploads (CLOUDINARY_UPLOAD_CONCURRENCY by default)
+        run at once for the batch. If any upload fails, the assets that already
+        went up are deleted so no orphans are left in Cloudinary.
+        
+        Args:
+            images (list): List of (image_data, folder) tuples; image_data is
+                           base64 data or a binary file-like object
+            max_workers (int): Concurrency limit for this batch
+            
+        Returns:
+            tuple: (urls, error_index) - urls in input order, or (None, index of
+                   the first failed image)
+        """
+        if not images:
+            return [], None
+        chunk_size = None
+        dedup = False
+        if has_app_context():
+            chunk_size = current_app.config['CLOUDINARY_CHUNK_SIZE']
+            dedup = current_app.config['IMAGE_DEDUP_ENABLED']
+            if max_workers is None:
+                max_workers = current_app.config['CLOUDINARY_UPLOAD_CONCURRENCY']
+        max_workers = max(1, min(max_workers or 4, len(images)))
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cloudinary") as pool:
+            # Each upload runs in a copy of this context so its time is
+            # attributed to the current request (Server-Timing)
+            futures = [
+                pool.submit(contextvars.copy_context().run,
+                            CloudinaryService._upload, image_data, folder, chunk_size, dedup)
+                for image_data, folder in images
+            ]
+            results = [None] * len(futures)
+            error_index = None
+            for index, future in enumerate(futures):
+                try:
+                    results[index] = future.result()
+                except Exception:
+                    error_index = index
+                    break
+
+            if error_index is None:
+                return [result['secure_url'] for result in results], None
+
+            # Stop queued uploads and wait for in-flight ones before rolling back
+            for future in futures:
+                future.cancel()
+            wait(futures)
+
+        # Only roll back assets this batch created; dedup hits are shared
+        uploaded, hashes = [], []
+        for future in futures:
+            if future.cancelled() or future.exception() is not None:
+                continue
+            result = future.result()
+            if result.get('deduplicated'):
+                continue
+            uploaded.append(result['public_id'])
+            if result.get('owns_hash'):
+                hashes.append((result['content_hash'], result['public_id']))
+        CloudinaryService.delete_images(uploaded, hashes)
+        return None, error_index
+    
+    @staticmethod
+    def is_data_url(value):
+        """Check whether an image value is base64 data (to upload) rather than a URL"""
+        return isinstance(value, str) and value.startswith('data:image')
+
+    @staticmethod
+    def resolve_images(images, max_workers=None):
+        """Upload the base64 entries of a mixed list of images, keeping URLs as-is
+        
+        Args:
+            images (list): List of (image_data_or_url, folder) tuples
+            max_workers (int): Concurrency limit for this batch
+            
+        Returns:
+            tuple: (values, error_index) - values in input order with base64
+                   entries replaced by their URLs, or (None, index of the
+                   first failed image)
+        """
+        pending = [index for index, (value, _) in enumerate(images) if CloudinaryService.is_data_url(value)]
+        urls, error_index = CloudinaryService.upload_images([images[index] for index in pending], max_workers)
+        if error_index is not None:
+            return None, pending[error_index]
+        
+        values = [value for value, _ in images]
+        for index, url in zip(pending, urls):
+            values[index] = url
+        return values, None
     
     @staticmethod
     def upload_portfolio_images(thumb_img_data, gallery_data):
@@ -57,21 +301,16 @@ class CloudinaryService:
             tuple: (thumb_url, gallery_urls, error_message)
         """
         try:
-            # Upload thumbnail
-            thumb_url = CloudinaryService.upload_image(thumb_img_data, "portfolio/thumbnails")
-            if not thumb_url:
+            # Upload thumbnail and gallery as one parallel batch
+            images = [(thumb_img_data, "portfolio/thumbnails")]
+            images += [(img_data, "portfolio/gallery") for img_data in gallery_data]
+            urls, error_index = CloudinaryService.upload_images(images)
+            if error_index == 0:
                 return None, None, "Failed to upload thumbnail"
+            if error_index is not None:
+                return None, None, "Failed to upload gallery image"
             
-            # Upload gallery images
-            gallery_urls = []
-            for img_data in gallery_data:
-                img_url = CloudinaryService.upload_image(img_data, "portfolio/gallery")
-                if img_url:
-                    gallery_urls.append(img_url)
-                else:
-                    return None, None, "Failed to upload gallery image"
-            
-            return thumb_url, gallery_urls, None
+            return urls[0], urls[1:], None
             
         except Exception as e:
             return None, None, f"Upload error: {str(e)}"
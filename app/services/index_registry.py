@@ -0,0 +1,133 @@
+"""
+Index registry: indexes and query shapes declared by each blueprint
+"""
+
+from pymongo import IndexModel
+
+
+class IndexRegistry:
+    """Central list of the indexes the app needs and the queries it issues.
+
+    Blueprint modules declare their indexes and query shapes at import time;
+    `apply` creates them idempotently (startup or `flask indexes apply`) and
+    `explain` runs explain() on every query shape to flag collection scans and
+    in-memory sorts (`flask indexes explain`).
+    """
+
+    _indexes = {}  # (collection, name) -> {"blueprint", "collection", "model"}
+    _queries = {}  # name -> query shape dict
+
+    @staticmethod
+    def declare_index(blueprint, collection, keys, **options):
+        """Declare an index
+
+        Args:
+            blueprint (str): Owner (for reports)
+            collection (str): Collection name
+            keys (list): [(field, direction), ...]
+            **options: IndexModel options (name, unique, expireAfterSeconds, ...)
+        """
+        model = IndexModel(keys, **options)
+        name = model.document["name"]
+        IndexRegistry._indexes[(collection, name)] = {
+            "blueprint": blueprint,
+            "collection": collection,
+            "model": model,
+        }
+
+    @staticmethod
+    def declare_query(name, collection, filter=None, sort=None, projection=None):
+        """Declare a query shape issued by the app, for explain reports
+
+        Args:
+            name (str): Unique query name (e.g. "orders.by_session")
+            collection (str): Collection name
+            filter (dict): Representative filter
+            sort (list): [(field, direction), ...]
+            projection (dict): Projection, if any
+        """
+        IndexRegistry._queries[name] = {
+            "name": name,
+            "collection": collection,
+            "filter": filter or {},
+            "sort": sort,
+            "projection": projection,
+        }
+
+    @staticmethod
+    def indexes():
+        return list(IndexRegistry._indexes.values())
+
+    @staticmethod
+    def queries():
+        return list(IndexRegistry._queries.values())
+
+    @staticmethod
+    def apply(db):
+        """Create every declared index (no-op for existing ones)
+
+        Args:
+            db: pymongo Database
+
+        Returns:
+            list: [{"collection", "name", "blueprint", "ok", "error"}]
+        """
+        report = []
+        for entry in IndexRegistry.indexes():
+            model = entry["model"]
+            name = model.document["name"]
+            try:
+                db[entry["collection"]].create_indexes([model])
+                report.append({"collection": entry["collection"], "name": name,
+                               "blueprint": entry["blueprint"], "ok": True, "error": None})
+            except Exception as e:
+                report.append({"collection": entry["collection"], "name": name,
+                               "blueprint": entry["blueprint"], "ok": False, "error": str(e)})
+        return report
+
+    @staticmethod
+    def _walk_plan(stage, found):
+        """Collect stage names of a (classic or SBE) winning plan"""
+        if not isinstance(stage, dict):
+            return found
+        if "queryPlan" in stage:
+            return IndexRegistry._walk_plan(stage["queryPlan"], found)
+        if "stage" in stage:
+            found.append(stage["stage"])
+            if stage["stage"] == "IXSCAN":
+                found.append(f"IXSCAN:{stage.get('indexName')}")
+        if "inputStage" in stage:
+            IndexRegistry._walk_plan(stage["inputStage"], found)
+        for child in stage.get("inputStages", []):
+            IndexRegistry._walk_plan(child, found)
+        return found
+
+    @staticmethod
+    def explain(db):
+        """Explain every declared query shape
+
+        Args:
+            db: pymongo Database
+
+        Returns:
+            list: [{"name", "collection", "stages", "collscan", "in_memory_sort",
+                    "covered", "error"}]
+        """
+        report = []
+        for query in IndexRegistry.queries():
+            entry = {"name": query["name"], "collection": query["collection"], "stages": [],
+                     "collscan": False, "in_memory_sort": False, "covered": False, "error": None}
+            try:
+                cursor = db[query["collection"]].find(query["filter"], query["projection"])
+                if query["sort"]:
+                    cursor = cursor.sort(query["sort"])
+                plan = cursor.explain().get("queryPlanner", {}).get("winningPlan", {})
+                stages = IndexRegistry._walk_plan(plan, [])
+                entry["stages"] = stages
+                entry["collscan"] = "COLLSCAN" in stages
+                entry["in_memory_sort"] = "SORT" in stages
+                entry["covered"] = "FETCH" not in stages and not entry["collscan"]
+            except Exception as e:
+                entry["error"] = str(e)
+            report.append(entry)
+        return report
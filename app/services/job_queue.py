@@ -0,0 +1,213 @@
+"""
+Durable background job queue backed by MongoDB
+"""
+
+import os
+import random
+import signal
+import socket
+import time
+import traceback
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app import mongo
+from app.services.index_registry import IndexRegistry
+
+JOBS_COLLECTION = "jobs"
+
+IndexRegistry.declare_index('jobs', JOBS_COLLECTION, [("status", 1), ("run_at", 1)], name="jobs_status_run_at")
+IndexRegistry.declare_index('jobs', JOBS_COLLECTION, [("status", 1), ("locked_until", 1)], name="jobs_status_locked_until")
+IndexRegistry.declare_query('jobs.claim_pending', JOBS_COLLECTION,
+                            {"status": "pending", "run_at": {"$lte": datetime(2000, 1, 1)}}, sort=[("run_at", 1)])
+
+
+class JobQueue:
+    """Outbox-style job queue.
+
+    Jobs are documents in the `jobs` collection:
+      - _id: caller-provided key (e.g. Stripe event id) so re-deliveries dedupe
+      - kind / payload: handler name and its JSON payload
+      - status: pending -> running -> done | failed
+      - attempts, run_at (next attempt), locked_until (lease), last_error
+
+    Workers claim jobs atomically with find_one_and_update; a job whose lease
+    expired (worker crashed) is claimed again. Failures are retried with
+    exponential backoff and jitter until JOB_MAX_ATTEMPTS.
+    """
+
+    _handlers = {}
+
+    @staticmethod
+    def handler(kind):
+        """Decorator registering the function that processes jobs of `kind`"""
+        def decorator(func):
+            JobQueue._handlers[kind] = func
+            return func
+        return decorator
+
+    @staticmethod
+    def enqueue(kind, payload, job_id=None, run_inline=None):
+        """Persist a job
+
+        Args:
+            kind (str): Handler name
+            payload (dict): JSON-serializable payload
+            job_id (str): Dedup key; enqueuing an existing id is a no-op
+            run_inline (bool): Process right away in this process
+                               (defaults to JOB_QUEUE_INLINE, for local dev)
+
+        Returns:
+            tuple: (job_id, created: bool)
+        """
+        now = datetime.now(timezone.utc)
+        job = {
+            "kind": kind,
+            "payload": payload,
+            "status": "pending",
+            "attempts": 0,
+            "run_at": now,
+            "locked_until": None,
+            "last_error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        if job_id is not None:
+            job["_id"] = job_id
+        try:
+            result = mongo[JOBS_COLLECTION].insert_one(job)
+        except DuplicateKeyError:
+            return job_id, False
+
+        if run_inline is None:
+            run_inline = current_app.config['JOB_QUEUE_INLINE']
+        if run_inline:
+            JobQueue.run_once(job_id=result.inserted_id)
+        return result.inserted_id, True
+
+    @staticmethod
+    def _worker_id():
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    @staticmethod
+    def claim(job_id=None):
+        """Atomically lease the next due job (or a specific one)
+
+        Returns:
+            dict or None: Claimed job document
+        """
+        now = datetime.now(timezone.utc)
+        query = {"$or": [
+            {"status": "pending", "run_at": {"$lte": now}},
+            {"status": "running", "locked_until": {"$lt": now}},
+        ]}
+        if job_id is not None:
+            query["_id"] = job_id
+        lease = timedelta(seconds=current_app.config['JOB_LEASE_SECONDS'])
+        return mongo[JOBS_COLLECTION].find_one_and_update(
+            query,
+            {
+                "$set": {
+                    "status": "running",
+                    "locked_until": now + lease,
+                    "worker": JobQueue._worker_id(),
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("run_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    @staticmethod
+    def _backoff(attempts):
+        config = current_app.config
+        delay = min(config['JOB_BACKOFF_BASE'] * (2 ** (attempts - 1)), config['JOB_BACKOFF_MAX'])
+        return delay * random.uniform(0.8, 1.2)
+
+    @staticmethod
+    def _finish(job, error=None):
+        now = datetime.now(timezone.utc)
+        if error is None:
+            update = {"status": "done", "locked_until": None, "last_error": None,
+                      "finished_at": now, "updated_at": now}
+        elif job["attempts"] >= current_app.config['JOB_MAX_ATTEMPTS']:
+            update = {"status": "failed", "locked_until": None, "last_error": error,
+                      "finished_at": now, "updated_at": now}
+        else:
+            run_at = now + timedelta(seconds=JobQueue._backoff(job["attempts"]))
+            update = {"status": "pending", "locked_until": None, "last_error": error,
+                      "run_at": run_at, "updated_at": now}
+        # Only the lease holder may finish the job
+        mongo[JOBS_COLLECTION].update_one(
+            {"_id": job["_id"], "status": "running", "worker": job.get("worker")},
+            {"$set": update},
+        )
+
+    @staticmethod
+    def run_once(job_id=None):
+        """Claim and process one job
+
+        Returns:
+            bool: True if a job was processed (successfully or not)
+        """
+        job = JobQueue.claim(job_id)
+        if not job:
+            return False
+
+        func = JobQueue._handlers.get(job["kind"])
+        if func is None:
+            JobQueue._finish(job, f"No handler for job kind {job['kind']}")
+            return True
+        try:
+            func(job["payload"])
+        except Exception as e:
+            print(f"[jobs][error] {job['kind']} {job['_id']} attempt {job['attempts']}: {e}")
+            print(traceback.format_exc())
+            JobQueue._finish(job, str(e))
+        else:
+            JobQueue._finish(job)
+        return True
+
+    @staticmethod
+    def work(poll_interval=None, max_jobs=None):
+        """Process jobs until SIGTERM/SIGINT (or max_jobs processed)
+
+        Args:
+            poll_interval (float): Seconds to sleep when the queue is empty
+            max_jobs (int): Stop after this many jobs (None = run forever)
+        """
+        if poll_interval is None:
+            poll_interval = current_app.config['JOB_POLL_INTERVAL']
+        state = {"stop": False}
+
+        def request_stop(signum, frame):
+            state["stop"] = True
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+
+        processed = 0
+        print(f"[jobs] worker {JobQueue._worker_id()} started")
+        while not state["stop"] and (max_jobs is None or processed < max_jobs):
+            try:
+                did_work = JobQueue.run_once()
+            except Exception as e:
+                print(f"[jobs][error] claim failed: {e}")
+                did_work = False
+            if did_work:
+                processed += 1
+            else:
+                time.sleep(poll_interval)
+        print(f"[jobs] worker stopped after {processed} job(s)")
+        return processed
+
+    @staticmethod
+    def stats():
+        """Job counts by kind and status"""
+        pipeline = [{"$group": {"_id": {"kind": "$kind", "status": "$status"}, "count": {"$sum": 1}}}]
+        return [
+            {"kind": row["_id"]["kind"], "status": row["_id"]["status"], "count": row["count"]}
+            for row in mongo[JOBS_COLLECTION].aggregate(pipeline)
+        ]
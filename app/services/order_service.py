@@ -0,0 +1,211 @@
+"""
+Order service: turns Stripe events into orders (runs in the job worker)
+"""
+
+import json
+import os
+import threading
+import stripe
+from datetime import datetime, timezone
+from flask import current_app
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app import mongo
+from app.services.job_queue import JobQueue
+from app.services.analytics_service import SalesRollupService
+
+STRIPE_EVENT_JOB = "stripe.event"
+
+
+class OrderNumberAllocator:
+    """Hands out year-scoped order numbers from the `orders_<year>` counter.
+
+    In 'gapless' mode every number is one `$inc` on the counter document and
+    is only drawn once the order itself is stored (see OrderService), so
+    replayed events do not consume numbers. A number is still skipped if a
+    worker dies between drawing it and writing it to the order. In
+    'block' mode (hi/lo) a process reserves ORDER_NUMBER_BLOCK_SIZE numbers
+    with a single `$inc` and serves them from memory; numbers stay unique
+    across workers, but a block abandoned by a stopped worker leaves a gap
+    and numbers are not ordered by time across workers.
+    """
+
+    _lock = threading.Lock()
+    _block = {"pid": None, "year": None, "next": 0, "last": -1}
+
+    @staticmethod
+    def _reserve(year, count):
+        """Reserve `count` numbers for `year`, returns the last one reserved"""
+        counter_doc = mongo.counters.find_one_and_update(
+            {"_id": f"orders_{year}"},
+            {"$inc": {"seq": count}, "$setOnInsert": {"created_at": datetime.now(timezone.utc)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return int(counter_doc.get("seq", count))
+
+    @staticmethod
+    def next_sequence(year):
+        """Next sequence number for `year` according to ORDER_NUMBER_MODE"""
+        config = current_app.config
+        block_size = max(1, config['ORDER_NUMBER_BLOCK_SIZE'])
+        if config['ORDER_NUMBER_MODE'] != 'block' or block_size == 1:
+            return OrderNumberAllocator._reserve(year, 1)
+
+        block = OrderNumberAllocator._block
+        with OrderNumberAllocator._lock:
+            # New block on first use, when exhausted, on year change or after fork
+            if block["pid"] != os.getpid() or block["year"] != year or block["next"] > block["last"]:
+                last = OrderNumberAllocator._reserve(year, block_size)
+                block.update(pid=os.getpid(), year=year, next=last - block_size + 1, last=last)
+            seq_num = block["next"]
+            block["next"] += 1
+        return seq_num
+
+    @staticmethod
+    def next_order_number():
+        """Generate friendly order number (reset per year)
+
+        Returns:
+            str: Order number like PED-2025-00042
+        """
+        current_year = datetime.now(timezone.utc).year
+        seq_num = OrderNumberAllocator.next_sequence(current_year)
+        return f"PED-{current_year}-{seq_num:05d}"
+
+
+class OrderService:
+    """Service for order creation from Stripe Checkout"""
+
+    @staticmethod
+    def record_checkout_session(event):
+        """Store the order of a completed Checkout Session (idempotent)
+
+        Args:
+            event (stripe.Event): checkout.session.completed event
+
+        Returns:
+            dict or None: Inserted order, None if it already existed
+        """
+        session = event.data.object
+        session_id = session.get("id")
+
+        # Retries and duplicate deliveries must not create a second order
+        existing = mongo.orders.find_one({"session_id": session_id})
+        if existing:
+            # A previous attempt may have stored the order but failed on the
+            # order number or the rollups
+            OrderService.assign_order_number(existing)
+            SalesRollupService.record_order(existing)
+            return None
+
+        currency = (session.get("currency") or "eur").lower()
+        customer_details = session.get("customer_details") or {}
+        # Lowercase: the admin orders list filters by exact (indexed) email
+        customer_email = (customer_details.get("email") or "").strip().lower() or None
+        customer_phone = customer_details.get("phone")
+        shipping = session.get("shipping") or session.get("shipping_details") or {}
+        shipping_name = shipping.get("name") if isinstance(shipping, dict) else None
+        shipping_address = None
+        addr = shipping.get("address") if isinstance(shipping, dict) else None
+        if isinstance(addr, dict):
+            shipping_address = {
+                "line1": addr.get("line1"),
+                "line2": addr.get("line2"),
+                "city": addr.get("city"),
+                "state": addr.get("state"),
+                "postal_code": addr.get("postal_code"),
+                "country": addr.get("country"),
+            }
+
+        # Alert/log if Stripe didn't provide an email (shouldn't happen in normal flow)
+        if not customer_email:
+            try:
+                mongo.alerts.insert_one({
+                    "type": "missing_customer_email",
+                    "session_id": session_id,
+                    "raw_event_type": event.type,
+                    "customer_details": customer_details,
+                    "created_at": datetime.now(timezone.utc),
+                })
+            except Exception as _e:
+                print(f"[webhook][warn] failed to record missing email alert: {_e}")
+            print(f"[webhook][warn] missing customer_email for session {session_id}")
+
+        # Retrieve line items to store order details
+        line_items = stripe.checkout.Session.list_line_items(session_id, limit=100)
+        items = []
+        total_minor = 0
+        for li in line_items.auto_paging_iter():
+            description = li.get("description") or (li.get("price") or {}).get("nickname") or "Item"
+            quantity = li.get("quantity") or 1
+            amount_total = li.get("amount_total") or (li.get("price") or {}).get("unit_amount", 0) * quantity
+            total_minor += int(amount_total or 0)
+            items.append({
+                "description": description,
+                "quantity": quantity,
+                "amount_total_minor": int(amount_total or 0),
+            })
+
+        order_doc = {
+            "session_id": session_id,
+            "payment_status": session.get("payment_status"),
+            "currency": currency,
+            "amount_total_minor": total_minor,
+            "customer_email": customer_email,
+            "customer_phone": customer_phone,
+            "shipping_name": shipping_name,
+            "shipping_address": shipping_address,
+            "items": items,
+            "created_at": datetime.now(timezone.utc),
+            "raw": {"type": event.type},
+        }
+
+        # Upsert keyed on session_id: a copy stored meanwhile is left untouched.
+        # The order number is drawn only once this insert wins, so duplicate
+        # deliveries never consume one.
+        try:
+            result = mongo.orders.update_one(
+                {"session_id": session_id},
+                {"$setOnInsert": order_doc},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # A concurrent job inserted it first (unique orders_session_id);
+            # that attempt numbers the order and records the rollups
+            return None
+        if result.upserted_id is None:
+            return None
+        order_doc["_id"] = result.upserted_id
+        OrderService.assign_order_number(order_doc)
+        SalesRollupService.record_order(order_doc)
+        return order_doc
+
+    @staticmethod
+    def assign_order_number(order):
+        """Give a stored order its number if it has none yet
+
+        Args:
+            order (dict): Order document (updated in place)
+        """
+        if order.get("order_number"):
+            return
+        order_number = OrderNumberAllocator.next_order_number()
+        result = mongo.orders.update_one(
+            {"_id": order["_id"], "order_number": {"$exists": False}},
+            {"$set": {"order_number": order_number}},
+        )
+        if result.modified_count == 0:
+            # Numbered concurrently by another attempt; keep its number
+            stored = mongo.orders.find_one({"_id": order["_id"]}, {"order_number": 1})
+            order_number = (stored or {}).get("order_number", order_number)
+        order["order_number"] = order_number
+
+
+@JobQueue.handler(STRIPE_EVENT_JOB)
+def handle_stripe_event(payload):
+    """Process a Stripe event persisted by the webhook endpoint"""
+    event = stripe.Event.construct_from(json.loads(payload["raw"]), stripe.api_key)
+
+    if event.type == "checkout.session.completed":
+        OrderService.record_checkout_session(event)
@@ -0,0 +1,296 @@
+"""
+Ordering service for manually sorted collections (portfolio, store)
+"""
+
+from bson.objectid import ObjectId
+from flask import current_app
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from app import mongo
+
+
+class OrderingService:
+    """Gapped `display_order` keys for drag-and-drop ordering.
+
+    Items are spaced ORDER_KEY_GAP apart, so moving an item between two
+    neighbours only rewrites that item (midpoint key). When two neighbours
+    run out of room the collection is rebalanced with a single bulk_write.
+
+    Each collection has a counter document (`counters`, `_id: order_<collection>`)
+    holding:
+      - tail: last key handed out to a new item (atomic, no sorted lookup)
+      - version: ordering version, bumped on every move/reorder so that
+        clients working on a stale order get a 409 instead of clobbering it
+    """
+
+    @staticmethod
+    def _counter_id(collection):
+        return f"order_{collection}"
+
+    @staticmethod
+    def _gap():
+        return current_app.config['ORDER_KEY_GAP']
+
+    @staticmethod
+    def _ensure_counter(collection):
+        """Create the counter document, seeded from the current highest key"""
+        counter_id = OrderingService._counter_id(collection)
+        if mongo.counters.find_one({"_id": counter_id}, {"_id": 1}):
+            return
+        last_item = mongo[collection].find_one(
+            {"display_order": {"$type": "number"}},
+            {"display_order": 1},
+            sort=[("display_order", -1)],
+        )
+        tail = int(last_item["display_order"]) if last_item else 0
+        try:
+            mongo.counters.insert_one({"_id": counter_id, "tail": tail, "version": 0})
+        except DuplicateKeyError:
+            pass  # Seeded concurrently by another worker
+
+    @staticmethod
+    def get_version(collection):
+        """Get the current ordering version of a collection
+
+        Returns:
+            int: Ordering version
+        """
+        OrderingService._ensure_counter(collection)
+        doc = mongo.counters.find_one({"_id": OrderingService._counter_id(collection)}, {"version": 1})
+        return int(doc.get("version", 0))
+
+    @staticmethod
+    def next_order_key(collection):
+        """Reserve the display_order key for a new item (appended at the end)
+
+        Returns:
+            int: Unique display_order key
+        """
+        OrderingService._ensure_counter(collection)
+        doc = mongo.counters.find_one_and_update(
+            {"_id": OrderingService._counter_id(collection)},
+            {"$inc": {"tail": OrderingService._gap()}},
+            return_document=ReturnDocument.AFTER,
+        )
+        return int(doc["tail"])
+
+    @staticmethod
+    def _parse_version(expected_version):
+        """Client-supplied ordering version as an int (None = unconditional)
+
+        Raises:
+            ValueError: If it is not an integer
+        """
+        if expected_version is None:
+            return None
+        if isinstance(expected_version, bool):
+            raise ValueError(expected_version)
+        return int(expected_version)
+
+    @staticmethod
+    def _claim_version(collection, expected_version):
+        """Bump the ordering version, optionally only if it still matches
+
+        Returns:
+            int or None: New version, None on version conflict
+        """
+        OrderingService._ensure_counter(collection)
+        query = {"_id": OrderingService._counter_id(collection)}
+        if expected_version is not None:
+            query["version"] = expected_version
+        doc = mongo.counters.find_one_and_update(
+            query,
+            {"$inc": {"version": 1}},
+            return_document=ReturnDocument.AFTER,
+        )
+        return int(doc["version"]) if doc else None
+
+    @staticmethod
+    def _conflict(collection):
+        return {
+            "error": "Order changed concurrently, reload and retry",
+            "version": OrderingService.get_version(collection),
+        }, 409
+
+    @staticmethod
+    def rebalance(collection):
+        """Respace every key in the collection with a single bulk_write
+
+        Returns:
+            int: Number of items rewritten
+        """
+        gap = OrderingService._gap()
+        cursor = mongo[collection].find({}, {"_id": 1}).sort([("display_order", 1), ("_id", 1)])
+        operations = [
+            UpdateOne({"_id": doc["_id"]}, {"$set": {"display_order": (index + 1) * gap}})
+            for index, doc in enumerate(cursor)
+        ]
+        if operations:
+            mongo[collection].bulk_write(operations, ordered=False)
+        OrderingService._ensure_counter(collection)
+        mongo.counters.update_one(
+            {"_id": OrderingService._counter_id(collection)},
+            {"$max": {"tail": len(operations) * gap}},
+        )
+        return len(operations)
+
+    @staticmethod
+    def _neighbour_key(collection, item_oid, key, direction):
+        """Key of the closest item after (direction=1) or before (-1) `key`"""
+        operator = "$gt" if direction > 0 else "$lt"
+        doc = mongo[collection].find_one(
+            {"display_order": {operator: key}, "_id": {"$ne": item_oid}},
+            {"display_order": 1},
+            sort=[("display_order", direction)],
+        )
+        return doc.get("display_order") if doc else None
+
+    @staticmethod
+    def _neighbour_keys(collection, after_oid, before_oid):
+        """Current keys of the requested neighbours
+
+        Returns:
+            tuple: (lower, upper, error) - error explains why the neighbours
+                   are unusable (missing, without a key, or inverted)
+        """
+        requested = [oid for oid in (after_oid, before_oid) if oid]
+        keys = {
+            doc["_id"]: doc.get("display_order")
+            for doc in mongo[collection].find({"_id": {"$in": requested}}, {"display_order": 1})
+        }
+        for oid in requested:
+            if oid not in keys:
+                return None, None, "Neighbour item not found"
+            if isinstance(keys[oid], bool) or not isinstance(keys[oid], (int, float)):
+                return None, None, "Neighbour item has no position"
+        lower = keys.get(after_oid) if after_oid else None
+        upper = keys.get(before_oid) if before_oid else None
+        if lower is not None and upper is not None and lower >= upper:
+            return None, None, "after must be placed before before"
+        return lower, upper, None
+
+    @staticmethod
+    def _compute_key(collection, item_oid, after_oid, before_oid):
+        """Compute a key strictly between `after` and `before`
+
+        Returns:
+            tuple: (key, error) - key None without error means the neighbours
+                   are adjacent with no room left (needs rebalance)
+        """
+        gap = OrderingService._gap()
+        lower, upper, error = OrderingService._neighbour_keys(collection, after_oid, before_oid)
+        if error:
+            return None, error
+
+        if after_oid and not before_oid:
+            upper = OrderingService._neighbour_key(collection, item_oid, lower, 1)
+        elif before_oid and not after_oid:
+            lower = OrderingService._neighbour_key(collection, item_oid, upper, -1)
+
+        if lower is None:
+            return int(upper) - gap, None
+        if upper is None:
+            return int(lower) + gap, None
+        lower, upper = int(lower), int(upper)
+        if upper - lower < 2:
+            return None, None
+        return (lower + upper) // 2, None
+
+    @staticmethod
+    def move(collection, item_id, after_id=None, before_id=None, expected_version=None):
+        """Move one item between two neighbours ("put X between A and B")
+
+        The request is validated before the ordering version is claimed, so a
+        bad request neither consumes a version nor rewrites the collection.
+
+        Args:
+            collection (str): Collection name
+            item_id (str): Item being moved
+            after_id (str): Item that should end up right before X (None = top)
+            before_id (str): Item that should end up right after X (None = bottom)
+            expected_version (int): Ordering version the client based the move on
+
+        Returns:
+            tuple: (result_dict, status_code)
+        """
+        if not after_id and not before_id:
+            return {"error": "after or before required"}, 400
+        try:
+            item_oid = ObjectId(item_id)
+            after_oid = ObjectId(after_id) if after_id else None
+            before_oid = ObjectId(before_id) if before_id else None
+        except Exception:
+            return {"error": "Invalid item ID"}, 400
+        if item_oid in (after_oid, before_oid):
+            return {"error": "Item cannot be its own neighbour"}, 400
+        try:
+            expected_version = OrderingService._parse_version(expected_version)
+        except (TypeError, ValueError):
+            return {"error": "version must be an integer"}, 400
+
+        if not mongo[collection].find_one({"_id": item_oid}, {"_id": 1}):
+            return {"error": "Item not found"}, 404
+        _, _, error = OrderingService._neighbour_keys(collection, after_oid, before_oid)
+        if error:
+            return {"error": error}, 400
+
+        version = OrderingService._claim_version(collection, expected_version)
+        if version is None:
+            return OrderingService._conflict(collection)
+
+        new_key, error = OrderingService._compute_key(collection, item_oid, after_oid, before_oid)
+        if new_key is None and not error:
+            # Valid, adjacent neighbours with no room left between them
+            OrderingService.rebalance(collection)
+            new_key, error = OrderingService._compute_key(collection, item_oid, after_oid, before_oid)
+        if new_key is None:
+            # The neighbours changed after validation (unversioned concurrent move)
+            return OrderingService._conflict(collection)
+
+        mongo[collection].update_one({"_id": item_oid}, {"$set": {"display_order": new_key}})
+        mongo.counters.update_one(
+            {"_id": OrderingService._counter_id(collection)},
+            {"$max": {"tail": new_key}},
+        )
+        return {"_id": item_id, "display_order": new_key, "version": version}, 200
+
+    @staticmethod
+    def apply_order(collection, item_ids, expected_version=None):
+        """Rewrite the order of the given items in one bulk_write
+
+        Args:
+            collection (str): Collection name
+            item_ids (list): Item IDs in their new order (falsy entries keep their slot)
+            expected_version (int): Ordering version the client based the order on
+
+        Returns:
+            tuple: (result_dict, status_code)
+        """
+        try:
+            expected_version = OrderingService._parse_version(expected_version)
+        except (TypeError, ValueError):
+            return {"error": "version must be an integer"}, 400
+
+        gap = OrderingService._gap()
+        operations = []
+        for index, item_id in enumerate(item_ids):
+            if not item_id:
+                continue
+            try:
+                item_oid = ObjectId(item_id)
+            except Exception:
+                print(f"Error updating item {item_id}: invalid ObjectId")
+                continue
+            operations.append(UpdateOne({"_id": item_oid}, {"$set": {"display_order": (index + 1) * gap}}))
+
+        version = OrderingService._claim_version(collection, expected_version)
+        if version is None:
+            return OrderingService._conflict(collection)
+
+        if operations:
+            mongo[collection].bulk_write(operations, ordered=False)
+        mongo.counters.update_one(
+            {"_id": OrderingService._counter_id(collection)},
+            {"$max": {"tail": len(item_ids) * gap}},
+        )
+        return {"updated": len(operations), "version": version}, 200
@@ -0,0 +1,77 @@
+"""
+Password hashing off the request thread (bounded process pool)
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords in a small per-worker process pool.
+
+    Key derivation is deliberately CPU-heavy. Running it in
+    PASSWORD_HASH_WORKERS child processes caps the cores a login burst can
+    take, and keeps gthread/gevent workers serving other requests while a
+    hash is computed. The pool is created lazily in each gunicorn worker
+    (never inherited across a fork). PASSWORD_HASH_WORKERS=0 hashes inline.
+
+    PASSWORD_HASH_METHOD is any werkzeug method (e.g. "pbkdf2:sha256:600000");
+    hashes made with another method/cost are upgraded on the next login.
+    """
+
+    _lock = threading.Lock()
+    _executor = None
+    _pid = None
+    _methods = {}  # configured method -> method prefix werkzeug writes ("pbkdf2:sha256" -> "pbkdf2:sha256:260000")
+
+    @staticmethod
+    def _pool():
+        workers = current_app.config['PASSWORD_HASH_WORKERS']
+        if workers <= 0:
+            return None
+        pid = os.getpid()
+        if PasswordHasher._executor is not None and PasswordHasher._pid == pid:
+            return PasswordHasher._executor
+        with PasswordHasher._lock:
+            if PasswordHasher._executor is None or PasswordHasher._pid != pid:
+                # forkserver: children start from a clean process, not a copy of
+                # this (multi-threaded) worker with its Mongo client and sockets
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                PasswordHasher._executor = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context(method)
+                )
+                PasswordHasher._pid = pid
+                atexit.register(PasswordHasher._executor.shutdown, wait=False)
+        return PasswordHasher._executor
+
+    @staticmethod
+    def _run(func, *args):
+        pool = PasswordHasher._pool()
+        if pool is None:
+            return func(*args)
+        return pool.submit(func, *args).result(timeout=current_app.config['PASSWORD_HASH_TIMEOUT'])
+
+    @staticmethod
+    def hash(password):
+        """Hash a password with PASSWORD_HASH_METHOD"""
+        return PasswordHasher._run(generate_password_hash, password, current_app.config['PASSWORD_HASH_METHOD'])
+
+    @staticmethod
+    def verify(password_hash, password):
+        """Check a password against a stored hash"""
+        if not password_hash or password is None:
+            return False
+        return PasswordHasher._run(check_password_hash, password_hash, password)
+
+    @staticmethod
+    def needs_rehash(password_hash):
+        """Whether a stored hash was made with another method/cost than configured"""
+        configured = current_app.config['PASSWORD_HASH_METHOD']
+        if configured not in PasswordHasher._methods:
+            PasswordHasher._methods[configured] = generate_password_hash("", configured).split("$", 1)[0]
+        return (password_hash or "").split("$", 1)[0] != PasswordHasher._methods[configured]
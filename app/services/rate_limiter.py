@@ -0,0 +1,118 @@
+"""
+Token-bucket rate limiter shared by all workers (MongoDB) or per process (memory)
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app import mongo
+from app.services.index_registry import IndexRegistry
+
+RATE_LIMITS_COLLECTION = "rate_limits"
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# Buckets expire once idle long enough to be full again
+IndexRegistry.declare_index('rate_limit', RATE_LIMITS_COLLECTION, [("expires_at", 1)],
+                            name="rate_limits_expires_at", expireAfterSeconds=0)
+
+
+def parse_limit(value):
+    """Parse "10/minute" (or "10/30s") into (capacity, refill per second)
+
+    Returns:
+        tuple or None: (capacity, rate); None for "", "0" or "off" (no limit)
+
+    Raises:
+        ValueError: If the value is malformed
+    """
+    value = (value or "").strip().lower()
+    if value in ("", "0", "off", "none"):
+        return None
+    count, _, period = value.partition("/")
+    count = int(count)
+    period = period.strip() or "second"
+    if period.endswith("s") and period[:-1].isdigit():
+        seconds = int(period[:-1])
+    elif period in PERIODS or period[:-1] in PERIODS:
+        seconds = PERIODS.get(period) or PERIODS[period[:-1]]
+    else:
+        raise ValueError(f"Invalid rate limit period: {period}")
+    if count <= 0 or seconds <= 0:
+        return None
+    return count, count / seconds
+
+
+class RateLimiter:
+    """Token buckets keyed by "<route>:<key kind>:<value>".
+
+    A bucket holds up to `capacity` tokens and refills continuously at `rate`
+    tokens per second; each request takes one token or is rejected.
+
+    Backends (RATE_LIMIT_BACKEND):
+      - mongo: one document per bucket in `rate_limits`, refilled and consumed
+        atomically with a single pipeline update (upsert), so every gunicorn
+        worker shares the same counters; idle buckets are removed by a TTL index
+      - memory: in-process dict (single worker / local dev / tests)
+    """
+
+    _lock = threading.Lock()
+    _buckets = {}  # memory backend: bucket id -> (tokens, updated_at)
+
+    @staticmethod
+    def hit(bucket_id, capacity, rate, backend="mongo"):
+        """Take one token from a bucket
+
+        Returns:
+            tuple: (allowed: bool, retry_after: seconds until a token is available)
+        """
+        if backend == "memory":
+            return RateLimiter._hit_memory(bucket_id, capacity, rate)
+        return RateLimiter._hit_mongo(bucket_id, capacity, rate)
+
+    @staticmethod
+    def _retry_after(tokens, rate):
+        return max(1, int((1 - tokens) / rate + 0.999))
+
+    @staticmethod
+    def _hit_memory(bucket_id, capacity, rate):
+        now = time.monotonic()
+        with RateLimiter._lock:
+            tokens, updated_at = RateLimiter._buckets.get(bucket_id, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            RateLimiter._buckets[bucket_id] = (tokens, now)
+            if len(RateLimiter._buckets) > 100000:
+                RateLimiter._buckets.clear()  # crude bound on memory for key floods
+        return allowed, 0 if allowed else RateLimiter._retry_after(tokens, rate)
+
+    @staticmethod
+    def _hit_mongo(bucket_id, capacity, rate):
+        now = datetime.now(timezone.utc)
+        elapsed = {"$divide": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, 1000]}
+        refilled = {"$min": [capacity, {"$add": [{"$ifNull": ["$tokens", capacity]}, {"$multiply": [elapsed, rate]}]}]}
+        pipeline = [
+            {"$set": {"tokens": refilled, "updated_at": now}},
+            {"$set": {
+                "allowed": {"$gte": ["$tokens", 1]},
+                "tokens": {"$cond": [{"$gte": ["$tokens", 1]}, {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                "expires_at": now + timedelta(seconds=capacity / rate),
+            }},
+        ]
+        for attempt in range(2):
+            try:
+                doc = mongo[RATE_LIMITS_COLLECTION].find_one_and_update(
+                    {"_id": bucket_id}, pipeline, upsert=True,
+                    projection={"tokens": 1, "allowed": 1},
+                    return_document=ReturnDocument.AFTER,
+                )
+                break
+            except DuplicateKeyError:
+                # Two workers created the same bucket at once; the retry updates it
+                if attempt:
+                    raise
+        allowed = bool(doc.get("allowed"))
+        return allowed, 0 if allowed else RateLimiter._retry_after(doc.get("tokens", 0), rate)
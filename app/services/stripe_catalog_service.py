@@ -0,0 +1,235 @@
+"""
+Stripe catalog sync: store_items <-> Stripe Products/Prices
+"""
+
+from datetime import datetime, timezone
+import stripe
+from bson.objectid import ObjectId
+from flask import current_app
+from app import mongo
+from app.services.catalog_cache import CatalogCache
+from app.services.job_queue import JobQueue
+
+STORE_COLLECTION = "store_items"
+STRIPE_CATALOG_SYNC_JOB = "stripe.catalog.sync"
+STRIPE_CATALOG_ARCHIVE_JOB = "stripe.catalog.archive"
+
+
+class StripeCatalogService:
+    """Keeps a Stripe Product and an active Price for every store item.
+
+    The mapping lives on the store item itself:
+      - stripe_product_id / stripe_price_id
+      - stripe_price_amount / stripe_currency: what the Price was created for
+      - stripe_synced_at
+
+    Stripe Prices are immutable, so a price change creates a new Price, makes
+    it the product's default and archives the old one. Writes from the admin
+    API enqueue a sync job (see JobQueue); `reconcile` repairs drift in bulk.
+    Point STRIPE_API_BASE at stripe-mock to exercise it locally.
+    """
+
+    @staticmethod
+    def enabled():
+        return bool(stripe.api_key) and current_app.config['STRIPE_CATALOG_SYNC']
+
+    @staticmethod
+    def unit_amount(item):
+        """Price of a store item in minor units (store prices are already in cents)"""
+        return int(round(float(item.get("price") or 0)))
+
+    @staticmethod
+    def needs_sync(item):
+        """Whether the Stripe mapping of an item is missing or out of date"""
+        return (
+            not item.get("stripe_product_id")
+            or not item.get("stripe_price_id")
+            or item.get("stripe_price_amount") != StripeCatalogService.unit_amount(item)
+            or item.get("stripe_currency") != current_app.config['STRIPE_CURRENCY']
+        )
+
+    @staticmethod
+    def checkout_price_id(item, unit_amount, currency):
+        """Stripe Price id usable for a checkout line, or None to send price_data"""
+        price_id = item.get("stripe_price_id")
+        if price_id and item.get("stripe_price_amount") == unit_amount and item.get("stripe_currency") == currency:
+            return price_id
+        return None
+
+    @staticmethod
+    def enqueue_sync(item_id):
+        """Queue a sync of one store item (never fails the calling request)"""
+        if not StripeCatalogService.enabled():
+            return
+        try:
+            # sync_id scopes the Stripe idempotency keys to this job: its
+            # retries replay the same requests, a later sync makes new ones
+            JobQueue.enqueue(STRIPE_CATALOG_SYNC_JOB, {"item_id": str(item_id), "sync_id": str(ObjectId())})
+        except Exception as e:
+            print(f"[stripe-catalog][warn] failed to enqueue sync for {item_id}: {e}")
+
+    @staticmethod
+    def enqueue_archive(item):
+        """Queue archiving of the Stripe Product/Price of a deleted item"""
+        if not StripeCatalogService.enabled() or not item.get("stripe_product_id"):
+            return
+        try:
+            JobQueue.enqueue(STRIPE_CATALOG_ARCHIVE_JOB, {"product_id": item.get("stripe_product_id")})
+        except Exception as e:
+            print(f"[stripe-catalog][warn] failed to enqueue archive for {item.get('_id')}: {e}")
+
+    @staticmethod
+    def sync_item(item, sync_id=None):
+        """Create or update the Stripe Product/Price of a store item
+
+        Idempotency keys are scoped to one sync (`sync_id`), not to the target
+        state: a key derived from the price alone would, after a change
+        A -> B -> A within Stripe's 24h key window, replay the original (now
+        archived) Price A instead of creating an active one.
+
+        Args:
+            item (dict): store_items document
+            sync_id (str): Identifies this sync attempt (retries of a job
+                reuse it); a new one is generated when omitted
+
+        Returns:
+            dict: {"product_id", "price_id", "created_price": bool}
+        """
+        item_id = str(item["_id"])
+        sync_id = sync_id or str(ObjectId())
+        currency = current_app.config['STRIPE_CURRENCY']
+        unit_amount = StripeCatalogService.unit_amount(item)
+        product_fields = {
+            "name": item.get("name") or "Item",
+            "description": item.get("description") or None,
+            "images": [item["image"]] if item.get("image") else [],
+            "metadata": {"store_item_id": item_id},
+        }
+
+        product_id = item.get("stripe_product_id")
+        created_product = not product_id
+        if created_product:
+            # Idempotency key: a retried job never creates a second product
+            product = stripe.Product.create(idempotency_key=f"store-item-{item_id}-{sync_id}-product",
+                                            **product_fields)
+            product_id = product.id
+        else:
+            stripe.Product.modify(product_id, active=True, **product_fields)
+
+        price_id = item.get("stripe_price_id")
+        created_price = False
+        if created_product or not StripeCatalogService.checkout_price_id(item, unit_amount, currency):
+            price = stripe.Price.create(
+                product=product_id,
+                unit_amount=unit_amount,
+                currency=currency,
+                metadata={"store_item_id": item_id},
+                idempotency_key=f"store-item-{item_id}-{sync_id}-price-{currency}-{unit_amount}",
+            )
+            if not price.get("active", True):
+                # Replayed response for a Price archived since: reactivate it
+                price = stripe.Price.modify(price.id, active=True)
+            stripe.Product.modify(product_id, default_price=price.id)
+            if price_id and price_id != price.id:
+                try:
+                    stripe.Price.modify(price_id, active=False)
+                except stripe.error.StripeError as e:
+                    print(f"[stripe-catalog][warn] failed to archive price {price_id}: {e}")
+            price_id = price.id
+            created_price = True
+
+        # Only record the mapping if the item still has the price we synced;
+        # a concurrent update queued its own sync job.
+        mongo.store_items.update_one(
+            {"_id": item["_id"], "price": item.get("price")},
+            {"$set": {
+                "stripe_product_id": product_id,
+                "stripe_price_id": price_id,
+                "stripe_price_amount": unit_amount,
+                "stripe_currency": currency,
+                "stripe_synced_at": datetime.now(timezone.utc),
+            }},
+        )
+        CatalogCache.invalidate(STORE_COLLECTION)
+        return {"product_id": product_id, "price_id": price_id, "created_price": created_price}
+
+    @staticmethod
+    def archive(product_id):
+        """Deactivate the Stripe Product of a deleted store item
+
+        Its default Price cannot be archived on its own; an archived product
+        can no longer be used in new Checkout Sessions.
+        """
+        stripe.Product.modify(product_id, active=False)
+
+    @staticmethod
+    def reconcile(dry_run=False):
+        """Repair drift between store_items and Stripe
+
+        Lists the active Stripe products once, then syncs every item whose
+        mapping is missing or stale (price, currency, name, default price,
+        product archived) and archives products whose store item is gone.
+
+        Args:
+            dry_run (bool): Only report what would change
+
+        Returns:
+            dict: {"synced": [...], "archived": [...], "errors": [...]}
+        """
+        report = {"synced": [], "archived": [], "errors": []}
+        items = {
+            str(item["_id"]): item
+            for item in mongo.store_items.find({}, {"name": 1, "description": 1, "image": 1, "price": 1,
+                                                   "stripe_product_id": 1, "stripe_price_id": 1,
+                                                   "stripe_price_amount": 1, "stripe_currency": 1})
+        }
+
+        products = {}
+        for product in stripe.Product.list(active=True, limit=100).auto_paging_iter():
+            store_item_id = (product.get("metadata") or {}).get("store_item_id")
+            if not store_item_id:
+                continue
+            if store_item_id in items:
+                products[product.id] = product
+                continue
+            if dry_run:
+                report["archived"].append(product.id)
+                continue
+            try:
+                StripeCatalogService.archive(product.id)
+                report["archived"].append(product.id)
+            except Exception as e:
+                report["errors"].append({"product_id": product.id, "error": str(e)})
+
+        for item_id, item in items.items():
+            product = products.get(item.get("stripe_product_id"))
+            drifted = (
+                StripeCatalogService.needs_sync(item)
+                or product is None
+                or product.get("name") != (item.get("name") or "Item")
+                or product.get("default_price") != item.get("stripe_price_id")
+            )
+            if not drifted:
+                continue
+            if dry_run:
+                report["synced"].append(item_id)
+                continue
+            try:
+                StripeCatalogService.sync_item(item)
+                report["synced"].append(item_id)
+            except Exception as e:
+                report["errors"].append({"item_id": item_id, "error": str(e)})
+        return report
+
+
+@JobQueue.handler(STRIPE_CATALOG_SYNC_JOB)
+def handle_catalog_sync(payload):
+    """Sync one store item (it may have been deleted since the job was queued)"""
+    item = mongo.store_items.find_one({"_id": ObjectId(payload["item_id"])})
+    if item:
+        StripeCatalogService.sync_item(item, sync_id=payload.get("sync_id"))
+
+
+@JobQueue.handler(STRIPE_CATALOG_ARCHIVE_JOB)
+def handle_catalog_archive(payload):
+    StripeCatalogService.archive(payload["product_id"])
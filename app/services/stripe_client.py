@@ -0,0 +1,125 @@
+"""
+Stripe SDK setup: pooled keep-alive HTTP client, timeouts and circuit breaker
+"""
+
+import os
+import re
+import threading
+import time
+import stripe
+from requests.adapters import HTTPAdapter
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.metrics import histogram
+from app.utils.request_timing import record as record_timing
+
+stripe_breaker = CircuitBreaker("stripe")
+stripe_latency = histogram(
+    "stripe_request_seconds",
+    "Latency of Stripe API requests by call site",
+    labelnames=("call_site", "outcome"),
+)
+
+# Object ids in URL paths (cs_test_a1B2..., prod_N1x..., price_1Nx...) -> {id}
+_ID_SEGMENT = re.compile(r"^[a-z]+_(test_|live_)?[A-Za-z0-9]{8,}$")
+
+
+def call_site(method, url):
+    """Low-cardinality label for a Stripe request, e.g. "POST /v1/checkout/sessions"
+
+    Args:
+        method (str): HTTP method
+        url (str): Full request URL
+
+    Returns:
+        str: Method and path with object ids replaced by {id}
+    """
+    path = re.sub(r"^https?://[^/]+", "", url).split("?", 1)[0]
+    segments = ["{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/")]
+    return f"{method.upper()} {'/'.join(segments)}"
+
+
+class PooledStripeClient(stripe.RequestsClient):
+    """RequestsClient with one keep-alive session per process.
+
+    All threads (or gevent greenlets) of a worker share one requests.Session
+    whose urllib3 pool keeps up to `pool_maxsize` connections; the pool is
+    thread-safe and lends each connection to one request at a time. A
+    session per thread would mean a session per greenlet under gevent, i.e.
+    a fresh TLS handshake on almost every call. The session is rebuilt after
+    a fork so sockets are never shared between gunicorn workers. Each attempt is
+    timed per call site and fed to the Stripe circuit breaker: connection
+    errors, timeouts, 429 and 5xx count as failures.
+    """
+
+    name = "requests-pooled"
+
+    def __init__(self, connect_timeout, read_timeout, pool_maxsize=10, **kwargs):
+        super().__init__(timeout=(connect_timeout, read_timeout), **kwargs)
+        self._pool_maxsize = pool_maxsize
+        self._session_lock = threading.Lock()
+        self._session_pid = None
+
+    def _new_session(self):
+        session = self.requests.Session()
+        # Retries are done by the SDK (stripe.max_network_retries), not urllib3
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._pool_maxsize, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _request_internal(self, method, url, headers, post_data, is_streaming):
+        pid = os.getpid()
+        if self._session is None or self._session_pid != pid:
+            with self._session_lock:
+                if self._session is None or self._session_pid != pid:
+                    self._session = self._new_session()
+                    self._session_pid = pid
+        # The SDK reads the session from thread-local storage
+        self._thread_local.session = self._session
+
+        stripe_breaker.before_call()
+        site = call_site(method, url)
+        started = time.perf_counter()
+        try:
+            response = super()._request_internal(method, url, headers, post_data, is_streaming)
+        except Exception:
+            elapsed = time.perf_counter() - started
+            record_timing("stripe", elapsed)
+            stripe_latency.observe(elapsed, call_site=site, outcome="error")
+            stripe_breaker.record(False)
+            raise
+        elapsed = time.perf_counter() - started
+        record_timing("stripe", elapsed)
+        status_code = response[1]
+        ok = status_code < 500 and status_code != 429
+        stripe_latency.observe(elapsed, call_site=site, outcome=str(status_code))
+        stripe_breaker.record(ok)
+        return response
+
+    def close(self):
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+            self._session_pid = None
+        self._thread_local.session = None
+
+
+def configure_stripe(app):
+    """Configure the Stripe SDK for this app (key, API base, HTTP client, breaker)"""
+    config = app.config
+    stripe.api_key = config['STRIPE_SECRET_KEY']
+    if config['STRIPE_API_BASE']:
+        stripe.api_base = config['STRIPE_API_BASE']
+    stripe.max_network_retries = config['STRIPE_MAX_NETWORK_RETRIES']
+    stripe.default_http_client = PooledStripeClient(
+        connect_timeout=config['STRIPE_CONNECT_TIMEOUT'],
+        read_timeout=config['STRIPE_READ_TIMEOUT'],
+        pool_maxsize=config['STRIPE_POOL_MAXSIZE'],
+    )
+    stripe_breaker.configure(
+        failure_rate=config['STRIPE_BREAKER_FAILURE_RATE'],
+        min_calls=config['STRIPE_BREAKER_MIN_CALLS'],
+        window=config['STRIPE_BREAKER_WINDOW'],
+        cooldown=config['STRIPE_BREAKER_COOLDOWN'],
+    )
@@ -0,0 +1,145 @@
+"""
+Newsletter subscriber service: bulk import
+"""
+
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app import mongo
+from app.utils.validators import validate_email
+
+# Per-row errors kept in the report (the rest are only counted)
+MAX_REPORTED_ERRORS = 1000
+FALSE_VALUES = {"0", "false", "no", "n", "off", ""}
+
+
+class SubscriberService:
+    """Service for newsletter subscribers"""
+
+    @staticmethod
+    def parse_rows(stream, fmt):
+        """Read subscriber records from a binary stream, one at a time
+
+        Args:
+            stream: Binary file-like object (upload or open file)
+            fmt (str): "csv" (header with an `email` column) or "ndjson"
+
+        Yields:
+            tuple: (row_number, record dict or None, error or None)
+        """
+        text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+        if fmt == "csv":
+            reader = csv.DictReader(text)
+            if not reader.fieldnames or "email" not in [name.strip().lower() for name in reader.fieldnames]:
+                yield 1, None, "CSV header must contain an 'email' column"
+                return
+            for row_number, row in enumerate(reader, start=2):
+                yield row_number, {(key or "").strip().lower(): value for key, value in row.items()}, None
+            return
+
+        for row_number, line in enumerate(text, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield row_number, None, "invalid JSON"
+                continue
+            if not isinstance(record, dict):
+                yield row_number, None, "each line must be a JSON object"
+                continue
+            yield row_number, record, None
+
+    @staticmethod
+    def import_rows(rows, source="import", batch_size=1000, progress=None):
+        """Upsert subscribers in unordered bulk_write batches
+
+        Addresses are validated with validate_email, lowercased and
+        deduplicated in memory (first occurrence wins). Existing subscribers
+        are updated like subscribe_newsletter does; created_at is only set on
+        insert.
+
+        Args:
+            rows (iterable): (row_number, record, error) from parse_rows
+            source (str): Default `source` when a record has none
+            batch_size (int): Upserts per bulk_write
+            progress (callable): Called with the running report after each batch
+
+        Returns:
+            dict: {rows, valid, duplicates, invalid, inserted, updated,
+                   write_errors, errors: [{row, email, error}]}
+        """
+        report = {"rows": 0, "valid": 0, "duplicates": 0, "invalid": 0,
+                  "inserted": 0, "updated": 0, "write_errors": 0, "errors": []}
+        seen = set()
+        batch = []      # UpdateOne operations
+        batch_rows = []  # (row_number, email) of each operation, for error reporting
+
+        def add_error(row_number, email, error):
+            if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                report["errors"].append({"row": row_number, "email": email, "error": error})
+
+        def flush():
+            if not batch:
+                return
+            try:
+                result = mongo.subscribers.bulk_write(batch, ordered=False)
+                details = result.bulk_api_result
+            except BulkWriteError as e:
+                details = e.details
+                for write_error in details.get("writeErrors", []):
+                    row_number, email = batch_rows[write_error["index"]]
+                    report["write_errors"] += 1
+                    add_error(row_number, email, write_error.get("errmsg", "write error"))
+            report["inserted"] += details.get("nUpserted", 0)
+            report["updated"] += details.get("nMatched", 0)
+            batch.clear()
+            batch_rows.clear()
+            if progress:
+                progress(report)
+
+        now = datetime.now(timezone.utc)
+        for row_number, record, error in rows:
+            report["rows"] += 1
+            if error:
+                report["invalid"] += 1
+                add_error(row_number, None, error)
+                continue
+
+            raw_email = str(record.get("email") or "").strip()
+            if not raw_email or not validate_email(raw_email):
+                report["invalid"] += 1
+                add_error(row_number, raw_email or None, "invalid email" if raw_email else "email required")
+                continue
+            email = raw_email.lower()
+            if email in seen:
+                report["duplicates"] += 1
+                continue
+            seen.add(email)
+            report["valid"] += 1
+
+            consent = record.get("consent")
+            if isinstance(consent, str):
+                consent = consent.strip().lower() not in FALSE_VALUES
+            batch.append(UpdateOne(
+                {"email": email},
+                {
+                    "$set": {
+                        "email": email,
+                        "consent": True if consent is None else bool(consent),
+                        "source": str(record.get("source") or "").strip() or source,
+                        "updated_at": now,
+                    },
+                    "$setOnInsert": {"created_at": now},
+                },
+                upsert=True,
+            ))
+            batch_rows.append((row_number, email))
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+        return report
@@ -0,0 +1,104 @@
+"""
+Circuit breaker for calls to external services
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose breaker is open"""
+
+    def __init__(self, name, retry_after):
+        super().__init__(f"{name} temporarily unavailable (circuit open)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Error-rate circuit breaker (per worker process).
+
+    closed    -> calls go through; outcomes of the last `window` seconds are kept
+    open      -> once at least `min_calls` were made in the window and the
+                 failure ratio reaches `failure_rate`; calls fail immediately
+                 with CircuitOpenError for `cooldown` seconds
+    half_open -> after the cooldown a single probe call is let through; its
+                 outcome closes or re-opens the circuit
+    """
+
+    def __init__(self, name, failure_rate=0.5, min_calls=5, window=30.0, cooldown=20.0):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._outcomes = deque()  # (monotonic time, ok)
+        self._state = "closed"
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.times_opened = 0
+
+    def configure(self, **settings):
+        with self._lock:
+            for key, value in settings.items():
+                setattr(self, key, value)
+
+    def _trim(self, now):
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            self._outcomes.popleft()
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call must not be attempted"""
+        with self._lock:
+            if self._state == "closed":
+                return
+            now = time.monotonic()
+            remaining = self.cooldown - (now - self._opened_at)
+            if self._state == "open" and remaining <= 0:
+                self._state = "half_open"
+            if self._state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            raise CircuitOpenError(self.name, max(1, int(remaining + 0.999)))
+
+    def record(self, ok):
+        """Record the outcome of a call that was attempted"""
+        with self._lock:
+            now = time.monotonic()
+            if self._state == "half_open":
+                self._probe_in_flight = False
+                if ok:
+                    self._state = "closed"
+                    self._outcomes.clear()
+                else:
+                    self._open(now)
+                return
+            self._outcomes.append((now, ok))
+            self._trim(now)
+            if self._state == "closed" and len(self._outcomes) >= self.min_calls:
+                failures = sum(1 for _, outcome in self._outcomes if not outcome)
+                if failures / len(self._outcomes) >= self.failure_rate:
+                    self._open(now)
+
+    def _open(self, now):
+        self._state = "open"
+        self._opened_at = now
+        self._outcomes.clear()
+        self.times_opened += 1
+        print(f"[breaker][warn] {self.name} circuit opened for {self.cooldown}s")
+
+    def snapshot(self):
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            failures = sum(1 for _, outcome in self._outcomes if not outcome)
+            return {
+                "name": self.name,
+                "state": self._state,
+                "calls_in_window": len(self._outcomes),
+                "failures_in_window": failures,
+                "retry_after": max(0, round(self.cooldown - (now - self._opened_at), 1)) if self._state != "closed" else 0,
+                "times_opened": self.times_opened,
+            }
@@ -3,9 +3,11 @@ Authentication and authorization decorators
 """
 
 from functools import wraps
-from flask import jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import jsonify, current_app, request
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app import mongo
+from app.services.auth_service import AuthService
+from app.services.rate_limiter import RateLimiter, parse_limit
 
 
 def super_admin_required(f):
@@ -40,22 +42,27 @@ def super_admin_required(f):
 
 
 def admin_required(f):
-    """Decorator for React app content management - requires admin or super_admin"""
+    """Decorator for React app content management - requires admin or super_admin
+    
+    Authorization uses the role/security-version JWT claims plus a per-worker
+    cache, so bursts of admin calls do not query the users collection.
+    """
     
     @wraps(f)
     @jwt_required()
     def decorated_function(*args, **kwargs):
         try:
             current_user_email = get_jwt_identity()
-            user = mongo.users.find_one({"email": current_user_email})
-            
             allowed_roles = [
                 current_app.config['ROLE_ADMIN'], 
                 current_app.config['ROLE_SUPER_ADMIN']
             ]
             
-            if not user or user.get("role") not in allowed_roles:
-                return jsonify({"error": "Admin access required"}), 403
+            is_allowed, error_msg, status_code = AuthService.authorize_claims(
+                current_user_email, get_jwt(), allowed_roles
+            )
+            if not is_allowed:
+                return jsonify({"error": error_msg}), status_code
                 
             return f(*args, **kwargs)
         except Exception as e:
@@ -72,13 +79,71 @@ def user_required(f):
     def decorated_function(*args, **kwargs):
         try:
             current_user_email = get_jwt_identity()
-            user = mongo.users.find_one({"email": current_user_email})
-            
-            if not user:
-                return jsonify({"error": "Valid user account required"}), 403
+            is_allowed, error_msg, status_code = AuthService.authorize_claims(
+                current_user_email, get_jwt()
+            )
+            if not is_allowed:
+                return jsonify({"error": error_msg}), status_code
                 
             return f(*args, **kwargs)
         except Exception as e:
             return jsonify({"error": "Authentication failed"}), 401
     
     return decorated_function
+
+
+def client_ip():
+    """Client IP, taking RATE_LIMIT_TRUSTED_PROXIES hops of X-Forwarded-For into account"""
+    hops = current_app.config['RATE_LIMIT_TRUSTED_PROXIES']
+    forwarded = request.headers.get("X-Forwarded-For", "")
+    if hops and forwarded:
+        addresses = [address.strip() for address in forwarded.split(",") if address.strip()]
+        if addresses:
+            return addresses[-min(hops, len(addresses))]
+    return request.remote_addr or "unknown"
+
+
+def rate_limit(name, by=("ip",)):
+    """Decorator - token-bucket rate limit, checked before the endpoint runs
+
+    Limits come from RATE_LIMITS["<name>:<key kind>"] (e.g. "token:ip" =
+    "20/minute"); a missing or "0" limit disables that bucket.
+
+    Args:
+        name (str): Route name in RATE_LIMITS
+        by (tuple): Key kinds, one bucket each: "ip" and/or "email" (JSON body)
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            config = current_app.config
+            if not config['RATE_LIMIT_ENABLED']:
+                return f(*args, **kwargs)
+
+            for kind in by:
+                limit = parse_limit(config['RATE_LIMITS'].get(f"{name}:{kind}"))
+                if limit is None:
+                    continue
+                if kind == "email":
+                    body = request.get_json(silent=True) or {}
+                    value = str(body.get("email") or "").strip().lower() if isinstance(body, dict) else ""
+                    if not value:
+                        continue
+                else:
+                    value = client_ip()
+                try:
+                    allowed, retry_after = RateLimiter.hit(
+                        f"{name}:{kind}:{value}", limit[0], limit[1], config['RATE_LIMIT_BACKEND']
+                    )
+                except Exception as e:
+                    # Fail open: a limiter outage must not take the endpoint down
+                    print(f"[rate-limit][warn] {name}:{kind} check failed: {e}")
+                    continue
+                if not allowed:
+                    response = jsonify({"error": "Too many requests, please try again later"})
+                    response.headers["Retry-After"] = str(retry_after)
+                    return response, 429
+            return f(*args, **kwargs)
+
+        return decorated_function
+    return decorator
@@ -0,0 +1,74 @@
+"""
+Streaming CSV / NDJSON export helpers
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from bson.objectid import ObjectId
+
+EXPORT_MIMETYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _scalar(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def flatten(doc, prefix=""):
+    """Flatten nested dicts into dotted keys ({"a": {"b": 1}} -> {"a.b": 1})
+
+    Lists of dicts are expected to be handled by the caller (e.g. order items).
+    """
+    row = {}
+    for key, value in doc.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            row.update(flatten(value, f"{name}."))
+        else:
+            row[name] = _scalar(value)
+    return row
+
+
+def stream_rows(rows, columns, fmt, chunk_rows=500):
+    """Serialize rows lazily, yielding text chunks of `chunk_rows` rows
+
+    Args:
+        rows (iterable): Flat dicts (a generator over a batched cursor)
+        columns (list): Column order; keys missing in a row are left empty
+        fmt (str): "csv" (with header) or "ndjson"
+        chunk_rows (int): Rows serialized per yielded chunk
+
+    Yields:
+        str: Serialized chunk
+    """
+    buffer = io.StringIO()
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+
+    pending = 0
+    for row in rows:
+        if writer is not None:
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps({column: row.get(column) for column in columns}, default=str))
+            buffer.write("\n")
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+
+    tail = buffer.getvalue()
+    if tail:
+        yield tail
@@ -0,0 +1,112 @@
+"""
+HTTP caching helpers: strong ETags and precompressed response bodies
+"""
+
+import gzip
+import hashlib
+from flask import request, Response, current_app
+from werkzeug.http import quote_etag
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+
+# Suffixes keep ETags strong per representation (RFC 9110 §8.8.3)
+ENCODING_ETAG_SUFFIX = {
+    "identity": "",
+    "gzip": "-gz",
+    "br": "-br",
+}
+
+
+class CachedBody:
+    """Serialized response body with its ETag and compressed variants.
+
+    Built once per catalog generation and stored in the CatalogCache, so
+    hashing and compression are paid once instead of on every request.
+    """
+
+    __slots__ = ("etag", "variants")
+
+    def __init__(self, body, min_size=None, gzip_level=None, brotli_quality=None):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        config = current_app.config
+        min_size = config['HTTP_COMPRESS_MIN_SIZE'] if min_size is None else min_size
+        gzip_level = config['HTTP_GZIP_LEVEL'] if gzip_level is None else gzip_level
+        brotli_quality = config['HTTP_BROTLI_QUALITY'] if brotli_quality is None else brotli_quality
+
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.variants = {"identity": body}
+        if len(body) >= min_size:
+            # mtime=0 keeps the gzip bytes deterministic across workers
+            self.variants["gzip"] = gzip.compress(body, compresslevel=gzip_level, mtime=0)
+            if brotli is not None:
+                self.variants["br"] = brotli.compress(body, quality=brotli_quality)
+
+    def etag_for(self, encoding):
+        return f"{self.etag}{ENCODING_ETAG_SUFFIX[encoding]}"
+
+    def matches(self, if_none_match):
+        """Check an If-None-Match header against every representation"""
+        if not if_none_match:
+            return False
+        if if_none_match.star_tag:
+            return True
+        return any(if_none_match.contains(self.etag_for(enc)) for enc in self.variants)
+
+    def choose_encoding(self, accept_encodings):
+        """Pick the best stored variant for the Accept-Encoding header"""
+        best, best_quality = "identity", 0
+        for encoding in ("br", "gzip"):
+            if encoding not in self.variants:
+                continue
+            quality = accept_encodings[encoding]
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+
+def negotiate(cached, if_none_match, accept_encodings):
+    """Status, body and headers for a CachedBody (shared by the Flask and async APIs)
+
+    Args:
+        cached (CachedBody): Precomputed body and variants
+        if_none_match (werkzeug ETags): Parsed If-None-Match header
+        accept_encodings (werkzeug Accept): Parsed Accept-Encoding header
+
+    Returns:
+        tuple: (status, body bytes, headers dict)
+    """
+    encoding = cached.choose_encoding(accept_encodings)
+    headers = {
+        "ETag": quote_etag(cached.etag_for(encoding)),
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if cached.matches(if_none_match):
+        return 304, b"", headers
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return 200, cached.variants[encoding], headers
+
+
+def cached_response(cached, mimetype="application/json"):
+    """Build a response from a CachedBody honoring If-None-Match and Accept-Encoding
+
+    Args:
+        cached (CachedBody): Precomputed body and variants
+        mimetype (str): Response mimetype
+
+    Returns:
+        flask.Response: 304 Not Modified or 200 with the chosen variant
+    """
+    status, body, headers = negotiate(cached, request.if_none_match, request.accept_encodings)
+    if status == 304:
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype=mimetype)
+    response.headers.update(headers)
+    return response
@@ -0,0 +1,142 @@
+"""
+In-process latency histograms and counters (optionally mirrored to prometheus_client)
+"""
+
+import threading
+
+try:
+    from prometheus_client import Counter as PrometheusCounter, Histogram as PrometheusHistogram
+except ImportError:  # optional dependency
+    PrometheusCounter = PrometheusHistogram = None
+
+# Upper bounds (seconds) of the latency buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Bucketed latency histogram per label set, for this worker process.
+
+    Observations are kept in memory (served by the /api/system endpoints) and,
+    when prometheus_client is installed, also recorded in a Prometheus
+    histogram with the same name and labels.
+    """
+
+    def __init__(self, name, description, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}
+        self._prometheus = None
+        if PrometheusHistogram is not None:
+            self._prometheus = PrometheusHistogram(name, description, self.labelnames, buckets=self.buckets)
+
+    def observe(self, seconds, **labels):
+        key = tuple(str(labels.get(label, "")) for label in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = {"count": 0, "sum": 0.0, "max": 0.0, "buckets": [0] * (len(self.buckets) + 1)}
+                self._series[key] = series
+            series["count"] += 1
+            series["sum"] += seconds
+            series["max"] = max(series["max"], seconds)
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series["buckets"][index] += 1
+                    break
+            else:
+                series["buckets"][-1] += 1
+        if self._prometheus is not None:
+            metric = self._prometheus.labels(*key) if self.labelnames else self._prometheus
+            metric.observe(seconds)
+
+    def _quantile(self, series, q):
+        """Upper bound of the bucket holding the q-quantile (max for the overflow bucket)"""
+        rank = q * series["count"]
+        seen = 0
+        for index, count in enumerate(series["buckets"]):
+            seen += count
+            if seen >= rank and count:
+                return self.buckets[index] if index < len(self.buckets) else series["max"]
+        return series["max"]
+
+    def snapshot(self):
+        """Per label set: count, avg/max and approximate p50/p95/p99 in milliseconds"""
+        with self._lock:
+            series_list = [(key, dict(series, buckets=list(series["buckets"])))
+                           for key, series in self._series.items()]
+        result = []
+        for key, series in series_list:
+            entry = dict(zip(self.labelnames, key))
+            entry.update({
+                "count": series["count"],
+                "avg_ms": round(series["sum"] / series["count"] * 1000, 3) if series["count"] else 0.0,
+                "max_ms": round(series["max"] * 1000, 3),
+                "p50_ms": round(self._quantile(series, 0.50) * 1000, 3),
+                "p95_ms": round(self._quantile(series, 0.95) * 1000, 3),
+                "p99_ms": round(self._quantile(series, 0.99) * 1000, 3),
+            })
+            result.append(entry)
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+
+
+class Counter:
+    """Monotonic counter per label set, for this worker process.
+
+    Mirrored to a prometheus_client Counter when it is installed (the
+    Prometheus name gets the usual `_total` suffix).
+    """
+
+    def __init__(self, name, description, labelnames=()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {}
+        self._prometheus = None
+        if PrometheusCounter is not None:
+            self._prometheus = PrometheusCounter(name, description, self.labelnames)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(label, "")) for label in self.labelnames)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+        if self._prometheus is not None:
+            metric = self._prometheus.labels(*key) if self.labelnames else self._prometheus
+            metric.inc(amount)
+
+    def snapshot(self):
+        """Per label set: the current value"""
+        with self._lock:
+            items = list(self._series.items())
+        return [dict(zip(self.labelnames, key), value=value) for key, value in items]
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def histogram(name, description, labelnames=(), buckets=LATENCY_BUCKETS):
+    """Get or create the histogram registered under `name`"""
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = Histogram(name, description, labelnames, buckets)
+        return _registry[name]
+
+
+def counter(name, description, labelnames=()):
+    """Get or create the counter registered under `name`"""
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = Counter(name, description, labelnames)
+        return _registry[name]
@@ -0,0 +1,196 @@
+"""
+MongoDB client lifecycle and connection pool statistics
+"""
+
+import os
+import threading
+import time
+from pymongo import MongoClient
+from pymongo.monitoring import ConnectionPoolListener
+
+# Upper bounds (ms) of the checkout wait histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolStats(ConnectionPoolListener):
+    """CMAP listener collecting checkout/wait statistics for this process.
+
+    Pymongo publishes checkout events synchronously on the thread that asks
+    for a connection, so the wait time is measured per thread between
+    "check out started" and "checked out" / "check out failed".
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.pid = os.getpid()
+            self.checkouts = 0
+            self.checkout_failures = {}
+            self.connections_created = 0
+            self.connections_closed = 0
+            self.pools_cleared = 0
+            self.in_use = 0
+            self.max_in_use = 0
+            self.waits = 0
+            self.wait_total_ms = 0.0
+            self.wait_max_ms = 0.0
+            self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def _record_wait(self):
+        started = getattr(self._local, "started", None)
+        self._local.started = None
+        if started is None:
+            return 0.0
+        waited = (time.perf_counter() - started) * 1000
+        self.waits += 1
+        self.wait_total_ms += waited
+        self.wait_max_ms = max(self.wait_max_ms, waited)
+        for index, bound in enumerate(WAIT_BUCKETS_MS):
+            if waited <= bound:
+                self.wait_buckets[index] += 1
+                break
+        else:
+            self.wait_buckets[-1] += 1
+        return waited
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self._record_wait()
+            self.checkouts += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self._record_wait()
+            self.checkout_failures[event.reason] = self.checkout_failures.get(event.reason, 0) + 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pools_cleared += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def snapshot(self):
+        """Current statistics as a JSON-serializable dict"""
+        with self._lock:
+            buckets = {f"le_{bound}ms": count for bound, count in zip(WAIT_BUCKETS_MS, self.wait_buckets)}
+            buckets["gt_{}ms".format(WAIT_BUCKETS_MS[-1])] = self.wait_buckets[-1]
+            return {
+                "pid": self.pid,
+                "checkouts": self.checkouts,
+                "checkout_failures": dict(self.checkout_failures),
+                "connections_created": self.connections_created,
+                "connections_closed": self.connections_closed,
+                "connections_open": self.connections_created - self.connections_closed,
+                "pools_cleared": self.pools_cleared,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "wait_avg_ms": round(self.wait_total_ms / self.waits, 3) if self.waits else 0.0,
+                "wait_max_ms": round(self.wait_max_ms, 3),
+                "wait_histogram": buckets,
+            }
+
+
+class LazyDatabase:
+    """Proxy to the app database whose MongoClient is created on first use.
+
+    The client is bound to the process that created it: after a fork (e.g. a
+    gunicorn worker booted from a preloaded master) the next access builds a
+    fresh client, so pools and monitor threads are never shared across
+    processes. Attribute and item access are forwarded to the pymongo
+    Database, so `mongo.users` / `mongo["users"]` keep working.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._uri = None
+        self._db_name = None
+        self._client_options = {}
+        self._client = None
+        self._db = None
+        self._pid = None
+        self.pool_stats = PoolStats()
+
+    def configure(self, uri, db_name, **client_options):
+        """Set connection settings; the client itself is created lazily"""
+        with self._lock:
+            self._uri = uri
+            self._db_name = db_name
+            self._client_options = client_options
+            self._client = None
+            self._db = None
+            self._pid = None
+
+    def bind(self, database):
+        """Use an existing Database object (benchmarks, tests, scripts)"""
+        with self._lock:
+            self._client = getattr(database, "client", None)
+            self._db = database
+            self._pid = os.getpid()
+
+    def _get(self):
+        pid = os.getpid()
+        db = self._db
+        if db is not None and self._pid == pid:
+            return db
+        with self._lock:
+            if self._db is None or self._pid != pid:
+                if self._db_name is None:
+                    raise RuntimeError("Database not configured; call create_app() first")
+                if self._pid != pid:
+                    self.pool_stats.reset()
+                listeners = list(self._client_options.get("event_listeners", []))
+                if self.pool_stats not in listeners:
+                    listeners.append(self.pool_stats)
+                options = dict(self._client_options, event_listeners=listeners)
+                self._client = MongoClient(self._uri, **options)
+                self._db = self._client[self._db_name]
+                self._pid = pid
+            return self._db
+
+    @property
+    def client(self):
+        self._get()
+        return self._client
+
+    @property
+    def database(self):
+        return self._get()
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._get(), name)
+
+    def __getitem__(self, name):
+        return self._get()[name]
@@ -0,0 +1,83 @@
+"""
+Keyset (cursor) pagination helpers
+"""
+
+import base64
+from bson import json_util
+
+
+def encode_cursor(values):
+    """Encode the sort key values of the last returned document
+
+    Args:
+        values (list): Values of the sort fields (BSON types allowed)
+
+    Returns:
+        str: Opaque URL-safe cursor token
+    """
+    raw = json_util.dumps(list(values)).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token, size):
+    """Decode a cursor token produced by encode_cursor
+
+    Args:
+        token (str): Cursor token from the client
+        size (int): Expected number of sort values
+
+    Returns:
+        list: Sort key values
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json_util.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def parse_limit(value, default, maximum):
+    """Parse a `limit` query param, clamped to [1, maximum]"""
+    try:
+        limit = int(value) if value is not None else default
+    except (TypeError, ValueError):
+        limit = default
+    return max(1, min(limit, maximum))
+
+
+def keyset_filter(sort, values):
+    """Build the filter selecting documents strictly after `values` in `sort` order
+
+    For sort [(a, 1), (b, 1)] and values [x, y] this is:
+        {"$or": [{a: {"$gt": x}}, {a: x, b: {"$gt": y}}]}
+
+    Missing values (None) sort first in ascending order, so "after None" means
+    "any non-null value".
+
+    Args:
+        sort (list): [(field, direction), ...] as passed to cursor.sort()
+        values (list): Sort key values of the last document of the previous page
+
+    Returns:
+        dict: Mongo filter
+    """
+    clauses = []
+    for index, (field, direction) in enumerate(sort):
+        clause = {prev_field: values[i] for i, (prev_field, _) in enumerate(sort[:index])}
+        value = values[index]
+        if value is None:
+            if direction < 0:
+                continue  # Nothing sorts after null in descending order
+            clause[field] = {"$ne": None}
+        else:
+            clause[field] = {"$gt" if direction > 0 else "$lt": value}
+        clauses.append(clause)
+    if not clauses:
+        return {"_id": {"$exists": False}}
+    return {"$or": clauses} if len(clauses) > 1 else clauses[0]
@@ -0,0 +1,170 @@
+"""
+Per-request time attribution by dependency (Server-Timing + route metrics)
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+from pymongo import monitoring
+from app.utils.metrics import counter, histogram
+
+# Dependencies in Server-Timing order; "app" is the remainder of the request
+DEPENDENCIES = ("mongo", "stripe", "cloudinary", "json")
+
+_current = contextvars.ContextVar("request_timings", default=None)
+
+request_latency = histogram(
+    "http_request_seconds",
+    "Request latency by route (until the response is returned, not streamed)",
+    labelnames=("method", "route", "status"),
+)
+requests_total = counter(
+    "http_requests_total",
+    "Requests by route and status",
+    labelnames=("method", "route", "status"),
+)
+dependency_latency = histogram(
+    "http_dependency_seconds",
+    "Time a request spent in each dependency, by route",
+    labelnames=("route", "dependency"),
+)
+dependency_calls = counter(
+    "http_dependency_calls_total",
+    "Calls made to each dependency, by route",
+    labelnames=("route", "dependency"),
+)
+mongo_command_latency = histogram(
+    "mongo_command_seconds",
+    "MongoDB command latency by command name",
+    labelnames=("command", "outcome"),
+)
+
+
+class RequestTimings:
+    """Time spent per dependency during one request.
+
+    Thread-safe: work fanned out to a thread pool (parallel Cloudinary
+    uploads) adds to the same object, so a dependency can add up to more
+    than the wall-clock time of the request.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.spans = {}  # dependency -> [seconds, calls]
+
+    def add(self, dependency, seconds):
+        with self._lock:
+            span = self.spans.setdefault(dependency, [0.0, 0])
+            span[0] += seconds
+            span[1] += 1
+
+    def server_timing(self, total):
+        """Server-Timing header value, e.g. `mongo;dur=3.2;desc="2 calls", app;dur=1.1, total;dur=4.3`"""
+        with self._lock:
+            spans = dict(self.spans)
+        parts = []
+        spent = 0.0
+        for dependency in DEPENDENCIES:
+            if dependency in spans:
+                seconds, calls = spans[dependency]
+                spent += seconds
+                parts.append(f'{dependency};dur={seconds * 1000:.1f};desc="{calls} call{"s" if calls != 1 else ""}"')
+        parts.append(f"app;dur={max(0.0, total - spent) * 1000:.1f}")
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+
+def current():
+    """Timings of the request running in this context, or None"""
+    return _current.get()
+
+
+def record(dependency, seconds):
+    """Attribute `seconds` to a dependency of the current request (no-op outside requests)"""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(dependency, seconds)
+
+
+@contextmanager
+def timed(dependency):
+    """Time the enclosed block as a call to `dependency`"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(dependency, time.perf_counter() - started)
+
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """Command listener feeding the request timings and mongo_command_seconds.
+
+    Pymongo publishes command events on the thread that runs the command,
+    so the current request is found through the context variable.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        seconds = event.duration_micros / 1e6
+        record("mongo", seconds)
+        mongo_command_latency.observe(seconds, command=event.command_name, outcome="ok")
+
+    def failed(self, event):
+        seconds = event.duration_micros / 1e6
+        record("mongo", seconds)
+        mongo_command_latency.observe(seconds, command=event.command_name, outcome="error")
+
+
+mongo_command_timer = MongoCommandTimer()
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that attributes jsonify/dumps time to "json" """
+
+    def dumps(self, obj, **kwargs):
+        with timed("json"):
+            return super().dumps(obj, **kwargs)
+
+
+def init_request_timing(app):
+    """Time every request: Server-Timing header and per-route metrics
+
+    Mongo time comes from the command listener, Stripe time from the
+    pooled HTTP client, Cloudinary and JSON time from `timed` blocks; the
+    rest is reported as "app". Streamed bodies (exports) are only timed up
+    to the moment the response is returned.
+    """
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def start_request_timing():
+        _current.set(RequestTimings())
+
+    @app.after_request
+    def finish_request_timing(response):
+        timings = _current.get()
+        if timings is None:
+            return response
+        total = time.perf_counter() - timings.started
+        config = app.config
+        if config['SERVER_TIMING_ENABLED']:
+            response.headers["Server-Timing"] = timings.server_timing(total)
+        if config['METRICS_ENABLED']:
+            route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            status = str(response.status_code)
+            request_latency.observe(total, method=request.method, route=route, status=status)
+            requests_total.inc(method=request.method, route=route, status=status)
+            for dependency, (seconds, calls) in list(timings.spans.items()):
+                dependency_latency.observe(seconds, route=route, dependency=dependency)
+                dependency_calls.inc(calls, route=route, dependency=dependency)
+        return response
+
+    @app.teardown_request
+    def clear_request_timing(error=None):
+        _current.set(None)
@@ -0,0 +1,15 @@
+"""
+ASGI entry point: async public catalog reads + the Flask app
+
+    uvicorn asgi:app --workers 2
+    gunicorn -k uvicorn.workers.UvicornWorker -c gunicorn_config.py asgi:app
+"""
+
+import os
+from app import create_app
+from app.asgi import create_asgi_app
+
+# Create application instance (same configuration as wsgi.py)
+config_name = os.getenv('FLASK_ENV', 'production')
+flask_app = create_app(config_name)
+app = create_asgi_app(flask_app)
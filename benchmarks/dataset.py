@@ -0,0 +1,232 @@
+"""
+Synthetic dataset for the benchmarks
+
+Fills a database with documents shaped like the ones the app writes:
+portfolio albums with large galleries, store items, orders (as stored by
+OrderService), newsletter subscribers and the sales rollups built from
+the orders. Generation is deterministic for a given --seed.
+
+Scales:
+    small  1k albums, 200 store items, 20k orders, 5k subscribers (in-memory stand-in)
+    full   10k albums, 500 store items, 1M orders, 100k subscribers (local mongod)
+
+Usage:
+    python benchmarks/dataset.py --mongo-uri mongodb://localhost:27017 \
+        --db marina_bench [--scale full] [--orders 250000] [--drop]
+"""
+
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import MongoClient  # noqa: E402
+
+SCALES = {
+    "small": {"portfolio": 1000, "gallery": 40, "store": 200, "orders": 20000, "subscribers": 5000},
+    "full": {"portfolio": 10000, "gallery": 60, "store": 500, "orders": 1000000, "subscribers": 100000},
+}
+COLLECTIONS = ("portfolio_items", "store_items", "orders", "subscribers", "sales_rollups", "counters")
+ORDER_KEY_GAP = 1024
+COUNTRIES = ["ES"] * 12 + ["FR"] * 3 + ["DE"] * 2 + ["IT", "PT", "GB", "US", "NL"]
+PAYMENT_STATUSES = ["paid"] * 18 + ["unpaid", "no_payment_required"]
+WORDS = ("acuarela mar luz azul retrato paisaje serie tinta papel lienzo norte sur "
+         "print limited edition original sketch study harbor morning").split()
+CLOUDINARY_BASE = "https://res.cloudinary.com/demo/image/upload/v1700000000"
+
+
+def _text(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _batches(docs, batch_size):
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def portfolio_docs(rng, count, gallery):
+    for index in range(count):
+        size = rng.randint(gallery // 2, gallery)
+        yield {
+            "name": f"{_text(rng, 2).title()} {index}",
+            "description": _text(rng, 40),
+            "thumb_img_url": f"{CLOUDINARY_BASE}/portfolio/thumbnails/album_{index}.jpg",
+            "gallery": [f"{CLOUDINARY_BASE}/portfolio/gallery/album_{index}_{n}.jpg" for n in range(size)],
+            "gallery_count": size,
+            "display_order": (index + 1) * ORDER_KEY_GAP,
+        }
+
+
+def store_docs(rng, count):
+    for index in range(count):
+        yield {
+            "name": f"{_text(rng, 2).title()} {index}",
+            "price": rng.randrange(1500, 40000, 100),  # minor units, like the app stores it
+            "description": _text(rng, 25),
+            "image": f"{CLOUDINARY_BASE}/store/item_{index}.jpg",
+            "display_order": (index + 1) * ORDER_KEY_GAP,
+        }
+
+
+def order_docs(rng, count, store_names, customers, per_year, days=730):
+    """Orders spread over the last `days`; per_year counts order numbers per year"""
+    start = datetime.now(timezone.utc) - timedelta(days=days)
+    step = timedelta(days=days) / max(count, 1)
+    for index in range(count):
+        created_at = start + step * index + timedelta(seconds=rng.randint(0, 59))
+        year = created_at.year
+        per_year[year] = per_year.get(year, 0) + 1
+        items = []
+        for _ in range(rng.choice((1, 1, 1, 2, 2, 3, 4))):
+            quantity = rng.choice((1, 1, 1, 2))
+            items.append({
+                "description": rng.choice(store_names),
+                "quantity": quantity,
+                "amount_total_minor": quantity * rng.randrange(1500, 40000, 100),
+            })
+        customer = rng.choice(customers)
+        yield {
+            "session_id": f"cs_test_{index:010d}{rng.getrandbits(32):08x}",
+            "payment_status": rng.choice(PAYMENT_STATUSES),
+            "currency": "eur",
+            "amount_total_minor": sum(item["amount_total_minor"] for item in items),
+            "order_number": f"PED-{year}-{per_year[year]:05d}",
+            "customer_email": customer,
+            "customer_phone": f"+34 6{rng.randint(10000000, 99999999)}",
+            "shipping_name": customer.split("@")[0].replace(".", " ").title(),
+            "shipping_address": {
+                "line1": f"Calle {_text(rng, 1).title()} {rng.randint(1, 200)}",
+                "line2": None,
+                "city": rng.choice(("Madrid", "Barcelona", "Valencia", "Paris", "Berlin", "Lisboa")),
+                "state": None,
+                "postal_code": f"{rng.randint(1000, 52999):05d}",
+                "country": rng.choice(COUNTRIES),
+            },
+            "items": items,
+            "created_at": created_at,
+            "raw": {"type": "checkout.session.completed"},
+        }
+
+
+def subscriber_docs(rng, count, customers):
+    now = datetime.now(timezone.utc)
+    for index in range(count):
+        email = customers[index] if index < len(customers) else f"reader{index}@example.com"
+        created_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 730))
+        yield {
+            "email": email,
+            "consent": rng.random() > 0.05,
+            "source": rng.choice(("footer", "checkout", "import", "popup")),
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+
+def generate(db, portfolio, gallery, store, orders, subscribers, seed=0, batch_size=5000, drop=False, progress=print):
+    """Insert a synthetic dataset into `db`
+
+    Args:
+        db: pymongo (or mongomock) Database
+        portfolio, gallery, store, orders, subscribers (int): Document counts
+            (gallery = max images per album)
+        seed (int): Random seed (same seed, same data)
+        batch_size (int): Documents per insert_many
+        drop (bool): Drop the app collections first
+        progress (callable): Receives one line per collection
+
+    Returns:
+        dict: Documents inserted per collection
+    """
+    rng = random.Random(seed)
+    if drop:
+        for name in COLLECTIONS:
+            db[name].drop()
+
+    customers = [f"customer.{n}@example.com" for n in range(max(1, orders // 4))]
+    store_names = []
+
+    def insert(name, docs):
+        inserted = 0
+        for batch in _batches(docs, batch_size):
+            db[name].insert_many(batch, ordered=False)
+            inserted += len(batch)
+        progress(f"{name}: {inserted} documents")
+        return inserted
+
+    def remember_names(docs):
+        for doc in docs:
+            store_names.append(doc["name"])
+            yield doc
+
+    counts = {
+        "portfolio_items": insert("portfolio_items", portfolio_docs(rng, portfolio, gallery)),
+        "store_items": insert("store_items", remember_names(store_docs(rng, store))),
+    }
+    per_year = {}
+    counts["orders"] = insert("orders", order_docs(rng, orders, store_names or ["Item"], customers, per_year))
+    counts["subscribers"] = insert("subscribers", subscriber_docs(rng, subscribers, customers))
+
+    # New orders keep numbering after the generated ones (OrderNumberAllocator counters)
+    for year, seq in per_year.items():
+        db.counters.update_one({"_id": f"orders_{year}"}, {"$max": {"seq": seq}}, upsert=True)
+    return counts
+
+
+def build_rollups(progress=print):
+    """Rebuild sales_rollups from the generated orders (needs an app context)
+
+    Returns:
+        bool: True if the rollups were built
+    """
+    from app.services.analytics_service import SalesRollupService
+    try:
+        counts = SalesRollupService.rebuild()
+        progress(f"sales_rollups: {sum(counts.values())} documents")
+        return True
+    except Exception as e:
+        # mongomock has no $merge: the suite leaves the analytics endpoint out
+        progress(f"sales_rollups: skipped ({e.__class__.__name__}: {e})")
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-uri", default=os.getenv("ATLAS_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default="marina_bench", help="Database name (never point this at production)")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="full")
+    for name in SCALES["full"]:
+        parser.add_argument(f"--{name}", type=int, help=f"Override the {name} count of the scale")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--drop", action="store_true", help="Drop the app collections first")
+    args = parser.parse_args()
+
+    sizes = dict(SCALES[args.scale])
+    for name in sizes:
+        if getattr(args, name) is not None:
+            sizes[name] = getattr(args, name)
+
+    db = MongoClient(args.mongo_uri)[args.db]
+    generate(db, seed=args.seed, batch_size=args.batch_size, drop=args.drop, **sizes)
+
+    os.environ["AUTO_CREATE_INDEXES"] = "false"  # indexes go to the bench database below
+    from app import create_app, mongo
+    from app.services.index_registry import IndexRegistry
+    app = create_app("production")
+    mongo.bind(db)
+    with app.app_context():
+        IndexRegistry.apply(db)
+        build_rollups()
+
+
+if __name__ == "__main__":
+    main()
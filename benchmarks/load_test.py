@@ -0,0 +1,140 @@
+"""
+Throughput of the gunicorn worker profiles (sync / gthread / gevent)
+
+Starts `gunicorn -c gunicorn_config.py wsgi:app` once per profile (same
+environment as production: ATLAS_URI / MONGO_DB_NAME must point at a test
+database), then hammers read endpoints with N concurrent keep-alive
+clients for a fixed time and reports requests/s and latency percentiles.
+Use --url to load an already running server instead (one run, no spawn).
+
+Usage:
+    python benchmarks/load_test.py [--profiles sync,gthread,gevent]
+        [--clients 32] [--duration 20] [--workers 2]
+        [--paths /api/portfolio,/api/store] [--url http://host:port]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def wait_ready(base_url, path, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(base_url + path, timeout=2)
+            return True
+        except requests.RequestException:
+            time.sleep(0.2)
+    return False
+
+
+def load(base_url, paths, clients, duration):
+    stop_at = time.monotonic() + duration
+    lock = threading.Lock()
+    latencies, errors = [], [0]
+
+    def client(index):
+        session = requests.Session()
+        own, failed, n = [], 0, index
+        while time.monotonic() < stop_at:
+            path = paths[n % len(paths)]
+            n += 1
+            started = time.perf_counter()
+            try:
+                response = session.get(base_url + path, timeout=30)
+                response.content
+                if response.status_code >= 500:
+                    failed += 1
+            except requests.RequestException:
+                failed += 1
+            own.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(own)
+            errors[0] += failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(client, range(clients)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "errors": errors[0],
+    }
+
+
+def run_profile(profile, port, workers, paths, clients, duration):
+    if profile == "gevent":
+        try:
+            import gevent  # noqa: F401
+        except ImportError:
+            return None  # gunicorn_config.py would silently fall back to gthread
+    env = dict(os.environ, GUNICORN_PROFILE=profile, PORT=str(port))
+    if workers:
+        env["GUNICORN_WORKERS"] = str(workers)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn_config.py", "wsgi:app"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        if not wait_ready(base_url, paths[0]):
+            raise RuntimeError(f"gunicorn ({profile}) did not start on port {port}")
+        load(base_url, paths, min(clients, 4), 2)  # warm up pools and caches
+        return load(base_url, paths, clients, duration)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", default="sync,gthread,gevent", help="GUNICORN_PROFILE values to compare")
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent keep-alive clients")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds of load per profile")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="GUNICORN_WORKERS for every profile (0 = profile default from CPU count)")
+    parser.add_argument("--paths", default="/api/portfolio,/api/store", help="Comma-separated GET paths")
+    parser.add_argument("--port", type=int, default=8099, help="Port for the spawned servers")
+    parser.add_argument("--url", help="Load this running server instead of spawning gunicorn")
+    args = parser.parse_args()
+
+    paths = [path.strip() for path in args.paths.split(",") if path.strip()]
+    if args.url:
+        runs = [(args.url, lambda: load(args.url.rstrip("/"), paths, args.clients, args.duration))]
+    else:
+        runs = [
+            (profile, lambda profile=profile: run_profile(
+                profile, args.port, args.workers, paths, args.clients, args.duration))
+            for profile in args.profiles.split(",")
+        ]
+
+    print(f"{'profile':<24} {'requests':>9} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for name, run in runs:
+        result = run()
+        if result is None:
+            print(f"{name:<24} skipped (pip install gevent)")
+            continue
+        print(f"{name:<24} {result['requests']:>9} {result['rps']:>9.1f} {result['p50_ms']:>9.1f} "
+              f"{result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f} {result['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Login throughput vs password hashing cost
+
+Measures PasswordHasher.verify (what a login costs) for several pbkdf2
+iteration counts, inline on the request threads vs in the process pool,
+with N concurrent "request" threads (like gthread workers).
+
+Usage:
+    python benchmarks/password_hashing.py [--threads 4] [--logins 40]
+        [--iterations 100000,260000,600000] [--pool-workers 2]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from app.services.password_hasher import PasswordHasher  # noqa: E402
+
+
+def run(app, method, workers, threads, logins):
+    app.config.update(PASSWORD_HASH_METHOD=method, PASSWORD_HASH_WORKERS=workers, PASSWORD_HASH_TIMEOUT=120)
+    with app.app_context():
+        stored = PasswordHasher.hash("correct horse battery staple")
+        PasswordHasher.verify(stored, "warm up the pool")
+
+    latencies = []
+
+    def login(_):
+        with app.app_context():
+            started = time.perf_counter()
+            PasswordHasher.verify(stored, "correct horse battery staple")
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(login, range(logins)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "logins_per_s": logins / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=4, help="Concurrent logins")
+    parser.add_argument("--logins", type=int, default=40, help="Logins per scenario")
+    parser.add_argument("--iterations", default="100000,260000,600000", help="pbkdf2 iteration counts")
+    parser.add_argument("--pool-workers", type=int, default=2, help="PASSWORD_HASH_WORKERS for the pool runs")
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    print(f"{'method':<28} {'mode':<10} {'logins/s':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for iterations in args.iterations.split(","):
+        method = f"pbkdf2:sha256:{int(iterations)}"
+        for mode, workers in (("inline", 0), (f"pool x{args.pool_workers}", args.pool_workers)):
+            result = run(app, method, workers, args.threads, args.logins)
+            print(f"{method:<28} {mode:<10} {result['logins_per_s']:>9.1f} "
+                  f"{result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
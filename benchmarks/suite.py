@@ -0,0 +1,323 @@
+"""
+Per-endpoint benchmark suite
+
+Calls every blueprint endpoint through the Flask test client against a
+synthetic dataset (benchmarks/dataset.py) and reports latency percentiles
+and the peak memory allocated while serving one request (tracemalloc).
+Results can be saved as a baseline; later runs compared against it fail
+(exit 1) when an endpoint got slower or allocates more than allowed.
+
+Backends:
+    memory  mongomock, dataset generated in-process (default scale: small)
+    mongod  a local mongod (--mongo-uri/--db); the dataset is generated
+            first with --generate, or beforehand with benchmarks/dataset.py
+
+Usage:
+    python benchmarks/suite.py [--backend memory] [--iterations 50]
+        [--only portfolio.,store.list] [--save-baseline benchmarks/baseline.json]
+    python benchmarks/suite.py --baseline benchmarks/baseline.json [--tolerance 0.25]
+
+Baselines are only comparable on the same machine, backend and scale.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The benchmark database gets its indexes explicitly, after mongo.bind()
+os.environ["AUTO_CREATE_INDEXES"] = "false"
+
+from benchmarks.dataset import SCALES, generate, build_rollups  # noqa: E402
+
+ADMIN_EMAIL = "bench.admin@example.com"
+USER_EMAIL = "bench.user@example.com"
+USER_PASSWORD = "Bench-Password-123"
+
+
+class Endpoint:
+    """One benchmarked request
+
+    `request(ctx, n)` returns (path, kwargs for client.open) for the n-th call;
+    ctx holds sample ids and auth headers prepared by `setup`.
+    """
+
+    def __init__(self, name, method, request, admin=False, expect=200, iterations=None, needs=None):
+        self.name = name
+        self.method = method
+        self.request = request
+        self.admin = admin
+        self.expect = expect
+        self.iterations = iterations  # cap for expensive endpoints (exports, password hashing)
+        self.needs = needs  # ctx flag the dataset must have, else the endpoint is left out
+
+
+def _get(path):
+    return lambda ctx, n: (path(ctx, n) if callable(path) else path, {})
+
+
+def _post_json(path, body):
+    return lambda ctx, n: (path, {"json": body(ctx, n)})
+
+
+def _pick(ctx, key, n):
+    values = ctx[key]
+    return values[n % len(values)]
+
+
+ENDPOINTS = [
+    # portfolio
+    Endpoint("portfolio.list", "GET", _get("/api/portfolio")),
+    Endpoint("portfolio.page", "GET", _get("/api/portfolio?limit=24")),
+    Endpoint("portfolio.summary_page", "GET", _get("/api/portfolio?view=summary&limit=100")),
+    Endpoint("portfolio.item", "GET", _get(lambda ctx, n: f"/api/portfolio/{_pick(ctx, 'portfolio_ids', n)}")),
+    Endpoint("portfolio.order_version", "GET", _get("/api/portfolio/order-version"), admin=True),
+    # store
+    Endpoint("store.list", "GET", _get("/api/store")),
+    Endpoint("store.item", "GET", _get(lambda ctx, n: f"/api/store/{_pick(ctx, 'store_ids', n)}")),
+    Endpoint("store.orders.recent", "GET", _get("/api/store/orders?limit=50"), admin=True),
+    Endpoint("store.orders.by_email", "GET",
+             _get(lambda ctx, n: f"/api/store/orders?email={_pick(ctx, 'emails', n)}"), admin=True),
+    Endpoint("store.orders.by_status", "GET",
+             _get(lambda ctx, n: f"/api/store/orders?payment_status=paid&from={ctx['month_ago']}"), admin=True),
+    Endpoint("store.orders.detail", "GET",
+             _get(lambda ctx, n: f"/api/store/orders/{_pick(ctx, 'order_ids', n)}"), admin=True),
+    Endpoint("store.orders.by_session", "GET",
+             _get(lambda ctx, n: f"/api/store/orders/by-session/{_pick(ctx, 'session_ids', n)}")),
+    Endpoint("store.orders.export_month", "GET",
+             _get(lambda ctx, n: f"/api/store/orders/export?format=ndjson&from={ctx['month_ago']}"),
+             admin=True, iterations=5),
+    Endpoint("store.subscribers.export", "GET", _get("/api/store/subscribers/export?format=csv"),
+             admin=True, iterations=3),
+    Endpoint("store.subscribe", "POST",
+             _post_json("/api/store/subscribe", lambda ctx, n: {"email": f"bench.{ctx['run']}.{n}@example.com"})),
+    # analytics / system / auth
+    Endpoint("analytics.sales_by_product", "GET",
+             _get(lambda ctx, n: f"/api/analytics/sales?dim=product&group=range&from={ctx['year_ago']}"), admin=True,
+             needs="rollups"),
+    Endpoint("system.mongo_pool", "GET", _get("/api/system/mongo-pool"), admin=True),
+    Endpoint("auth.token", "POST",
+             _post_json("/api/token", lambda ctx, n: {"email": USER_EMAIL, "password": USER_PASSWORD}),
+             iterations=10),
+]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def setup(args):
+    """Create the app bound to the benchmark database and the request context dict"""
+    from app import create_app, mongo
+    from app.services.index_registry import IndexRegistry
+
+    if args.backend == "memory":
+        try:
+            import mongomock
+        except ImportError:
+            sys.exit("The memory backend needs mongomock: pip install mongomock")
+        db = mongomock.MongoClient()[args.db]
+    else:
+        from pymongo import MongoClient
+        db = MongoClient(args.mongo_uri)[args.db]
+
+    app = create_app("production")
+    app.config.update(
+        RATE_LIMIT_ENABLED=False,
+        STRIPE_CATALOG_SYNC=False,
+        PASSWORD_HASH_WORKERS=0,
+        CATALOG_CACHE_ENABLED=not args.no_cache,
+    )
+    mongo.bind(db)
+
+    with app.app_context():
+        if args.backend == "memory" or args.generate:
+            sizes = dict(SCALES[args.scale or ("small" if args.backend == "memory" else "full")])
+            print(f"generating dataset {sizes}")
+            generate(db, drop=True, progress=lambda line: print(f"  {line}"), **sizes)
+            IndexRegistry.apply(db)
+            build_rollups(progress=lambda line: print(f"  {line}"))
+
+        from app.services.auth_service import AuthService
+        from app.services.password_hasher import PasswordHasher
+        db.users.update_one({"email": ADMIN_EMAIL},
+                            {"$set": {"email": ADMIN_EMAIL, "username": "bench", "role": "admin"}}, upsert=True)
+        db.users.update_one({"email": USER_EMAIL},
+                            {"$set": {"email": USER_EMAIL, "username": "bench-user", "role": "admin",
+                                      "password": PasswordHasher.hash(USER_PASSWORD)}}, upsert=True)
+        token = AuthService.issue_access_token(db.users.find_one({"email": ADMIN_EMAIL}))
+
+        rng = random.Random(1)
+
+        def sample(collection, field, query=None, size=200):
+            docs = list(db[collection].find(query or {}, {field: 1}).limit(5000))
+            rng.shuffle(docs)
+            return [str(doc[field]) for doc in docs[:size]] or ["000000000000000000000000"]
+
+        now = datetime.now(timezone.utc)
+        ctx = {
+            "admin_headers": {"Authorization": f"Bearer {token}"},
+            "portfolio_ids": sample("portfolio_items", "_id"),
+            "store_ids": sample("store_items", "_id"),
+            "order_ids": sample("orders", "_id"),
+            "session_ids": sample("orders", "session_id"),
+            "emails": sample("orders", "customer_email"),
+            "month_ago": (now - timedelta(days=30)).strftime("%Y-%m-%d"),
+            "year_ago": (now - timedelta(days=365)).strftime("%Y-%m-%d"),
+            "run": int(time.time()),
+            # Rollups need $merge (mongod): without them the analytics endpoint
+            # would only measure reading an empty collection
+            "rollups": db.sales_rollups.estimated_document_count() > 0,
+        }
+    return app, ctx
+
+
+def call(client, endpoint, ctx, n):
+    path, kwargs = endpoint.request(ctx, n)
+    if endpoint.admin:
+        kwargs["headers"] = ctx["admin_headers"]
+    response = client.open(path, method=endpoint.method, **kwargs)
+    response.get_data()  # drain streamed bodies (exports)
+    if response.status_code != endpoint.expect:
+        raise RuntimeError(f"{endpoint.name}: {endpoint.method} {path} -> {response.status_code} "
+                           f"{response.get_data()[:200]!r}")
+
+
+def measure(client, endpoint, ctx, iterations, warmup, alloc_iterations):
+    """Latency percentiles (ms) and mean peak allocation (KiB) for one endpoint"""
+    iterations = min(iterations, endpoint.iterations or iterations)
+    for n in range(min(warmup, iterations)):
+        call(client, endpoint, ctx, n)
+
+    latencies = []
+    for n in range(iterations):
+        started = time.perf_counter()
+        call(client, endpoint, ctx, n)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+
+    # Separate pass: tracing slows every allocation down, so it is not timed
+    peaks = []
+    tracemalloc.start()
+    try:
+        for n in range(min(alloc_iterations, iterations)):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            call(client, endpoint, ctx, n)
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "alloc_peak_kib": round(sum(peaks) / len(peaks) / 1024, 1) if peaks else 0.0,
+    }
+
+
+def compare(results, baseline, tolerance, alloc_tolerance, min_delta_ms):
+    """Regressions of `results` against a baseline
+
+    An endpoint regresses when its p95 grew by more than `tolerance` (and by
+    more than `min_delta_ms`, to ignore sub-millisecond noise) or its peak
+    allocation grew by more than `alloc_tolerance`.
+
+    Returns:
+        list: Human readable regression lines
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("endpoints", {}).get(name)
+        if not base:
+            continue
+        p95, base_p95 = result["p95_ms"], base["p95_ms"]
+        if p95 > base_p95 * (1 + tolerance) and p95 - base_p95 > min_delta_ms:
+            regressions.append(f"{name}: p95 {base_p95:.2f} -> {p95:.2f} ms (+{(p95 / base_p95 - 1) * 100:.0f}%)")
+        alloc, base_alloc = result["alloc_peak_kib"], base["alloc_peak_kib"]
+        if base_alloc and alloc > base_alloc * (1 + alloc_tolerance):
+            regressions.append(f"{name}: peak alloc {base_alloc:.1f} -> {alloc:.1f} KiB "
+                               f"(+{(alloc / base_alloc - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=("memory", "mongod"), default="memory")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="marina_bench", help="Database name (never point this at production)")
+    parser.add_argument("--scale", choices=sorted(SCALES), help="Dataset scale (memory: small, mongod: full)")
+    parser.add_argument("--generate", action="store_true", help="mongod: (re)generate the dataset first")
+    parser.add_argument("--iterations", type=int, default=50, help="Timed requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--alloc-iterations", type=int, default=5, help="Traced requests per endpoint")
+    parser.add_argument("--only", help="Comma-separated endpoint names or prefixes (e.g. portfolio.,store.list)")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the catalog cache (measure the queries)")
+    parser.add_argument("--save-baseline", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against this JSON file; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p95 growth (0.25 = +25%%)")
+    parser.add_argument("--alloc-tolerance", type=float, default=0.25, help="Allowed peak allocation growth")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore p95 changes smaller than this")
+    args = parser.parse_args()
+
+    endpoints = ENDPOINTS
+    if args.only:
+        prefixes = [prefix.strip() for prefix in args.only.split(",") if prefix.strip()]
+        endpoints = [endpoint for endpoint in ENDPOINTS if any(endpoint.name.startswith(p) for p in prefixes)]
+
+    app, ctx = setup(args)
+    client = app.test_client()
+    results = {}
+    print(f"\n{'endpoint':<32} {'n':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak KiB':>10}")
+    for endpoint in endpoints:
+        if endpoint.needs and not ctx.get(endpoint.needs):
+            print(f"{endpoint.name:<32} skipped (no {endpoint.needs} in the dataset)")
+            continue
+        result = measure(client, endpoint, ctx, args.iterations, args.warmup, args.alloc_iterations)
+        results[endpoint.name] = result
+        print(f"{endpoint.name:<32} {result['iterations']:>4} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+              f"{result['p99_ms']:>9.2f} {result['alloc_peak_kib']:>10.1f}")
+
+    report = {
+        "meta": {
+            "backend": args.backend,
+            "scale": args.scale or ("small" if args.backend == "memory" else "full"),
+            "catalog_cache": not args.no_cache,
+            "python": platform.python_version(),
+            "machine": platform.node(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        },
+        "endpoints": results,
+    }
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\nbaseline written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if {key: baseline["meta"].get(key) for key in ("backend", "scale", "catalog_cache")} != \
+                {key: report["meta"][key] for key in ("backend", "scale", "catalog_cache")}:
+            print("\n[bench][warn] baseline was recorded with another backend/scale/cache setting")
+        regressions = compare(results, baseline, args.tolerance, args.alloc_tolerance, args.min_delta_ms)
+        if regressions:
+            print("\nREGRESSIONS")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nno regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
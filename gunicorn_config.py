@@ -1,2 +1,89 @@
-bind = "0.0.0.0:8080"
-workers = 2
\ No newline at end of file
+"""
+Gunicorn settings: worker profile selected with GUNICORN_PROFILE
+
+    gunicorn -c gunicorn_config.py wsgi:app
+
+Profiles (sized from the CPUs this process may use):
+  - gthread (default): max(2, cpus) workers x GUNICORN_THREADS (8) threads.
+    Requests mostly wait on MongoDB / Stripe / Cloudinary, so threads overlap
+    that I/O at little CPU cost. The worker heartbeat runs outside the request
+    threads, so long streaming responses (CSV/NDJSON exports) are not killed
+    by the worker timeout.
+  - gevent: cpus workers x GUNICORN_WORKER_CONNECTIONS (100) greenlets;
+    requires `pip install gevent`. Gunicorn monkey-patches each worker before
+    loading the app, so the app must not be preloaded.
+  - sync: 2 x cpus + 1 single-request workers (the previous config ran
+    a fixed 2 sync workers; set GUNICORN_WORKERS=2 to reproduce it).
+
+GUNICORN_WORKERS (or WEB_CONCURRENCY) overrides the worker count. Keep
+MONGO_MAX_POOL_SIZE >= threads and STRIPE_POOL_MAXSIZE close to it; with
+gevent, extra greenlets queue for a Mongo connection (MONGO_WAIT_QUEUE_TIMEOUT_MS).
+"""
+
+import importlib.util
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+
+def _cpus():
+    try:
+        return len(os.sched_getaffinity(0))  # respects container CPU pinning
+    except AttributeError:
+        return multiprocessing.cpu_count()
+
+
+cpus = _cpus()
+profile = os.getenv("GUNICORN_PROFILE", "gthread").strip().lower()
+
+if profile == "gevent":
+    try:
+        import gevent  # noqa: F401
+    except ImportError:
+        print("[gunicorn][warn] gevent is not installed; using the gthread profile")
+        profile = "gthread"
+
+if profile == "sync":
+    worker_class = "sync"
+    default_workers = 2 * cpus + 1
+elif profile == "gevent":
+    worker_class = "gevent"
+    default_workers = cpus
+    worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "100"))
+else:
+    profile = "gthread"
+    worker_class = "gthread"
+    default_workers = max(2, cpus)
+    threads = int(os.getenv("GUNICORN_THREADS", "8"))
+
+workers = int(os.getenv("GUNICORN_WORKERS") or os.getenv("WEB_CONCURRENCY") or default_workers)
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+# Import the app in each worker, after gevent has monkey-patched it
+preload_app = False
+
+# Prometheus multiprocess mode: each worker writes its metrics to files in
+# PROMETHEUS_MULTIPROC_DIR and /metrics aggregates them, whichever worker
+# serves the scrape. Only looked up here (not imported): prometheus_client
+# picks its storage when first imported, which must happen in the workers
+# after this variable is set.
+if importlib.util.find_spec("prometheus_client") is not None:
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "marina-prometheus"))
+
+
+def on_starting(server):
+    # Start from an empty directory: counters of a previous run must not leak in
+    path = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
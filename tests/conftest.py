@@ -0,0 +1,58 @@
+"""
+Test fixtures: the app bound to a fresh in-memory (mongomock) database per test
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Config is read from the environment at import time
+os.environ.setdefault("ATLAS_URI", "mongodb://localhost:27017")
+os.environ.setdefault("JWT_SECRET", "test-secret-" + "x" * 32)
+os.environ.setdefault("AUTO_CREATE_INDEXES", "false")
+os.environ.setdefault("STRIPE_CATALOG_SYNC", "false")
+
+import mongomock  # noqa: E402
+import pytest  # noqa: E402
+from app import create_app, mongo  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = create_app("development")
+    app.config.update(TESTING=True, PASSWORD_HASH_WORKERS=0, CATALOG_VERSION_CHECK_INTERVAL=0)
+    return app
+
+
+@pytest.fixture
+def db(app):
+    """Fresh database per test; per-worker caches are reset with it"""
+    from app.services import auth_service
+    database = mongomock.MongoClient()["marina_test"]
+    mongo.bind(database)
+    auth_service._security_state_cache = None
+    with app.app_context():
+        yield database
+
+
+@pytest.fixture
+def client(app, db):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app, db):
+    """Insert a user and return (document, access token)"""
+    from app.services.auth_service import AuthService
+
+    def make(email="admin@example.com", role="admin"):
+        db.users.insert_one({"email": email, "username": email.split("@")[0], "role": role})
+        user = db.users.find_one({"email": email})
+        return user, AuthService.issue_access_token(user)
+
+    return make
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
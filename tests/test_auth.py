@@ -0,0 +1,47 @@
+"""
+Token revocation and role checks (claims-based authorization)
+"""
+
+from app.models.user import UserModel
+from app.services.auth_service import AuthService
+from tests.conftest import bearer
+
+
+def test_admin_token_authorizes_admin_route(client, make_user):
+    _, token = make_user()
+    assert client.get("/api/store/orders", headers=bearer(token)).status_code == 200
+
+
+def test_role_is_read_from_the_database_not_the_token(client, db, make_user):
+    user, token = make_user()
+    # Demote without a security version bump: the token still says "admin"
+    db.users.update_one({"_id": user["_id"]}, {"$set": {"role": "user"}})
+    AuthService.invalidate_security_state(user["email"])
+    assert client.get("/api/store/orders", headers=bearer(token)).status_code == 403
+
+
+def test_role_change_revokes_token(client, make_user):
+    user, token = make_user()
+    assert UserModel.update_user(str(user["_id"]), {"role": "user"})
+    assert client.get("/api/store/orders", headers=bearer(token)).status_code == 401
+
+
+def test_token_of_deleted_user_is_not_valid_for_recreated_user(client, db, make_user):
+    user, token = make_user()
+    assert UserModel.delete_user(str(user["_id"]))
+    assert client.get("/api/store/orders", headers=bearer(token)).status_code == 403
+
+    # Same email again, now as a plain user whose security version starts at 0
+    _, status = UserModel.create_user("again", user["email"], "Another-passw0rd!", role="user")
+    assert status == 201
+    assert client.get("/api/store/orders", headers=bearer(token)).status_code == 401
+
+
+def test_refresh_token_of_deleted_user_is_rejected(client, db, make_user):
+    user, _ = make_user()
+    refresh = AuthService.issue_refresh_token(user)
+    assert client.post("/api/token/refresh", headers=bearer(refresh)).status_code == 200
+
+    UserModel.delete_user(str(user["_id"]))
+    UserModel.create_user("again", user["email"], "Another-passw0rd!", role="user")
+    assert client.post("/api/token/refresh", headers=bearer(refresh)).status_code == 401
@@ -0,0 +1,39 @@
+"""
+Batch upload rollback: only assets and dedup entries created by the batch are removed
+"""
+
+import base64
+import cloudinary.uploader
+from app.services.cloudinary_service import CloudinaryService
+
+
+def data_url(content):
+    return "data:image/png;base64," + base64.b64encode(content).decode()
+
+
+def test_rollback_keeps_dedup_entries_owned_by_other_uploads(db, monkeypatch):
+    raced = CloudinaryService.content_hash(data_url(b"raced"))
+    destroyed = []
+
+    def upload(image_data, **kwargs):
+        if image_data == data_url(b"broken"):
+            raise RuntimeError("upload failed")
+        if image_data == data_url(b"raced"):
+            # Another request uploads the same bytes and inserts the entry first
+            db.image_hashes.insert_one({"_id": raced, "public_id": "other/asset",
+                                        "secure_url": "https://cdn.example.com/other.png"})
+        name = base64.b64decode(image_data.partition(",")[2]).decode()
+        return {"public_id": f"batch/{name}", "secure_url": f"https://cdn.example.com/{name}.png"}
+
+    monkeypatch.setattr(cloudinary.uploader, "upload", upload)
+    monkeypatch.setattr(cloudinary.uploader, "destroy", lambda public_id, **kwargs: destroyed.append(public_id))
+
+    images = [(data_url(b"raced"), "portfolio"), (data_url(b"fresh"), "portfolio"),
+              (data_url(b"broken"), "portfolio")]
+    urls, error_index = CloudinaryService.upload_images(images, max_workers=1)
+
+    assert urls is None and error_index == 2
+    assert sorted(destroyed) == ["batch/fresh", "batch/raced"]
+    # The entry of the concurrent upload still points to its live asset
+    assert db.image_hashes.find_one({"_id": raced})["public_id"] == "other/asset"
+    assert db.image_hashes.count_documents({}) == 1
@@ -0,0 +1,74 @@
+"""
+Durable job queue: dedupe, leases, retries with backoff
+"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from app.services.job_queue import JobQueue, JOBS_COLLECTION
+
+KIND = "test.job"
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    def handler(payload):
+        calls.append(payload)
+        if payload.get("fail"):
+            raise RuntimeError("boom")
+
+    monkeypatch.setitem(JobQueue._handlers, KIND, handler)
+    return calls
+
+
+def test_enqueue_dedupes_on_job_id(db, calls):
+    assert JobQueue.enqueue(KIND, {"n": 1}, job_id="evt_1", run_inline=False) == ("evt_1", True)
+    assert JobQueue.enqueue(KIND, {"n": 2}, job_id="evt_1", run_inline=False) == ("evt_1", False)
+    assert JobQueue.run_once()
+    assert not JobQueue.run_once()
+    assert calls == [{"n": 1}]
+    assert db[JOBS_COLLECTION].find_one({"_id": "evt_1"})["status"] == "done"
+
+
+def test_failed_job_is_retried_with_backoff_then_marked_failed(app, db, calls):
+    JobQueue.enqueue(KIND, {"fail": True}, job_id="job", run_inline=False)
+    assert JobQueue.run_once()
+    job = db[JOBS_COLLECTION].find_one({"_id": "job"})
+    assert job["status"] == "pending"
+    assert job["last_error"] == "boom"
+    assert job["run_at"].replace(tzinfo=timezone.utc) > datetime.now(timezone.utc)
+    # Not due yet
+    assert not JobQueue.run_once()
+
+    for _ in range(app.config['JOB_MAX_ATTEMPTS'] - 1):
+        db[JOBS_COLLECTION].update_one({"_id": "job"}, {"$set": {"run_at": datetime.now(timezone.utc)}})
+        assert JobQueue.run_once()
+    job = db[JOBS_COLLECTION].find_one({"_id": "job"})
+    assert job["status"] == "failed"
+    assert job["attempts"] == app.config['JOB_MAX_ATTEMPTS']
+    assert len(calls) == app.config['JOB_MAX_ATTEMPTS']
+
+
+def test_running_job_is_reclaimed_only_after_its_lease_expires(db, calls):
+    JobQueue.enqueue(KIND, {"n": 1}, job_id="job", run_inline=False)
+    claimed = JobQueue.claim()
+    assert claimed["status"] == "running"
+    assert JobQueue.claim() is None
+
+    # The worker holding the lease crashed
+    expired = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db[JOBS_COLLECTION].update_one({"_id": "job"}, {"$set": {"locked_until": expired, "worker": "dead:1"}})
+    assert JobQueue.run_once()
+    job = db[JOBS_COLLECTION].find_one({"_id": "job"})
+    assert job["status"] == "done"
+    assert job["attempts"] == 2
+
+
+def test_only_the_lease_holder_finishes_the_job(db, calls):
+    JobQueue.enqueue(KIND, {"n": 1}, job_id="job", run_inline=False)
+    stale = JobQueue.claim()
+    # Lease expired and another worker took the job over
+    db[JOBS_COLLECTION].update_one({"_id": "job"}, {"$set": {"worker": "other:2"}})
+    JobQueue._finish(stale)
+    assert db[JOBS_COLLECTION].find_one({"_id": "job"})["status"] == "running"
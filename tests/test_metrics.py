@@ -0,0 +1,30 @@
+"""
+/metrics access control
+"""
+
+import pytest
+from tests.conftest import bearer
+
+
+@pytest.fixture
+def metrics_config(app):
+    previous = {key: app.config[key] for key in ("DEBUG", "METRICS_TOKEN")}
+    yield app.config
+    app.config.update(previous)
+
+
+def test_metrics_are_not_served_in_production_without_a_token(client, metrics_config):
+    metrics_config.update(DEBUG=False, METRICS_TOKEN=None)
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_require_the_configured_token(client, metrics_config):
+    metrics_config.update(DEBUG=False, METRICS_TOKEN="s3cret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers=bearer("wrong")).status_code == 401
+    assert client.get("/metrics", headers=bearer("s3cret")).status_code in (200, 503)
+
+
+def test_responses_carry_a_server_timing_header(client):
+    response = client.get("/api/store")
+    assert "total;dur=" in response.headers["Server-Timing"]
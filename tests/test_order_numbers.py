@@ -0,0 +1,92 @@
+"""
+Order numbers: drawn once per stored order, never for replayed events
+"""
+
+import stripe
+import pytest
+from datetime import datetime, timezone
+from app.services.order_service import OrderNumberAllocator, OrderService
+
+
+def checkout_event(session_id, event_type="checkout.session.completed"):
+    return stripe.Event.construct_from({
+        "id": f"evt_{session_id}",
+        "type": event_type,
+        "data": {"object": {
+            "id": session_id,
+            "object": "checkout.session",
+            "currency": "eur",
+            "payment_status": "paid",
+            "customer_details": {"email": "Buyer@Example.com"},
+        }},
+    }, "sk_test")
+
+
+@pytest.fixture(autouse=True)
+def line_items(monkeypatch):
+    class LineItems:
+        def auto_paging_iter(self):
+            return iter([{"description": "Print", "quantity": 1, "amount_total": 2500}])
+
+    monkeypatch.setattr(stripe.checkout.Session, "list_line_items", lambda *args, **kwargs: LineItems())
+
+
+def year():
+    return datetime.now(timezone.utc).year
+
+
+def test_orders_are_numbered_consecutively(db):
+    first = OrderService.record_checkout_session(checkout_event("cs_1"))
+    second = OrderService.record_checkout_session(checkout_event("cs_2"))
+    assert first["order_number"] == f"PED-{year()}-00001"
+    assert second["order_number"] == f"PED-{year()}-00002"
+    assert db.orders.find_one({"session_id": "cs_1"})["customer_email"] == "buyer@example.com"
+
+
+def test_replayed_events_do_not_consume_numbers(db):
+    OrderService.record_checkout_session(checkout_event("cs_1"))
+    assert OrderService.record_checkout_session(checkout_event("cs_1")) is None
+    assert OrderService.record_checkout_session(checkout_event("cs_1", "checkout.session.async_payment_succeeded")) is None
+    third = OrderService.record_checkout_session(checkout_event("cs_2"))
+
+    assert third["order_number"] == f"PED-{year()}-00002"
+    assert db.orders.count_documents({"session_id": "cs_1"}) == 1
+
+
+def test_stored_order_without_number_gets_one_on_retry(db):
+    # A previous attempt stored the order and died before numbering it
+    db.orders.insert_one({"session_id": "cs_1", "created_at": datetime.now(timezone.utc), "items": []})
+    assert OrderService.record_checkout_session(checkout_event("cs_1")) is None
+    assert db.orders.find_one({"session_id": "cs_1"})["order_number"] == f"PED-{year()}-00001"
+
+
+def test_block_mode_hands_out_unique_numbers(app, db):
+    previous = {key: app.config[key] for key in ("ORDER_NUMBER_MODE", "ORDER_NUMBER_BLOCK_SIZE")}
+    app.config.update(ORDER_NUMBER_MODE="block", ORDER_NUMBER_BLOCK_SIZE=10)
+    try:
+        OrderNumberAllocator._block.update(pid=None)
+        numbers = [OrderNumberAllocator.next_order_number() for _ in range(25)]
+    finally:
+        app.config.update(previous)
+        OrderNumberAllocator._block.update(pid=None)
+    assert len(set(numbers)) == 25
+    assert db.counters.find_one({"_id": f"orders_{year()}"})["seq"] == 30
+
+
+def test_concurrent_insert_of_the_same_session_is_already_stored(db, monkeypatch):
+    from pymongo.errors import DuplicateKeyError
+    from app.services.index_registry import IndexRegistry
+    IndexRegistry.apply(db)
+    OrderService.record_checkout_session(checkout_event("cs_1"))
+    with pytest.raises(DuplicateKeyError):
+        db.orders.insert_one({"session_id": "cs_1"})
+
+    # Lost the race: the existence check saw nothing, the upsert hits the unique index
+    def upsert(*args, **kwargs):
+        raise DuplicateKeyError("E11000 duplicate key error")
+
+    monkeypatch.setattr(db.orders, "find_one", lambda *args, **kwargs: None)
+    monkeypatch.setattr(db.orders, "update_one", upsert)
+    assert OrderService.record_checkout_session(checkout_event("cs_1")) is None
+    monkeypatch.undo()
+    assert db.counters.find_one({"_id": f"orders_{year()}"})["seq"] == 1
@@ -0,0 +1,88 @@
+"""
+Gapped display_order keys: move / apply_order validation and version conflicts
+"""
+
+import pytest
+from bson.objectid import ObjectId
+from app.services.ordering_service import OrderingService
+from tests.conftest import bearer
+
+GAP = 1024
+
+
+@pytest.fixture
+def items(db):
+    ids = [ObjectId() for _ in range(4)]
+    db.store_items.insert_many([
+        {"_id": oid, "name": f"item {n}", "display_order": (n + 1) * GAP} for n, oid in enumerate(ids)
+    ])
+    return [str(oid) for oid in ids]
+
+
+def keys(db):
+    return {str(doc["_id"]): doc.get("display_order") for doc in db.store_items.find()}
+
+
+def test_move_between_neighbours_rewrites_only_the_item(db, items):
+    before = keys(db)
+    result, status = OrderingService.move("store_items", items[3], after_id=items[0], before_id=items[1])
+    assert status == 200
+    assert result["display_order"] == GAP + GAP // 2
+    after = keys(db)
+    assert [item for item in items if after[item] != before[item]] == [items[3]]
+
+
+@pytest.mark.parametrize("after, before", [
+    (str(ObjectId()), None),  # missing neighbour
+    ("items[2]", "items[0]"),  # inverted pair
+    ("no-key", None),  # neighbour without a key
+])
+def test_bad_neighbours_are_rejected_without_side_effects(db, items, after, before):
+    if after == "no-key":
+        after = str(db.store_items.insert_one({"name": "unsorted"}).inserted_id)
+    resolve = {"items[0]": items[0], "items[2]": items[2]}
+    before_keys = keys(db)
+    version = OrderingService.get_version("store_items")
+
+    result, status = OrderingService.move("store_items", items[3], after_id=resolve.get(after, after),
+                                          before_id=resolve.get(before, before), expected_version=version)
+    assert status == 400
+    assert keys(db) == before_keys
+    assert OrderingService.get_version("store_items") == version
+
+
+def test_adjacent_neighbours_trigger_a_rebalance(db, items):
+    db.store_items.update_one({"_id": ObjectId(items[1])}, {"$set": {"display_order": GAP + 1}})
+    result, status = OrderingService.move("store_items", items[3], after_id=items[0], before_id=items[1])
+    assert status == 200
+    order = sorted(keys(db).items(), key=lambda pair: pair[1])
+    assert [item for item, _ in order] == [items[0], items[3], items[1], items[2]]
+
+
+def test_stale_version_gets_409(db, items):
+    version = OrderingService.get_version("store_items")
+    assert OrderingService.move("store_items", items[3], before_id=items[0], expected_version=version)[1] == 200
+    result, status = OrderingService.move("store_items", items[2], before_id=items[0], expected_version=version)
+    assert status == 409
+    assert result["version"] == version + 1
+
+    result, status = OrderingService.apply_order("store_items", list(reversed(items)), expected_version=version)
+    assert status == 409
+
+
+def test_non_integer_version_is_a_400(client, make_user, items):
+    _, token = make_user()
+    response = client.put(f"/api/store/{items[3]}/move", headers=bearer(token),
+                          json={"after": items[0], "version": "abc"})
+    assert response.status_code == 400
+    response = client.put("/api/store/reorder", headers=bearer(token),
+                          json={"items": [{"id": item} for item in items], "version": {"v": 1}})
+    assert response.status_code == 400
+
+
+def test_apply_order_rewrites_in_the_given_order(db, items):
+    result, status = OrderingService.apply_order("store_items", list(reversed(items)), expected_version=0)
+    assert status == 200
+    assert result == {"updated": 4, "version": 1}
+    order = sorted(keys(db).items(), key=lambda pair: pair[1])
+    assert [item for item, _ in order] == list(reversed(items))
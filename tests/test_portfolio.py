@@ -0,0 +1,22 @@
+"""
+Portfolio summary view: no writes on the public read path
+"""
+
+from app.api.portfolio import backfill_gallery_count
+
+
+def test_summary_view_does_not_write(client, db):
+    db.portfolio_items.insert_one({"name": "legacy", "gallery": ["a", "b"], "display_order": 1024})
+    response = client.get("/api/portfolio?view=summary")
+    assert response.status_code == 200
+    assert "gallery_count" not in db.portfolio_items.find_one({"name": "legacy"})
+
+
+def test_backfill_sets_gallery_count_on_legacy_albums(db):
+    db.portfolio_items.insert_many([
+        {"name": "legacy", "gallery": ["a", "b"], "display_order": 1024},
+        {"name": "new", "gallery": ["a"], "gallery_count": 1, "display_order": 2048},
+    ])
+    assert backfill_gallery_count() == 1
+    assert db.portfolio_items.find_one({"name": "legacy"})["gallery_count"] == 2
+    assert backfill_gallery_count() == 0
@@ -0,0 +1,96 @@
+"""
+Token-bucket rate limiter (shared Mongo buckets and the @rate_limit decorator)
+"""
+
+import pytest
+from app.services.rate_limiter import RateLimiter, parse_limit
+
+LOGIN = {"email": "someone@example.com", "password": "wrong-password"}
+
+
+@pytest.fixture
+def limits(app):
+    keys = ("RATE_LIMIT_ENABLED", "RATE_LIMIT_BACKEND", "RATE_LIMIT_TRUSTED_PROXIES", "RATE_LIMITS")
+    previous = {key: app.config[key] for key in keys}
+    app.config["RATE_LIMITS"] = dict(previous["RATE_LIMITS"])
+    RateLimiter._buckets.clear()
+    yield app.config
+    app.config.update(previous)
+    RateLimiter._buckets.clear()
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("10/minute", (10, 10 / 60)),
+    ("5/30s", (5, 5 / 30)),
+    ("3/hours", (3, 3 / 3600)),
+    ("off", None),
+    ("0", None),
+    ("", None),
+])
+def test_parse_limit(value, expected):
+    assert parse_limit(value) == expected
+
+
+def test_parse_limit_rejects_unknown_periods():
+    with pytest.raises(ValueError):
+        parse_limit("10/fortnight")
+
+
+@pytest.mark.parametrize("backend", ["mongo", "memory"])
+def test_bucket_allows_capacity_then_rejects(db, limits, backend):
+    for _ in range(3):
+        assert RateLimiter.hit("test:ip:1.2.3.4", 3, 3 / 60, backend) == (True, 0)
+    allowed, retry_after = RateLimiter.hit("test:ip:1.2.3.4", 3, 3 / 60, backend)
+    assert not allowed
+    assert 1 <= retry_after <= 20
+    # Other keys have their own bucket
+    assert RateLimiter.hit("test:ip:5.6.7.8", 3, 3 / 60, backend) == (True, 0)
+
+
+def test_mongo_buckets_are_shared_and_expire(db, limits):
+    RateLimiter.hit("test:ip:1.2.3.4", 2, 2 / 60)
+    bucket = db.rate_limits.find_one({"_id": "test:ip:1.2.3.4"})
+    assert bucket["tokens"] == pytest.approx(1, abs=0.01)
+    assert bucket["expires_at"] > bucket["updated_at"]
+
+
+def test_login_is_limited_per_email(client, limits):
+    limits["RATE_LIMITS"].update({"token:ip": "100/minute", "token:email": "5/minute"})
+    for _ in range(5):
+        assert client.post("/api/token", json=LOGIN).status_code == 401
+    response = client.post("/api/token", json=LOGIN)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    # Case and whitespace do not give a fresh bucket
+    assert client.post("/api/token", json={**LOGIN, "email": " SomeOne@Example.com "}).status_code == 429
+    assert client.post("/api/token", json={**LOGIN, "email": "other@example.com"}).status_code == 401
+
+
+def test_ip_bucket_uses_the_trusted_forwarded_hop(client, limits):
+    limits.update(RATE_LIMIT_TRUSTED_PROXIES=1)
+    limits["RATE_LIMITS"].update({"token:ip": "2/minute", "token:email": "off"})
+    first = {"X-Forwarded-For": "10.0.0.1"}
+    for _ in range(2):
+        assert client.post("/api/token", json=LOGIN, headers=first).status_code == 401
+    assert client.post("/api/token", json=LOGIN, headers=first).status_code == 429
+    # A spoofed left-most address does not escape the bucket of the real client
+    spoofed = {"X-Forwarded-For": "203.0.113.9, 10.0.0.1"}
+    assert client.post("/api/token", json=LOGIN, headers=spoofed).status_code == 429
+    assert client.post("/api/token", json=LOGIN, headers={"X-Forwarded-For": "10.0.0.2"}).status_code == 401
+
+
+def test_disabled_limiter_lets_requests_through(client, limits):
+    limits.update(RATE_LIMIT_ENABLED=False)
+    limits["RATE_LIMITS"].update({"token:ip": "1/minute"})
+    for _ in range(3):
+        assert client.post("/api/token", json=LOGIN).status_code == 401
+
+
+def test_limiter_failure_fails_open(client, limits, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("mongo is down")
+
+    monkeypatch.setattr(RateLimiter, "hit", staticmethod(broken))
+    limits["RATE_LIMITS"].update({"token:ip": "1/minute"})
+    for _ in range(3):
+        assert client.post("/api/token", json=LOGIN).status_code == 401
@@ -0,0 +1,156 @@
+"""
+Sales rollups: every paid order is counted exactly once, also across retries
+"""
+
+from datetime import datetime, timezone
+import pytest
+from bson.objectid import ObjectId
+from mongomock.collection import Collection
+from app.services.analytics_service import ROLLUPS_COLLECTION, SalesRollupService
+
+ITEMS = [
+    {"description": "Print", "quantity": 2, "amount_total_minor": 3000},
+    {"description": "Card", "quantity": 1, "amount_total_minor": 2000},
+]
+
+
+def paid_order(db, items=ITEMS):
+    order = {
+        "_id": ObjectId(),
+        "payment_status": "paid",
+        "currency": "eur",
+        "amount_total_minor": sum(item["amount_total_minor"] for item in items),
+        "created_at": datetime(2025, 3, 1, tzinfo=timezone.utc),
+        "shipping_address": {"country": "ES"},
+        "items": items,
+    }
+    db.orders.insert_one(order)
+    return order
+
+
+def counters(db):
+    return {doc["_id"]: (doc["orders"], doc["units"], doc["revenue_minor"])
+            for doc in db[ROLLUPS_COLLECTION].find()}
+
+
+EXPECTED = {
+    "2025-03-01|total|all|eur": (1, 3, 5000),
+    "2025-03-01|country|ES|eur": (1, 3, 5000),
+    "2025-03-01|product|Print|eur": (1, 2, 3000),
+    "2025-03-01|product|Card|eur": (1, 1, 2000),
+}
+
+
+def test_order_is_counted_once(db):
+    order = paid_order(db)
+    assert SalesRollupService.record_order(order)
+    assert not SalesRollupService.record_order(db.orders.find_one({"_id": order["_id"]}))
+    assert counters(db) == EXPECTED
+
+
+def test_retry_after_partial_failure_does_not_double_count(db, monkeypatch):
+    order = paid_order(db)
+    rollups = db[ROLLUPS_COLLECTION]
+    bulk_write = rollups.bulk_write
+    calls = []
+
+    def failing_bulk_write(requests, ordered=True):
+        calls.append(requests)
+        if len(calls) == 2:
+            # Only the first increment reaches the server
+            bulk_write(requests[:1], ordered=ordered)
+            raise RuntimeError("network error")
+        return bulk_write(requests, ordered=ordered)
+
+    monkeypatch.setattr(rollups, "bulk_write", failing_bulk_write)
+    with pytest.raises(RuntimeError):
+        SalesRollupService.record_order(order)
+    assert not db.orders.find_one({"_id": order["_id"]}).get("rolled_up")
+
+    # Retry (e.g. the job runs again): only the missing increments apply
+    assert SalesRollupService.record_order(db.orders.find_one({"_id": order["_id"]}))
+    assert counters(db) == EXPECTED
+
+
+def test_unpaid_orders_are_not_counted(db):
+    order = dict(paid_order(db), payment_status="unpaid")
+    assert not SalesRollupService.record_order(order)
+    assert counters(db) == {}
+
+
+def test_repeated_product_lines_are_merged(db):
+    order = paid_order(db, items=[
+        {"description": "Print", "quantity": 1, "amount_total_minor": 1000},
+        {"description": "Print", "quantity": 2, "amount_total_minor": 2000},
+    ])
+    assert SalesRollupService.record_order(order)
+    assert counters(db)["2025-03-01|product|Print|eur"] == (1, 3, 3000)
+
+
+def test_rebuild_pipelines_agree_with_incremental_rollups(db):
+    paid_order(db)
+    paid_order(db, items=[
+        {"description": "Print", "quantity": 1, "amount_total_minor": 1000},
+        {"description": "Print", "quantity": 2, "amount_total_minor": 2000},
+        {"quantity": 1, "amount_total_minor": 500},
+    ])
+    for order in db.orders.find():
+        SalesRollupService.record_order(order)
+    cutoff = db.orders.find_one(sort=[("_id", -1)])["_id"]
+    rebuilt = {
+        doc["_id"]: (doc["orders"], doc["units"], doc["revenue_minor"])
+        for pipeline in SalesRollupService._pipelines(cutoff).values()
+        for doc in db.orders.aggregate(pipeline)
+    }
+    assert rebuilt == counters(db)
+
+
+def test_counted_orders_are_not_pending_in_the_rollups(db):
+    SalesRollupService.record_order(paid_order(db))
+    assert all(not doc.get("pending_orders") for doc in db[ROLLUPS_COLLECTION].find())
+
+
+def test_claimed_order_is_left_to_the_claiming_worker(db):
+    order = paid_order(db)
+    db.orders.update_one({"_id": order["_id"]}, {"$set": {"rollup_claimed_at": datetime.now(timezone.utc)}})
+    assert not SalesRollupService.record_order(order)
+    assert counters(db) == {}
+
+
+@pytest.fixture
+def merge_aggregate(monkeypatch):
+    """mongomock has no $merge: run the pipeline and upsert its output; `during` runs on the first call"""
+    aggregate = Collection.aggregate
+    hooks = {"during": None}
+
+    def with_merge(self, pipeline, *args, **kwargs):
+        if not pipeline or "$merge" not in pipeline[-1]:
+            return aggregate(self, pipeline, *args, **kwargs)
+        target = self.database[pipeline[-1]["$merge"]["into"]]
+        for doc in aggregate(self, pipeline[:-1], *args, **kwargs):
+            target.replace_one({"_id": doc["_id"]}, doc, upsert=True)
+        during, hooks["during"] = hooks["during"], None
+        if during:
+            during()
+        return iter(())
+
+    monkeypatch.setattr(Collection, "aggregate", with_merge)
+    return hooks
+
+
+def test_rebuild_keeps_orders_stored_while_it_runs(db, merge_aggregate):
+    SalesRollupService.record_order(paid_order(db))
+    late = {}
+
+    def order_arrives():
+        # Stored and rolled up into the live collection the rebuild replaces
+        late["order"] = paid_order(db)
+        assert SalesRollupService.record_order(late["order"])
+
+    merge_aggregate["during"] = order_arrives
+    SalesRollupService.rebuild()
+    assert counters(db)["2025-03-01|total|all|eur"] == (2, 6, 10000)
+    assert counters(db)["2025-03-01|product|Print|eur"] == (2, 4, 6000)
+    assert db.orders.count_documents({"rolled_up": True}) == 2
+    # A later replay of the webhook does not count it again
+    assert not SalesRollupService.record_order(db.orders.find_one({"_id": late["order"]["_id"]}))
@@ -0,0 +1,85 @@
+"""
+Stripe catalog sync: idempotency keys scoped to the sync, never to the price
+"""
+
+import stripe
+from app.services.stripe_catalog_service import StripeCatalogService
+
+
+class FakeStripe:
+    """Records calls; replays responses for a repeated idempotency key like Stripe"""
+
+    def __init__(self):
+        self.responses = {}
+        self.prices = {}
+        self.keys = []
+
+    def _idempotent(self, key, build):
+        self.keys.append(key)
+        if key not in self.responses:
+            self.responses[key] = build()
+        return self.responses[key]
+
+    def product_create(self, idempotency_key=None, **fields):
+        return self._idempotent(idempotency_key, lambda: stripe.StripeObject.construct_from(
+            {"id": f"prod_{len(self.responses)}"}, "sk"))
+
+    def price_create(self, idempotency_key=None, **fields):
+        def build():
+            price = stripe.StripeObject.construct_from(
+                {"id": f"price_{len(self.prices)}", "active": True, "unit_amount": fields["unit_amount"]}, "sk")
+            self.prices[price.id] = price
+            return price
+        return self._idempotent(idempotency_key, build)
+
+    def price_modify(self, price_id, **fields):
+        self.prices[price_id].update(fields)
+        return self.prices[price_id]
+
+
+def test_price_change_back_and_forth_keeps_an_active_default_price(db, monkeypatch):
+    fake = FakeStripe()
+    monkeypatch.setattr(stripe.Product, "create", fake.product_create)
+    monkeypatch.setattr(stripe.Product, "modify", lambda *args, **kwargs: None)
+    monkeypatch.setattr(stripe.Price, "create", fake.price_create)
+    monkeypatch.setattr(stripe.Price, "modify", fake.price_modify)
+
+    item_id = db.store_items.insert_one({"name": "Print", "price": 1000}).inserted_id
+    for price in (1000, 2000, 1000):
+        db.store_items.update_one({"_id": item_id}, {"$set": {"price": price}})
+        StripeCatalogService.sync_item(db.store_items.find_one({"_id": item_id}))
+
+    item = db.store_items.find_one({"_id": item_id})
+    assert item["stripe_price_amount"] == 1000
+    assert fake.prices[item["stripe_price_id"]]["active"] is True
+    assert len(set(fake.keys)) == len(fake.keys)
+
+
+def test_retried_sync_reuses_its_idempotency_keys(db, monkeypatch):
+    fake = FakeStripe()
+    monkeypatch.setattr(stripe.Product, "create", fake.product_create)
+    monkeypatch.setattr(stripe.Product, "modify", lambda *args, **kwargs: None)
+    monkeypatch.setattr(stripe.Price, "create", fake.price_create)
+    monkeypatch.setattr(stripe.Price, "modify", fake.price_modify)
+
+    item = {"_id": db.store_items.insert_one({"name": "Print", "price": 1000}).inserted_id,
+            "name": "Print", "price": 1000}
+    first = StripeCatalogService.sync_item(dict(item), sync_id="job-1")
+    again = StripeCatalogService.sync_item(dict(item), sync_id="job-1")
+    assert first == again
+    assert len(fake.prices) == 1
+
+
+def test_public_store_responses_leave_out_the_sync_fields(client, db):
+    from app.api.store import STORE_COLLECTION
+    from app.services.catalog_cache import CatalogCache
+    db.store_items.insert_one({"name": "Print", "price": 2500, "stripe_product_id": "prod_1",
+                               "stripe_price_id": "price_1", "stripe_price_amount": 2500,
+                               "stripe_currency": "eur", "stripe_synced_at": None})
+    CatalogCache.invalidate(STORE_COLLECTION)
+    item_id = str(db.store_items.find_one()["_id"])
+    listed = client.get("/api/store").get_json()
+    single = client.get(f"/api/store/{item_id}").get_json()
+    for body in (listed[0], single):
+        assert body["name"] == "Print" and body["price"] == 2500
+        assert not [field for field in body if field.startswith("stripe_")]
@@ -0,0 +1,15 @@
+"""
+Background job worker entry point
+"""
+
+import os
+from app import create_app
+from app.services.job_queue import JobQueue
+
+# Create application instance (same configuration as the web process)
+config_name = os.getenv('FLASK_ENV', 'production')
+app = create_app(config_name)
+
+if __name__ == "__main__":
+    with app.app_context():
+        JobQueue.work()